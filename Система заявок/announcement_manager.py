@@ -2,22 +2,22 @@
 Модуль для управління оголошеннями через БД
 Оголошення відправляються прямо в чат користувачам через Telegram Bot API
 """
+import json
 import os
-import requests
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from dotenv import load_dotenv
+from sqlalchemy import insert
 
 from database import get_session
 from models import Announcement, AnnouncementRecipient, User
+from notification_manager import get_notification_manager
 from logger import logger
 
 # Завантажуємо змінні середовища
 load_dotenv("config.env")
 
-# Telegram Bot API URL
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
-TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}" if TELEGRAM_BOT_TOKEN else None
 
 
 class AnnouncementManager:
@@ -52,111 +52,113 @@ class AnnouncementManager:
             logger.log_error("TELEGRAM_BOT_TOKEN не встановлено в config.env")
             return {'sent': 0, 'failed': len(recipient_user_ids), 'announcement_id': None}
         
+        # Формуємо повідомлення з пріоритетом
+        priority_emoji = {
+            'urgent': '🔴 ТЕРМІНОВЕ',
+            'important': '🟡 ВАЖЛИВЕ',
+            'normal': '📋 Оголошення'
+        }.get(priority, '📋 Оголошення')
+        
+        message_text = f"{priority_emoji}\n\n{content}\n\n👤 Автор: @{author_username}"
+        
+        # Кожному отримувачу - одне повідомлення і один запис (унікальний індекс ix_ann_recip_ann_user)
+        recipient_user_ids = list(dict.fromkeys(recipient_user_ids))
+        
         try:
+            # Спочатку відправляємо повідомлення, і лише потім одним коротким записом
+            # зберігаємо оголошення з отримувачами: транзакція не тримає блокування БД
+            # на весь час розсилки
+            sent_count = 0
+            failed_count = 0
+            recipient_rows = []
+            # Помилки логуються після commit (логер пише в БД окремим з'єднанням)
+            send_errors = []
+            
+            # Розсилка через спільний обмежувач частоти Telegram (очікування 429 - retry_after)
+            try:
+                errors = get_notification_manager().broadcast_results(recipient_user_ids, message_text)
+            except Exception as e:
+                errors = [str(e) or type(e).__name__] * len(recipient_user_ids)
+            
+            sent_at = datetime.now()
+            for recipient_id, error in zip(recipient_user_ids, errors):
+                if error is None:
+                    status = 'sent'
+                    sent_count += 1
+                else:
+                    status = self._recipient_error_status(error)
+                    failed_count += 1
+                    if status == 'failed':
+                        send_errors.append((recipient_id, error[:200]))
+                
+                recipient_rows.append({
+                    'recipient_user_id': recipient_id,
+                    'sent_at': sent_at,
+                    'status': status
+                })
+            
             with get_session() as session:
                 # Створюємо запис оголошення
+                now = datetime.now()
                 announcement = Announcement(
                     content=content,
                     author_id=author_id,
                     author_username=author_username,
                     priority=priority,
-                    created_at=datetime.now(),
-                    updated_at=datetime.now(),
-                    sent_at=datetime.now(),
-                    recipient_count=len(recipient_user_ids)
+                    created_at=now,
+                    updated_at=now,
+                    sent_at=now,
+                    recipient_count=sent_count
                 )
                 session.add(announcement)
                 session.flush()
+                announcement_id = announcement.id
                 
-                # Формуємо повідомлення з пріоритетом
-                priority_emoji = {
-                    'urgent': '🔴 ТЕРМІНОВЕ',
-                    'important': '🟡 ВАЖЛИВЕ',
-                    'normal': '📋 Оголошення'
-                }.get(priority, '📋 Оголошення')
-                
-                message_text = f"{priority_emoji}\n\n{content}\n\n👤 Автор: @{author_username}"
-                
-                # Відправляємо повідомлення кожному отримувачу
-                sent_count = 0
-                failed_count = 0
-                
-                for recipient_id in recipient_user_ids:
-                    try:
-                        response = requests.post(
-                            f"{TELEGRAM_API_URL}/sendMessage",
-                            json={
-                                'chat_id': recipient_id,
-                                'text': message_text,
-                                'parse_mode': 'HTML'
-                            },
-                            timeout=10
-                        )
-                        
-                        if response.status_code == 200:
-                            status = 'sent'
-                            sent_count += 1
-                        else:
-                            try:
-                                error_data = response.json()
-                                error_code = error_data.get('error_code', 0)
-                                error_description = error_data.get('description', 'Unknown error')
-                            except (ValueError, KeyError):
-                                error_code = response.status_code
-                                error_description = response.text[:100] if response.text else 'Unknown error'
-                            
-                            if error_code == 403:
-                                status = 'blocked'
-                            elif error_code == 400:
-                                error_desc_lower = error_description.lower()
-                                if 'chat not found' in error_desc_lower or 'chat_id is empty' in error_desc_lower:
-                                    status = 'blocked'
-                                else:
-                                    status = 'failed'
-                            else:
-                                status = 'failed'
-                            
-                            failed_count += 1
-                            
-                            if status == 'failed':
-                                logger.log_warning(f"Помилка відправки оголошення {announcement.id} користувачу {recipient_id}: {error_description}")
-                        
-                        recipient = AnnouncementRecipient(
-                            announcement_id=announcement.id,
-                            recipient_user_id=recipient_id,
-                            sent_at=datetime.now(),
-                            status=status
-                        )
-                        session.add(recipient)
-                        
-                    except requests.exceptions.RequestException as e:
-                        failed_count += 1
-                        status = 'failed'
-                        logger.log_error(f"Помилка відправки оголошення {announcement.id} користувачу {recipient_id}: {e}")
-                        
-                        recipient = AnnouncementRecipient(
-                            announcement_id=announcement.id,
-                            recipient_user_id=recipient_id,
-                            sent_at=datetime.now(),
-                            status=status
-                        )
-                        session.add(recipient)
-                
-                announcement.recipient_count = sent_count
+                # Усі отримувачі - одним executemany замість session.add() на кожного
+                if recipient_rows:
+                    for row in recipient_rows:
+                        row['announcement_id'] = announcement_id
+                    session.execute(insert(AnnouncementRecipient), recipient_rows)
                 session.commit()
-                
-                logger.log_info(f"Оголошення {announcement.id} відправлено: {sent_count} успішно, {failed_count} помилок")
-                
-                return {
-                    'sent': sent_count,
-                    'failed': failed_count,
-                    'announcement_id': announcement.id
-                }
+            
+            for recipient_id, error in send_errors:
+                logger.log_warning(f"Помилка відправки оголошення {announcement_id} користувачу {recipient_id}: {error}")
+            logger.log_info(f"Оголошення {announcement_id} відправлено: {sent_count} успішно, {failed_count} помилок")
+            
+            return {
+                'sent': sent_count,
+                'failed': failed_count,
+                'announcement_id': announcement_id
+            }
             
         except Exception as e:
             logger.log_error(f"Помилка відправки оголошення: {e}")
             return {'sent': 0, 'failed': len(recipient_user_ids), 'announcement_id': None}
     
+    @staticmethod
+    def _recipient_error_status(error: str) -> str:
+        """
+        Статус отримувача за помилкою розсилки
+        
+        Args:
+            error: Текст помилки (відповідь Telegram у JSON або текст винятку)
+            
+        Returns:
+            'blocked' якщо бот заблоковано або чат не знайдено, інакше 'failed'
+        """
+        try:
+            error_data = json.loads(error)
+            error_code = error_data.get('error_code', 0)
+            error_description = error_data.get('description', '').lower()
+        except (ValueError, AttributeError):
+            return 'failed'
+        
+        if error_code == 403:
+            return 'blocked'
+        if error_code == 400 and ('chat not found' in error_description or 'chat_id is empty' in error_description):
+            return 'blocked'
+        return 'failed'
+    
     def get_announcement_history(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Отримання історії відправлених оголошень"""
         try:
@@ -71,18 +71,17 @@ class AuthManager:
                 try:
                     notification_manager = get_notification_manager()
                     # Отримуємо всіх користувачів з увімкненими оповіщеннями (тільки Telegram користувачі)
-                    notified_users = session.query(User).filter(
+                    notified_user_ids = [row.user_id for row in session.query(User.user_id).filter(
                         User.notifications_enabled == True,
                         User.user_id > 0  # Тільки Telegram користувачі
-                    ).all()
+                    )]
                     
-                    # Відправляємо оповіщення кожному користувачу
-                    for notified_user in notified_users:
-                        notification_manager.send_new_access_request_notification(
-                            user_id=notified_user.user_id,
-                            requesting_user_id=user_id,
-                            requesting_username=username
-                        )
+                    # Відправляємо оповіщення всім користувачам одночасно
+                    notification_manager.broadcast_new_access_request_notification(
+                        user_ids=notified_user_ids,
+                        requesting_user_id=user_id,
+                        requesting_username=username
+                    )
                 except Exception as e:
                     # Не блокуємо додавання запиту, якщо оповіщення не вдалося відправити
                     logger.log_error(f"Помилка відправки оповіщень про новий запит на доступ від {user_id}: {e}")
@@ -6,6 +6,7 @@ import os
 import sys
 import asyncio
 import logging
+import threading
 import warnings
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
@@ -25,7 +26,7 @@ from logger import logger
 from app_version import APP_VERSION
 from csrf_manager import csrf_manager
 from input_validator import input_validator
-from database import init_database, get_session, get_bot_config
+from database import init_database, get_session, get_read_session, get_bot_config
 from models import User, Company
 from ticket_manager import get_ticket_manager
 from printer_manager import get_printer_manager
@@ -58,13 +59,63 @@ TICKETS_PER_PAGE = 5  # Кількість заявок на сторінку
 LISTS_PER_PAGE = 10  # Кількість списків на сторінку (2 колонки по 5)
 NOTES_PER_PAGE = 10  # Кількість нотаток на сторінку
 
-# Глобальна змінна для зберігання активного чату для користувача
-# Формат: {user_id: ticket_id}
-chat_active_for_user: Dict[int, int] = {}
+
+
+class ActiveChatRegistry:
+    """
+    Потокобезпечний реєстр активних чатів {user_id: ticket_id}
+    
+    Змінюється з обробників asyncio, JobQueue та резервних потоків (threading),
+    тому всі операції виконуються під блокуванням.
+    """
+    
+    def __init__(self):
+        self._chats: Dict[int, int] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, user_id: int) -> Optional[int]:
+        """Отримати ID заявки активного чату користувача"""
+        with self._lock:
+            return self._chats.get(user_id)
+    
+    def set(self, user_id: int, ticket_id: int) -> None:
+        """Запам'ятати активний чат користувача"""
+        with self._lock:
+            self._chats[user_id] = ticket_id
+    
+    def discard(self, user_id: int) -> None:
+        """Видалити активний чат користувача (якщо є)"""
+        with self._lock:
+            self._chats.pop(user_id, None)
+    
+    def clear_inactive(self, is_active) -> int:
+        """
+        Видалити записи, для яких чат більше не активний
+        
+        Args:
+            is_active: Функція ticket_id -> bool
+        
+        Returns:
+            Кількість видалених записів
+        """
+        with self._lock:
+            snapshot = list(self._chats.items())
+        inactive = [user_id for user_id, ticket_id in snapshot if not is_active(ticket_id)]
+        with self._lock:
+            for user_id in inactive:
+                self._chats.pop(user_id, None)
+        return len(inactive)
+
+
+# Активний чат для користувача
+chat_active_for_user = ActiveChatRegistry()
 
 # Стан оформлення заявки на консультацію для гостей (без доступу до системи)
 guest_consultation_state: Dict[int, Dict[str, Any]] = {}
 
+# Повідомлення для тижня без задач
+EMPTY_WEEK_MSG = "📆 <b>Задачі на цьому тижні (0)</b>\n\nНа цьому тижні задач немає."
+
 # Повідомлення для гостей (немає доступу до системи)
 GUEST_WELCOME_MESSAGE = (
     "🔐 <b>Доступ до системи заявок</b>\n\n"
@@ -160,7 +211,7 @@ def create_menu_keyboard(user_id: int) -> InlineKeyboardMarkup:
         buttons.append([InlineKeyboardButton("📋 Мої заявки", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, "my_tickets"))])
         
         # Додаємо кнопки для задач, якщо оповіщення увімкнені
-        with get_session() as session:
+        with get_read_session() as session:
             user = session.query(User).filter(User.user_id == user_id).first()
             if user and (user.notifications_enabled or user.role == 'admin'):
                 buttons.append([InlineKeyboardButton("📝 Створити задачу", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, "new_task"))])
@@ -207,8 +258,7 @@ async def menu_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     keyboard = create_menu_keyboard(user_id)
     
     # Виходимо з режиму чату, якщо користувач був в ньому
-    if user_id in chat_active_for_user:
-        del chat_active_for_user[user_id]
+    chat_active_for_user.discard(user_id)
     if user_id in guest_consultation_state:
         del guest_consultation_state[user_id]
     
@@ -216,7 +266,7 @@ async def menu_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         message_text = "📋 <b>Головне меню</b>\n\n"
         
         # Отримуємо інформацію компанії користувача
-        with get_session() as session:
+        with get_read_session() as session:
             user = session.query(User).filter(User.user_id == user_id).first()
             if user and user.company_id:
                 company = session.query(Company).filter(Company.id == user.company_id).first()
@@ -420,9 +470,8 @@ async def knowledge_base_command(update: Update, context: ContextTypes.DEFAULT_T
                 return
         
         knowledge_base_manager = get_knowledge_base_manager()
-        all_notes = knowledge_base_manager.get_all_notes(limit=None)
-        
-        total_notes = len(all_notes)
+        # Лише поточна сторінка і кількість - без завантаження всіх нотаток
+        total_notes = await asyncio.to_thread(knowledge_base_manager.count_notes)
         total_pages = (total_notes + NOTES_PER_PAGE - 1) // NOTES_PER_PAGE if total_notes > 0 else 0
         
         message_text = f"📚 <b>База знань ({total_notes})</b>\n"
@@ -430,21 +479,23 @@ async def knowledge_base_command(update: Update, context: ContextTypes.DEFAULT_T
             message_text += f"<i>Сторінка {page + 1} з {total_pages}</i>\n"
         message_text += "\n"
         
-        if not all_notes:
+        if not total_notes:
             message_text = "📚 База знань порожня.\n\nСтворіть першу нотатку!"
             keyboard = InlineKeyboardMarkup([
                 [InlineKeyboardButton("➕ Створити нотатку", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, "create_note"))],
                 [InlineKeyboardButton("⬅️ Назад", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, "menu"))]
             ])
         else:
-            # Обчислюємо індекси для поточної сторінки
-            start_idx = page * NOTES_PER_PAGE
-            end_idx = min(start_idx + NOTES_PER_PAGE, total_notes)
-            notes = all_notes[start_idx:end_idx]
+            notes = await asyncio.to_thread(
+                knowledge_base_manager.get_notes,
+                is_admin=True,
+                limit=NOTES_PER_PAGE,
+                offset=page * NOTES_PER_PAGE
+            )
+            favorite_ids = await asyncio.to_thread(knowledge_base_manager.get_favorite_note_ids, user_id, [note['id'] for note in notes])
             
             for note in notes:
-                is_favorite = knowledge_base_manager.is_favorite(user_id, note['id'])
-                star = "⭐ " if is_favorite else ""
+                star = "⭐ " if note['id'] in favorite_ids else ""
                 category_text = f" | {note['category']}" if note['category'] else ""
                 tags_text = f" | Теги: {note['tags']}" if note['tags'] else ""
                 message_text += (
@@ -455,7 +506,7 @@ async def knowledge_base_command(update: Update, context: ContextTypes.DEFAULT_T
             keyboard_buttons = []
             
             # Кнопка "Мої закладки"
-            favorites_count = knowledge_base_manager.get_favorite_notes_count(user_id)
+            favorites_count = await asyncio.to_thread(knowledge_base_manager.get_favorite_notes_count, user_id)
             keyboard_buttons.append([InlineKeyboardButton(f"⭐ Мої закладки ({favorites_count})", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, "favorites_page:0"))])
             
             # Додаємо навігацію по сторінках, якщо є більше однієї сторінки
@@ -527,7 +578,7 @@ async def show_favorites_command(update: Update, context: ContextTypes.DEFAULT_T
                 return
         
         knowledge_base_manager = get_knowledge_base_manager()
-        all_favorites = knowledge_base_manager.get_user_favorites(user_id, limit=None)
+        all_favorites = await asyncio.to_thread(knowledge_base_manager.get_user_favorites, user_id, limit=None)
         
         total_notes = len(all_favorites)
         total_pages = (total_notes + NOTES_PER_PAGE - 1) // NOTES_PER_PAGE if total_notes > 0 else 0
@@ -607,22 +658,22 @@ async def toggle_favorite_handler(update: Update, context: ContextTypes.DEFAULT_
     """Обробка перемикання статусу закладки"""
     try:
         knowledge_base_manager = get_knowledge_base_manager()
-        note = knowledge_base_manager.get_note(note_id)
+        note = await asyncio.to_thread(knowledge_base_manager.get_note_summary, note_id)
         
         if not note:
             await update.callback_query.answer("❌ Нотатку не знайдено", show_alert=True)
             return
         
-        is_favorite = knowledge_base_manager.is_favorite(user_id, note_id)
+        is_favorite = await asyncio.to_thread(knowledge_base_manager.is_favorite, user_id, note_id)
         
         if is_favorite:
-            success = knowledge_base_manager.remove_favorite(user_id, note_id)
+            success = await asyncio.to_thread(knowledge_base_manager.remove_favorite, user_id, note_id)
             if success:
                 await update.callback_query.answer("✅ Нотатку видалено з закладок")
             else:
                 await update.callback_query.answer("❌ Помилка видалення з закладок", show_alert=True)
         else:
-            success = knowledge_base_manager.add_favorite(user_id, note_id)
+            success = await asyncio.to_thread(knowledge_base_manager.add_favorite, user_id, note_id)
             if success:
                 await update.callback_query.answer("✅ Нотатку додано в закладки")
             else:
@@ -640,7 +691,7 @@ async def show_note_detail(update: Update, context: ContextTypes.DEFAULT_TYPE, u
     """Показ деталей нотатки"""
     try:
         knowledge_base_manager = get_knowledge_base_manager()
-        note = knowledge_base_manager.get_note(note_id)
+        note = await asyncio.to_thread(knowledge_base_manager.get_note, note_id)
         
         if not note:
             await safe_edit_message_text(update.callback_query, "❌ Нотатку не знайдено.")
@@ -656,7 +707,7 @@ async def show_note_detail(update: Update, context: ContextTypes.DEFAULT_TYPE, u
             # Зберігаємо значення role до виходу з контексту сесії
             is_admin = user.role == 'admin'
         
-        can_edit = knowledge_base_manager.can_edit_note(note_id, user_id, is_admin)
+        can_edit = await asyncio.to_thread(knowledge_base_manager.can_edit_note, note_id, user_id, is_admin)
         
         message_text = f"📄 <b>{note['title']}</b>\n\n"
         
@@ -704,7 +755,7 @@ async def show_note_detail(update: Update, context: ContextTypes.DEFAULT_TYPE, u
         keyboard_buttons = []
         
         # Кнопка закладок
-        is_favorite = knowledge_base_manager.is_favorite(user_id, note_id)
+        is_favorite = await asyncio.to_thread(knowledge_base_manager.is_favorite, user_id, note_id)
         if is_favorite:
             keyboard_buttons.append([InlineKeyboardButton("⭐ Видалити з обраних", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, f"toggle_favorite:{note_id}"))])
         else:
@@ -854,7 +905,8 @@ async def handle_note_category_input(update: Update, context: ContextTypes.DEFAU
     
     # Створюємо нотатку (команди та теги додаються тільки через веб-інтерфейс)
     knowledge_base_manager = get_knowledge_base_manager()
-    note_id = knowledge_base_manager.create_note(
+    note_id = await asyncio.to_thread(
+        knowledge_base_manager.create_note,
         title=note_creation_state[user_id]['title'],
         content=note_creation_state[user_id]['content'],
         resource_url=note_creation_state[user_id]['resource_url'],
@@ -880,14 +932,14 @@ async def edit_note_handler(update: Update, context: ContextTypes.DEFAULT_TYPE,
     """Початок редагування нотатки"""
     try:
         knowledge_base_manager = get_knowledge_base_manager()
-        note = knowledge_base_manager.get_note(note_id)
+        note = await asyncio.to_thread(knowledge_base_manager.get_note_summary, note_id)
         
         if not note:
             await update.callback_query.edit_message_text("❌ Нотатку не знайдено.")
             return
         
         # Перевіряємо права
-        with get_session() as session:
+        with get_read_session() as session:
             user = session.query(User).filter(User.user_id == user_id).first()
             if user:
                 # Зберігаємо значення role до виходу з контексту сесії
@@ -895,7 +947,7 @@ async def edit_note_handler(update: Update, context: ContextTypes.DEFAULT_TYPE,
             else:
                 is_admin = False
         
-        if not knowledge_base_manager.can_edit_note(note_id, user_id, is_admin):
+        if not await asyncio.to_thread(knowledge_base_manager.can_edit_note, note_id, user_id, is_admin):
             await update.callback_query.edit_message_text("❌ У вас немає прав на редагування цієї нотатки.")
             return
         
@@ -915,14 +967,14 @@ async def delete_note_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
     """Видалення нотатки"""
     try:
         knowledge_base_manager = get_knowledge_base_manager()
-        note = knowledge_base_manager.get_note(note_id)
+        note = await asyncio.to_thread(knowledge_base_manager.get_note_summary, note_id)
         
         if not note:
             await update.callback_query.edit_message_text("❌ Нотатку не знайдено.")
             return
         
         # Перевіряємо права
-        with get_session() as session:
+        with get_read_session() as session:
             user = session.query(User).filter(User.user_id == user_id).first()
             if user:
                 # Зберігаємо значення role до виходу з контексту сесії
@@ -930,11 +982,11 @@ async def delete_note_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
             else:
                 is_admin = False
         
-        if not knowledge_base_manager.can_edit_note(note_id, user_id, is_admin):
+        if not await asyncio.to_thread(knowledge_base_manager.can_edit_note, note_id, user_id, is_admin):
             await update.callback_query.edit_message_text("❌ У вас немає прав на видалення цієї нотатки.")
             return
         
-        if knowledge_base_manager.delete_note(note_id):
+        if await asyncio.to_thread(knowledge_base_manager.delete_note, note_id):
             await update.callback_query.edit_message_text("✅ Нотатку видалено успішно!")
         else:
             await update.callback_query.edit_message_text("❌ Помилка при видаленні нотатки.")
@@ -1002,7 +1054,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
                     try:
                         from models import Poll, PollOption, PollResponse
                         
-                        with get_session() as session:
+                        with get_read_session() as session:
                             poll = session.query(Poll).filter(Poll.id == poll_id).first()
                             if not poll:
                                 return
@@ -1072,17 +1124,18 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     # Якщо так - дозволяємо автоматичне оновлення CSRF токена
     chat_manager = get_chat_manager()
     has_active_chat = False
-    if user_id in chat_active_for_user:
-        has_active_chat = chat_manager.is_chat_active(chat_active_for_user[user_id])
+    active_ticket_id = chat_active_for_user.get(user_id)
+    if active_ticket_id is not None:
+        has_active_chat = chat_manager.is_chat_active(active_ticket_id)
     else:
         # Перевіряємо в БД
-        with get_session() as session:
+        with get_read_session() as session:
             from models import Ticket
             tickets = session.query(Ticket).filter(Ticket.user_id == user_id).all()
             for ticket in tickets:
                 if chat_manager.is_chat_active(ticket.id):
                     has_active_chat = True
-                    chat_active_for_user[user_id] = ticket.id
+                    chat_active_for_user.set(user_id, ticket.id)
                     break
     
     # Витягуємо callback дані з CSRF перевіркою
@@ -1135,7 +1188,7 @@ async def callback_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         keyboard = create_menu_keyboard(user_id_menu)
         if auth_manager.is_user_allowed(user_id_menu):
             message_text = "📋 <b>Головне меню</b>\n\n"
-            with get_session() as session:
+            with get_read_session() as session:
                 user_m = session.query(User).filter(User.user_id == user_id_menu).first()
                 if user_m and user_m.company_id:
                     company = session.query(Company).filter(Company.id == user_m.company_id).first()
@@ -1681,7 +1734,7 @@ async def create_ticket_from_state(update: Update, context: ContextTypes.DEFAULT
         
         if ticket_id:
             # Отримуємо назву компанії для відображення
-            with get_session() as session:
+            with get_read_session() as session:
                 company = session.query(Company).filter(Company.id == company_id).first()
                 company_name = company.name if company else f"Компанія #{company_id}"
             
@@ -2024,6 +2077,41 @@ async def handle_task_list_selection(update: Update, context: ContextTypes.DEFAU
             del task_creation_state[user_id]
 
 
+def format_task_text(task: Dict[str, Any], notes_limit: int, today=None, _get=dict.get) -> str:
+    """
+    Форматування однієї задачі для списку задач
+    
+    Args:
+        task: Словник задачі з TaskManager
+        notes_limit: Максимальна довжина нотаток
+        today: Поточна дата; якщо передано, дата виводиться перед нотатками з позначкою «Сьогодні»
+    """
+    title = _get(task, 'title') or 'Без назви'
+    list_name = _get(task, 'list_name')
+    
+    date_line = ""
+    if due_date_str := (_get(task, 'due_date') or '')[:10]:
+        try:
+            date_obj = datetime.strptime(due_date_str, '%Y-%m-%d')
+            due_date_formatted = date_obj.strftime('%d.%m.%Y')
+            if today is not None and date_obj.date() == today:
+                date_line = f"📅 Сьогодні ({due_date_formatted})\n"
+            else:
+                date_line = f"📆 {due_date_formatted}\n"
+        except ValueError:
+            date_line = f"📆 {due_date_str}\n"
+    
+    notes_line = ""
+    if notes := _get(task, 'notes'):
+        notes = notes[:notes_limit] + "..." if len(notes) > notes_limit else notes
+        notes_line = f"📝 {notes}\n"
+    list_line = f"📋 {list_name}\n" if list_name else ""
+    
+    if today is not None:
+        return f"⏳ <b>{title}</b>\n{date_line}{notes_line}{list_line}\n"
+    return f"⏳ <b>{title}</b>\n{notes_line}{date_line}{list_line}\n"
+
+
 async def show_tasks_today(update: Update, context: ContextTypes.DEFAULT_TYPE, user_id: int, page: int = 0) -> None:
     """Показ задач на сьогодні з пагінацією"""
     if not auth_manager.is_user_allowed(user_id):
@@ -2063,30 +2151,11 @@ async def show_tasks_today(update: Update, context: ContextTypes.DEFAULT_TYPE, u
         
         for task in tasks:
             # Всі задачі в get_tasks_for_today() вже невиконані, тому завжди показуємо ⏳
-            task_title = task.get('title', 'Без назви')
-            message_text += f"⏳ <b>{task_title}</b>\n"
-            
-            if task.get('notes'):
-                notes = task['notes'][:100] + "..." if len(task.get('notes', '')) > 100 else task['notes']
-                message_text += f"📝 {notes}\n"
-            
-            if task.get('due_date'):
-                due_date_str = task['due_date'][:10] if len(task.get('due_date', '')) > 10 else task['due_date']
-                try:
-                    date_obj = datetime.strptime(due_date_str, '%Y-%m-%d')
-                    due_date_formatted = date_obj.strftime('%d.%m.%Y')
-                except:
-                    due_date_formatted = due_date_str
-                message_text += f"📆 {due_date_formatted}\n"
-            
-            if task.get('list_name'):
-                message_text += f"📋 {task['list_name']}\n"
-            
-            message_text += "\n"
+            task_title = task.get('title') or 'Без назви'
+            message_text += format_task_text(task, notes_limit=100)
             
             # Додаємо кнопку закриття для кожної задачі
-            task_id = task.get('id')
-            if task_id:
+            if task_id := task.get('id'):
                 callback_data = csrf_manager.add_csrf_to_callback_data(user_id, f"complete_task:{task_id}")
                 # Перевіряємо обмеження 64 байти (навряд чи буде проблема з task_id, але перевіримо)
                 MAX_CALLBACK_BYTES = 64
@@ -2151,10 +2220,9 @@ async def show_tasks_week(update: Update, context: ContextTypes.DEFAULT_TYPE, us
     week_tasks = []
     
     for task in all_tasks:
-        if not task.get('due_date'):
+        if not (due_date_str := (task.get('due_date') or '')[:10]):
             continue
         
-        due_date_str = task['due_date'][:10] if len(task.get('due_date', '')) > 10 else task['due_date']
         try:
             due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
             
@@ -2165,10 +2233,17 @@ async def show_tasks_week(update: Update, context: ContextTypes.DEFAULT_TYPE, us
         except:
             continue
     
+    if not today_tasks and not week_tasks:
+        keyboard = InlineKeyboardMarkup([
+            [InlineKeyboardButton("⬅️ Меню", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, "menu"))]
+        ])
+        await update.callback_query.edit_message_text(EMPTY_WEEK_MSG, reply_markup=keyboard, parse_mode='HTML')
+        return
+    
     # Об'єднуємо всі задачі для пагінації
     all_tasks_for_buttons = today_tasks + week_tasks
     total_tasks = len(all_tasks_for_buttons)
-    total_pages = (total_tasks + TASKS_PER_PAGE - 1) // TASKS_PER_PAGE if total_tasks > 0 else 0
+    total_pages = (total_tasks + TASKS_PER_PAGE - 1) // TASKS_PER_PAGE
     
     # Формуємо повідомлення
     message_text = f"📆 <b>Задачі на цьому тижні ({total_tasks})</b>\n"
@@ -2176,81 +2251,50 @@ async def show_tasks_week(update: Update, context: ContextTypes.DEFAULT_TYPE, us
         message_text += f"<i>Сторінка {page + 1} з {total_pages}</i>\n"
     message_text += "\n"
     
-    if not all_tasks_for_buttons:
-        message_text += "На цьому тижні задач немає."
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("⬅️ Меню", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, "menu"))]
-        ])
-    else:
-        # Обчислюємо індекси для поточної сторінки
-        start_idx = page * TASKS_PER_PAGE
-        end_idx = min(start_idx + TASKS_PER_PAGE, total_tasks)
-        tasks = all_tasks_for_buttons[start_idx:end_idx]
-        
-        keyboard_buttons = []
-        
-        # Відображаємо задачі поточної сторінки
-        for task in tasks:
-            task_title = task.get('title', 'Без назви')
-            message_text += f"⏳ <b>{task_title}</b>\n"
-            
-            if task.get('due_date'):
-                due_date_str = task['due_date'][:10] if len(task.get('due_date', '')) > 10 else task['due_date']
-                try:
-                    date_obj = datetime.strptime(due_date_str, '%Y-%m-%d')
-                    due_date_formatted = date_obj.strftime('%d.%m.%Y')
-                    # Визначаємо, чи це сьогодні
-                    task_date = date_obj.date()
-                    if task_date == today:
-                        due_date_formatted = f"📅 Сьогодні ({due_date_formatted})"
-                    else:
-                        due_date_formatted = f"📆 {due_date_formatted}"
-                except:
-                    due_date_formatted = f"📆 {due_date_str}"
-                message_text += f"{due_date_formatted}\n"
-            
-            if task.get('notes'):
-                notes = task['notes'][:80] + "..." if len(task.get('notes', '')) > 80 else task['notes']
-                message_text += f"📝 {notes}\n"
-            
-            if task.get('list_name'):
-                message_text += f"📋 {task['list_name']}\n"
-            
-            message_text += "\n"
+    # Обчислюємо індекси для поточної сторінки
+    start_idx = page * TASKS_PER_PAGE
+    end_idx = min(start_idx + TASKS_PER_PAGE, total_tasks)
+    tasks = all_tasks_for_buttons[start_idx:end_idx]
+    
+    keyboard_buttons = []
+    
+    # Відображаємо задачі поточної сторінки
+    for task in tasks:
+        task_title = task.get('title') or 'Без назви'
+        message_text += format_task_text(task, notes_limit=80, today=today)
+        
+        # Додаємо кнопку закриття для кожної задачі
+        if task_id := task.get('id'):
+            callback_data = csrf_manager.add_csrf_to_callback_data(user_id, f"complete_task:{task_id}")
+            # Перевіряємо обмеження 64 байти
+            MAX_CALLBACK_BYTES = 64
+            if len(callback_data.encode('utf-8')) > MAX_CALLBACK_BYTES:
+                # Якщо перевищує, використовуємо мапу
+                if user_id not in task_creation_state:
+                    task_creation_state[user_id] = {}
+                if 'task_completion_map' not in task_creation_state[user_id]:
+                    task_creation_state[user_id]['task_completion_map'] = {}
+                short_id = len(task_creation_state[user_id]['task_completion_map'])
+                task_creation_state[user_id]['task_completion_map'][short_id] = task_id
+                callback_data = csrf_manager.add_csrf_to_callback_data(user_id, f"complete_task_short:{short_id}")
             
-            # Додаємо кнопку закриття для кожної задачі
-            task_id = task.get('id')
-            if task_id:
-                callback_data = csrf_manager.add_csrf_to_callback_data(user_id, f"complete_task:{task_id}")
-                # Перевіряємо обмеження 64 байти
-                MAX_CALLBACK_BYTES = 64
-                if len(callback_data.encode('utf-8')) > MAX_CALLBACK_BYTES:
-                    # Якщо перевищує, використовуємо мапу
-                    if user_id not in task_creation_state:
-                        task_creation_state[user_id] = {}
-                    if 'task_completion_map' not in task_creation_state[user_id]:
-                        task_creation_state[user_id]['task_completion_map'] = {}
-                    short_id = len(task_creation_state[user_id]['task_completion_map'])
-                    task_creation_state[user_id]['task_completion_map'][short_id] = task_id
-                    callback_data = csrf_manager.add_csrf_to_callback_data(user_id, f"complete_task_short:{short_id}")
-                
-                # Обмежуємо довжину назви кнопки
-                button_text = f"✅ Закрити: {task_title[:30]}" if len(task_title) > 30 else f"✅ Закрити: {task_title}"
-                keyboard_buttons.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
-        
-        # Додаємо навігацію по сторінках, якщо є більше однієї сторінки
-        if total_pages > 1:
-            nav_buttons = []
-            if page > 0:
-                nav_buttons.append(InlineKeyboardButton("◀️ Попередня", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, f"tasks_week_page:{page - 1}")))
-            if page < total_pages - 1:
-                nav_buttons.append(InlineKeyboardButton("Наступна ▶️", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, f"tasks_week_page:{page + 1}")))
-            if nav_buttons:
-                keyboard_buttons.append(nav_buttons)
-        
-        # Додаємо кнопку "Меню" внизу
-        keyboard_buttons.append([InlineKeyboardButton("⬅️ Меню", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, "menu"))])
-        keyboard = InlineKeyboardMarkup(keyboard_buttons)
+            # Обмежуємо довжину назви кнопки
+            button_text = f"✅ Закрити: {task_title[:30]}" if len(task_title) > 30 else f"✅ Закрити: {task_title}"
+            keyboard_buttons.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
+    
+    # Додаємо навігацію по сторінках, якщо є більше однієї сторінки
+    if total_pages > 1:
+        nav_buttons = []
+        if page > 0:
+            nav_buttons.append(InlineKeyboardButton("◀️ Попередня", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, f"tasks_week_page:{page - 1}")))
+        if page < total_pages - 1:
+            nav_buttons.append(InlineKeyboardButton("Наступна ▶️", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, f"tasks_week_page:{page + 1}")))
+        if nav_buttons:
+            keyboard_buttons.append(nav_buttons)
+    
+    # Додаємо кнопку "Меню" внизу
+    keyboard_buttons.append([InlineKeyboardButton("⬅️ Меню", callback_data=csrf_manager.add_csrf_to_callback_data(user_id, "menu"))])
+    keyboard = InlineKeyboardMarkup(keyboard_buttons)
     
     await update.callback_query.edit_message_text(message_text, reply_markup=keyboard, parse_mode='HTML')
 
@@ -2282,15 +2326,14 @@ async def handle_task_completion(update: Update, context: ContextTypes.DEFAULT_T
         return
     
     # Закриваємо задачу
-    if task_manager.complete_task(task_id):
+    if await task_manager.complete_task_async(task_id):
         task_title = task.get('title', 'Задачу')
         await update.callback_query.answer(f"✅ Задачу '{task_title}' закрито", show_alert=False)
         
         # Визначаємо, чи задача на сьогодні, щоб показати правильний список
         today = datetime.now().date()
         task_due_date = None
-        if task.get('due_date'):
-            due_date_str = task['due_date'][:10] if len(task.get('due_date', '')) > 10 else task['due_date']
+        if due_date_str := (task.get('due_date') or '')[:10]:
             try:
                 task_due_date = datetime.strptime(due_date_str, '%Y-%m-%d').date()
             except:
@@ -2334,20 +2377,20 @@ def main():
         chat_manager = get_chat_manager()
         
         # Шукаємо активний чат для користувача
-        if user_id not in chat_active_for_user:
+        ticket_id = chat_active_for_user.get(user_id)
+        if ticket_id is None:
             # Перевіряємо, чи є активний чат в БД
-            with get_session() as session:
+            with get_read_session() as session:
                 from models import Ticket
                 tickets = session.query(Ticket).filter(Ticket.user_id == user_id).all()
                 for ticket in tickets:
                     if chat_manager.is_chat_active(ticket.id):
-                        chat_active_for_user[user_id] = ticket.id
+                        ticket_id = ticket.id
+                        chat_active_for_user.set(user_id, ticket_id)
                         break
         
         # Якщо знайдено активний чат
-        if user_id in chat_active_for_user:
-            ticket_id = chat_active_for_user[user_id]
-            
+        if ticket_id is not None:
             # Перевіряємо, чи чат дійсно активний
             if chat_manager.is_chat_active(ticket_id):
                 # Відправляємо повідомлення в чат
@@ -2357,7 +2400,7 @@ def main():
                     await update.message.reply_text("❌ Помилка відправки повідомлення.")
             else:
                 # Чат закрито, видаляємо зі стану
-                del chat_active_for_user[user_id]
+                chat_active_for_user.discard(user_id)
                 await update.message.reply_text("❌ Чат закрито. Ви не можете відправляти повідомлення.")
             return
 
@@ -2372,10 +2415,10 @@ def main():
 
             if step == 'name':
                 vr = input_validator.validate_guest_contact_name(text)
-                if not vr['valid']:
-                    await update.message.reply_text(vr['message'])
+                if not vr.valid:
+                    await update.message.reply_text(vr.message)
                     return
-                state['contact_name'] = vr['cleaned']
+                state['contact_name'] = vr.cleaned
                 state['step'] = 'phone'
                 await update.message.reply_text(
                     "📞 <b>Крок 2 з 3.</b> Введіть <b>номер телефону</b> для зв'язку.\n\n"
@@ -2387,10 +2430,10 @@ def main():
 
             if step == 'phone':
                 vr = input_validator.validate_guest_phone(text)
-                if not vr['valid']:
-                    await update.message.reply_text(vr['message'])
+                if not vr.valid:
+                    await update.message.reply_text(vr.message)
                     return
-                state['phone'] = vr['cleaned']
+                state['phone'] = vr.cleaned
                 state['step'] = 'time'
                 await update.message.reply_text(
                     "🕐 <b>Крок 3 з 3.</b> Коли вам зручно отримати дзвінок?\n\n"
@@ -2402,10 +2445,10 @@ def main():
 
             if step == 'time':
                 vr = input_validator.validate_guest_call_time(text)
-                if not vr['valid']:
-                    await update.message.reply_text(vr['message'])
+                if not vr.valid:
+                    await update.message.reply_text(vr.message)
                     return
-                preferred = vr['cleaned']
+                preferred = vr.cleaned
                 contact_name = state['contact_name']
                 phone = state['phone']
                 del guest_consultation_state[user_id]
@@ -2566,12 +2609,7 @@ def main():
         closed_count = chat_manager.auto_close_inactive_chats(hours=3)
         if closed_count > 0:
             # Очищаємо стан для закритих чатів
-            tickets_to_remove = []
-            for user_id, ticket_id in chat_active_for_user.items():
-                if not chat_manager.is_chat_active(ticket_id):
-                    tickets_to_remove.append(user_id)
-            for user_id in tickets_to_remove:
-                del chat_active_for_user[user_id]
+            chat_active_for_user.clear_inactive(chat_manager.is_chat_active)
     
     # Перевіряємо наявність JobQueue, придушуючи попередження
     with warnings.catch_warnings():
@@ -2585,7 +2623,6 @@ def main():
         # JobQueue не обов'язковий - CSRF токени очищаються при перевірці
         logger.log_info("CSRF токени будуть очищатися при перевірці (JobQueue не встановлено)")
         # Для автоматичного закриття чатів використовуємо threading
-        import threading
         def auto_close_thread():
             import time
             while True:
@@ -2595,12 +2632,7 @@ def main():
                     closed_count = chat_manager.auto_close_inactive_chats(hours=3)
                     if closed_count > 0:
                         # Очищаємо стан для закритих чатів
-                        tickets_to_remove = []
-                        for user_id, ticket_id in list(chat_active_for_user.items()):
-                            if not chat_manager.is_chat_active(ticket_id):
-                                tickets_to_remove.append(user_id)
-                        for user_id in tickets_to_remove:
-                            del chat_active_for_user[user_id]
+                        chat_active_for_user.clear_inactive(chat_manager.is_chat_active)
                 except Exception as e:
                     logger.log_error(f"Помилка автоматичного закриття чатів: {e}")
         
@@ -2609,61 +2641,74 @@ def main():
         logger.log_info("Автоматичне закриття неактивних чатів запущено через threading")
     
     # Ранкові сповіщення про завдання TO DO (персональний час для кожного користувача)
-    def send_morning_todo_notifications():
-        """Відправка ранкових сповіщень про завдання на сьогодні; кожен користувач отримує в свій заданий час"""
-        import time as time_module
+    def process_morning_todo_notifications(current_hm: str) -> None:
+        """Відправка ранкових сповіщень користувачам, у яких час сповіщення збігається з current_hm"""
         from notification_manager import get_notification_manager
         
         default_time = "09:00"
         
-        while True:
-            try:
-                time_module.sleep(60)  # Перевірка кожну хвилину
-                
-                now = datetime.now()
-                current_hm = now.strftime("%H:%M")
-                
-                task_manager = get_task_manager()
-                notification_manager = get_notification_manager()
-                header_text = get_bot_config("todo_morning_notification_header", "Задачи на сегодня")
-                # Нормалізація: старий український заголовок у конфігу — показувати російський
-                if header_text in ("Завдання на сьогодні", "Завдання на сьогодні:"):
-                    header_text = "Задачи на сегодня"
-                
-                with get_session() as session:
-                    users = session.query(User).filter(
-                        User.notifications_enabled == True,
-                        User.user_id > 0
-                    ).all()
-                    
-                    to_notify = [
-                        u for u in users
-                        if (u.morning_notification_time or default_time) == current_hm
-                    ]
-                    
-                    if not to_notify:
-                        continue
-                    
-                    today_tasks = task_manager.get_tasks_for_today()
-                    if not today_tasks:
-                        continue
-                    
-                    for user in to_notify:
-                        try:
-                            notification_manager.send_todo_tasks_notification(
-                                user_id=user.user_id,
-                                tasks=today_tasks,
-                                header_text=header_text
-                            )
-                        except Exception as e:
-                            logger.log_error(f"Помилка відправки ранкового звіту користувачу {user.user_id}: {e}")
-                
-            except Exception as e:
-                logger.log_error(f"Помилка в ранкових сповіщеннях про завдання: {e}")
-                time_module.sleep(3600)
+        task_manager = get_task_manager()
+        notification_manager = get_notification_manager()
+        header_text = get_bot_config("todo_morning_notification_header", "Задачи на сегодня")
+        # Нормалізація: старий український заголовок у конфігу — показувати російський
+        if header_text in ("Завдання на сьогодні", "Завдання на сьогодні:"):
+            header_text = "Задачи на сегодня"
+        
+        with get_read_session() as session:
+            users = session.query(User).filter(
+                User.notifications_enabled == True,
+                User.user_id > 0
+            ).all()
+            
+            to_notify = [
+                u for u in users
+                if (u.morning_notification_time or default_time) == current_hm
+            ]
+            
+            if not to_notify:
+                return
+            
+            today_tasks = task_manager.get_tasks_for_today()
+            if not today_tasks:
+                return
+            
+            # Помилки окремих отримувачів логуються всередині розсилки
+            notification_manager.broadcast_todo_tasks_notification(
+                user_ids=[user.user_id for user in to_notify],
+                tasks=today_tasks,
+                header_text=header_text
+            )
     
-    todo_thread = threading.Thread(target=send_morning_todo_notifications, daemon=True)
-    todo_thread.start()
+    async def morning_todo_callback(context: ContextTypes.DEFAULT_TYPE):
+        """Щохвилинна задача JobQueue для ранкових сповіщень"""
+        current_hm = datetime.now().strftime("%H:%M")
+        try:
+            # БД та HTTP-запити синхронні - виконуємо поза циклом подій
+            await asyncio.to_thread(process_morning_todo_notifications, current_hm)
+        except Exception as e:
+            logger.log_error(f"Помилка в ранкових сповіщеннях про завдання: {e}")
+    
+    if job_queue is not None:
+        # Час сповіщення задається окремо для кожного користувача, тому перевіряємо
+        # на початку кожної хвилини, а не одним run_daily
+        now = datetime.now()
+        first_run = (now.replace(second=0, microsecond=0) + timedelta(minutes=1) - now).total_seconds()
+        job_queue.run_repeating(morning_todo_callback, interval=60, first=first_run)
+    else:
+        def send_morning_todo_notifications():
+            """Резервний потік, якщо JobQueue не встановлено"""
+            import time as time_module
+            
+            while True:
+                try:
+                    time_module.sleep(60)  # Перевірка кожну хвилину
+                    process_morning_todo_notifications(datetime.now().strftime("%H:%M"))
+                except Exception as e:
+                    logger.log_error(f"Помилка в ранкових сповіщеннях про завдання: {e}")
+                    time_module.sleep(3600)
+        
+        todo_thread = threading.Thread(target=send_morning_todo_notifications, daemon=True)
+        todo_thread.start()
     logger.log_info("Ранкові сповіщення про завдання TO DO запущено")
     
     # Запускаємо бота
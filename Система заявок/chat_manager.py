@@ -387,7 +387,7 @@ class ChatManager:
                     return 0
                 
                 # Отримуємо інформацію про заявки для відправки повідомлень
-                tickets = session.query(Ticket).filter(
+                rows = session.query(Ticket.id, Ticket.user_id).filter(
                     Ticket.id.in_(inactive_ticket_ids)
                 ).all()
                 
@@ -399,11 +399,11 @@ class ChatManager:
                 session.commit()
                 
                 # Відправляємо повідомлення користувачам
-                for ticket in tickets:
+                for tid, uid in rows:
                     self.send_telegram_message(
-                        ticket.user_id,
-                        f"💬 <b>Чат автоматично закрито</b>\n\nЗаявка #{ticket.id}\n\nЧат закрито через неактивність (3 години).",
-                        ticket.id
+                        uid,
+                        f"💬 <b>Чат автоматично закрито</b>\n\nЗаявка #{tid}\n\nЧат закрито через неактивність (3 години).",
+                        tid
                     )
                 
                 logger.log_info(f"Автоматично закрито {len(inactive_ticket_ids)} неактивних чатів")
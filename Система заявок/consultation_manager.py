@@ -80,22 +80,14 @@ def notify_staff_about_consultation(
         (успішно, помилок)
     """
     nm = get_notification_manager()
-    ids = get_recipient_telegram_ids()
-    ok = 0
-    fail = 0
-    for uid in ids:
-        if nm.send_service_consultation_notification(
-            user_id=uid,
-            request_id=request_id,
-            contact_name=contact_name,
-            phone=phone,
-            preferred_call_time=preferred_call_time,
-            telegram_user_id=telegram_user_id,
-            telegram_username=telegram_username,
-            telegram_first_name=telegram_first_name,
-            telegram_last_name=telegram_last_name,
-        ):
-            ok += 1
-        else:
-            fail += 1
-    return ok, fail
+    return nm.broadcast_service_consultation_notification(
+        user_ids=get_recipient_telegram_ids(),
+        request_id=request_id,
+        contact_name=contact_name,
+        phone=phone,
+        preferred_call_time=preferred_call_time,
+        telegram_user_id=telegram_user_id,
+        telegram_username=telegram_username,
+        telegram_first_name=telegram_first_name,
+        telegram_last_name=telegram_last_name,
+    )
@@ -4,13 +4,16 @@
 Підтримка конкурентного доступу (веб + Telegram бот)
 """
 import os
-import time
 import json
+import asyncio
+from datetime import datetime
 from contextlib import contextmanager
-from typing import Optional, Generator
+from typing import Optional, Generator, Callable, TypeVar, Dict, Any, List, Tuple
 from sqlalchemy import create_engine, event, text, inspect
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import OperationalError, DatabaseError
+from werkzeug.security import generate_password_hash
 from dotenv import load_dotenv
 
 from models import Base, BotConfig, ServiceConsultationRequest  # ServiceConsultationRequest — реєстрація таблиці в metadata
@@ -19,6 +22,15 @@ from logger import logger
 # Завантажуємо змінні середовища
 load_dotenv("config.env")
 
+T = TypeVar('T')
+
+# Версія схеми БД (PRAGMA user_version для SQLite); збільшувати при додаванні нової міграції
+# або нової моделі - для актуальної версії init_db не виконує create_all
+SCHEMA_VERSION = 11
+
+# Таблиці, колонки яких перевіряють міграції
+MIGRATION_TABLES = ('users', 'companies', 'tickets', 'ticket_statuses', 'tasks', 'knowledge_base_notes', 'polls')
+
 
 class DatabaseManager:
     """Менеджер для роботи з базою даних"""
@@ -46,115 +58,269 @@ class DatabaseManager:
                 },
                 pool_size=10,
                 max_overflow=20,
-                pool_pre_ping=True,
+                # SQLite працює в процесі, з'єднання не "застарівають" як мережеві,
+                # тому SELECT 1 на кожне отримання з пулу зайвий
+                pool_pre_ping=False,
                 pool_recycle=3600,
                 echo=False
             )
             
+            # Розмір сторінки діє лише до першого запису в новий файл БД,
+            # тому задається один раз для першого з'єднання (до переходу в WAL)
+            @event.listens_for(self.engine, "first_connect")
+            def set_sqlite_page_size(dbapi_conn, connection_record):
+                cursor = dbapi_conn.cursor()
+                cursor.execute("PRAGMA page_size=4096")
+                cursor.close()
+            
             # Налаштування SQLite для конкурентного доступу
             @event.listens_for(self.engine, "connect")
             def set_sqlite_pragma(dbapi_conn, connection_record):
                 cursor = dbapi_conn.cursor()
                 cursor.execute("PRAGMA foreign_keys=ON")
                 cursor.execute("PRAGMA journal_mode=WAL")
-                cursor.execute("PRAGMA cache_size=10000")
+                cursor.execute("PRAGMA cache_size=-64000")  # 64 МБ
                 cursor.execute("PRAGMA synchronous=NORMAL")
                 cursor.execute("PRAGMA busy_timeout=30000")
+                cursor.execute("PRAGMA mmap_size=268435456")  # 256 МБ
+                cursor.execute("PRAGMA temp_store=MEMORY")
+                cursor.execute("PRAGMA wal_autocheckpoint=1000")
+                cursor.close()
+            
+            # Окремий engine лише для читання: у WAL читачі не чекають на транзакцію запису,
+            # тому read-only запити не займають з'єднання з пулу записуючого engine
+            self.read_engine = create_engine(
+                database_url,
+                connect_args={
+                    "check_same_thread": False,
+                    "timeout": 30,
+                },
+                pool_size=20,
+                max_overflow=0,
+                pool_pre_ping=False,
+                pool_recycle=3600,
+                echo=False
+            )
+            
+            @event.listens_for(self.read_engine, "connect")
+            def set_sqlite_read_pragma(dbapi_conn, connection_record):
+                set_sqlite_pragma(dbapi_conn, connection_record)
+                cursor = dbapi_conn.cursor()
+                cursor.execute("PRAGMA query_only=1")
                 cursor.close()
         else:
-            self.engine = create_engine(database_url, echo=False)
+            self.engine = create_engine(database_url, pool_pre_ping=True, pool_recycle=3600, echo=False)
+            self.read_engine = self.engine
         
         # Створюємо session factory
+        # autoflush: запити в межах сесії бачать щойно додані/змінені об'єкти без ручного flush();
+        # масові вставки йдуть через executemany / bulk-операції, а не через unit of work
+        # expire_on_commit=False: читання атрибутів після commit() (note.id тощо)
+        # не перечитує рядок з БД; сесії короткоживучі, тож застарілих даних не накопичується
         self.SessionLocal = sessionmaker(
             autocommit=False,
-            autoflush=False,
+            autoflush=True,
+            expire_on_commit=False,
             bind=self.engine
         )
+        # Сесія читання нічого не змінює, тож flush їй не потрібен
+        self.ReadSessionLocal = sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=self.read_engine
+        )
+        
+        # Ознака успішності міграцій поточного запуску init_db
+        self._migrations_ok = True
+        # Буфер логів міграцій на час спільної транзакції (None - логуємо одразу)
+        self._migration_log: Optional[List[Tuple[str, str]]] = None
         
         logger.log_info(f"Ініціалізовано підключення до БД: {database_url}")
     
     def init_db(self):
         """Створення всіх таблиць в БД"""
         try:
-            # Перевіряємо, чи таблиці вже існують
-            inspector = inspect(self.engine)
-            existing_tables = set(inspector.get_table_names())
-            
-            # Створюємо таблиці
-            Base.metadata.create_all(bind=self.engine)
-            
-            # Перевіряємо, чи були створені нові таблиці
-            inspector = inspect(self.engine)
-            new_tables = set(inspector.get_table_names())
-            created_tables = new_tables - existing_tables
-            
-            # Логуємо тільки якщо були створені нові таблиці
-            if created_tables:
-                logger.log_info(f"Створено нові таблиці БД: {', '.join(sorted(created_tables))}")
-            elif not existing_tables:
-                logger.log_info("Таблиці БД успішно створені")
-            
-            # Виконуємо міграції для додавання полів до існуючих таблиць
-            # Для нових БД всі поля вже створені через Base.metadata.create_all()
-            # Міграції мають перевірки на наявність колонок, тому безпечні
-            self.migrate_add_company_id_to_user()
-            self.migrate_add_is_vip_to_user()
-            self.migrate_add_color_to_ticket_status()
-            self.migrate_add_printer_service_enabled_to_company()
-            self.migrate_add_user_info_to_company()
-            self.migrate_add_executor_to_ticket()
-            self.migrate_create_user_printers_table()
-            self.migrate_create_tasks_table()
-            self.migrate_create_timers_table()
-            self.migrate_add_morning_notification_time_to_user()
-            self.migrate_add_new_clients_notifications_to_user()
-            self.migrate_add_phone_to_user()
-
-            # Заповнюємо справочник статусів (якщо таблиця порожня)
-            self.migrate_create_ticket_statuses()
-            
-            # Міграція для таблиці ticket_chats (створюється автоматично через Base.metadata.create_all)
-            # Додаємо перевірку для безпеки
-            self.migrate_create_ticket_chat_table()
-            
-            # Міграції для бази знань
-            self.migrate_add_commands_to_knowledge_base_notes()
-            self.migrate_create_knowledge_base_favorites_table()
+            schema_version = self._get_schema_version()
+            
+            if schema_version >= SCHEMA_VERSION:
+                # Схема актуальна: всі таблиці моделей вже існують, create_all та inspector не потрібні
+                snapshot = {'tables': set(Base.metadata.tables), 'columns': {}}
+            else:
+                # Перевіряємо, чи таблиці вже існують
+                inspector = inspect(self.engine)
+                existing_tables = set(inspector.get_table_names())
+                
+                # Створюємо таблиці
+                Base.metadata.create_all(bind=self.engine)
+                
+                # Один знімок схеми для всіх міграцій
+                snapshot = self._schema_snapshot()
+                created_tables = snapshot['tables'] - existing_tables
+                
+                # Логуємо тільки якщо були створені нові таблиці
+                if created_tables:
+                    logger.log_info(f"Створено нові таблиці БД: {', '.join(sorted(created_tables))}")
+                elif not existing_tables:
+                    logger.log_info("Таблиці БД успішно створені")
+                
+                # Виконуємо міграції для додавання полів до існуючих таблиць
+                # Для нових БД всі поля вже створені через Base.metadata.create_all()
+                # Міграції мають перевірки на наявність колонок, тому безпечні
+                # Усі міграції виконуються в одній транзакції (один коміт WAL замість кількох)
+                self._migrations_ok = True
+                self._migration_log = []
+                try:
+                    with self.engine.begin() as conn:
+                        self.migrate_add_company_id_to_user(snapshot, conn)
+                        self.migrate_add_is_vip_to_user(snapshot, conn)
+                        self.migrate_add_color_to_ticket_status(snapshot, conn)
+                        self.migrate_add_printer_service_enabled_to_company(snapshot, conn)
+                        self.migrate_add_user_info_to_company(snapshot, conn)
+                        self.migrate_add_executor_to_ticket(snapshot, conn)
+                        self.migrate_create_user_printers_table(snapshot)
+                        self.migrate_create_tasks_table(snapshot, conn)
+                        self.migrate_create_timers_table(snapshot)
+                        self.migrate_add_morning_notification_time_to_user(snapshot, conn)
+                        self.migrate_add_new_clients_notifications_to_user(snapshot, conn)
+                        self.migrate_add_phone_to_user(snapshot, conn)
+                        
+                        # Заповнюємо справочник статусів (якщо таблиця порожня)
+                        self.migrate_create_ticket_statuses(snapshot, conn)
+                        
+                        # Міграція для таблиці ticket_chats (створюється автоматично через Base.metadata.create_all)
+                        # Додаємо перевірку для безпеки
+                        self.migrate_create_ticket_chat_table(snapshot)
+                        
+                        # Міграції для бази знань
+                        self.migrate_add_commands_to_knowledge_base_notes(snapshot, conn)
+                        self.migrate_create_knowledge_base_favorites_table(snapshot)
+                        self.migrate_casefold_knowledge_base_tags(snapshot, conn)
+                        self.migrate_backfill_knowledge_base_tags(snapshot, conn)
+                        self.migrate_create_knowledge_base_fts(snapshot, conn)
+                        self.migrate_add_knowledge_base_favorites_index(snapshot, conn)
+                        self.migrate_add_knowledge_base_notes_category_index(snapshot, conn)
+                        
+                        # Унікальність сумісності принтер-картридж
+                        self.migrate_add_printer_cartridge_unique_index(snapshot, conn)
+                        
+                        # Складені індекси опитувань та оголошень
+                        self.migrate_add_poll_and_announcement_indexes(snapshot, conn)
+                        self.migrate_add_recipient_user_ids_to_polls(snapshot, conn)
+                        self.migrate_backfill_poll_recipients(snapshot, conn)
+                        self.migrate_add_active_sessions_partial_index(snapshot, conn)
+                        
+                        # Фіксуємо версію схеми лише якщо всі міграції пройшли без помилок
+                        if self._migrations_ok:
+                            self._set_schema_version(conn, SCHEMA_VERSION)
+                finally:
+                    # Транзакція завершена - тепер логи можна писати в БД
+                    self._flush_migration_log()
             
             # Створюємо адміністратора за замовчуванням, якщо його немає
-            self.create_default_admin()
+            self.create_default_admin(snapshot)
             
             # Створюємо налаштування резервного копіювання за замовчуванням
-            self.create_default_backup_settings()
+            self.create_default_backup_settings(snapshot)
 
             # Створюємо дефолтний прайс для калькулятора КП
-            self.create_default_quote_calculator_prices()
+            self.create_default_quote_calculator_prices(snapshot)
             
             return True
         except Exception as e:
             logger.log_error(f"Помилка створення таблиць БД: {e}")
             return False
     
-    def create_default_admin(self):
+    def _get_schema_version(self) -> int:
+        """Поточна версія схеми БД (PRAGMA user_version; 0 для інших СУБД)"""
+        if not self.database_url.startswith("sqlite"):
+            return 0
+        with self.engine.connect() as conn:
+            return conn.execute(text("PRAGMA user_version")).scalar() or 0
+    
+    def _set_schema_version(self, conn: Connection, version: int) -> None:
+        """Запис версії схеми БД у відкритій транзакції міграцій"""
+        if self.database_url.startswith("sqlite"):
+            conn.execute(text(f"PRAGMA user_version = {int(version)}"))
+    
+    def _log_migration(self, message: str, level: str = 'info') -> None:
+        """
+        Логування з міграції
+        
+        Поки відкрита спільна транзакція init_db, повідомлення буферизуються: logger пише
+        в таблицю logs окремим з'єднанням і чекав би busy_timeout на блокування запису.
+        
+        Args:
+            message: Повідомлення
+            level: info, warning або error
+        """
+        if self._migration_log is not None:
+            self._migration_log.append((level, message))
+        else:
+            getattr(logger, f"log_{level}")(message)
+    
+    def _flush_migration_log(self) -> None:
+        """Виведення буферизованих повідомлень міграцій (після завершення транзакції)"""
+        messages, self._migration_log = self._migration_log or [], None
+        for level, message in messages:
+            getattr(logger, f"log_{level}")(message)
+    
+    def _log_migration_error(self, message: str) -> None:
+        """Логування помилки міграції; версія схеми в такому разі не оновлюється"""
+        self._migrations_ok = False
+        self._log_migration(message, 'error')
+    
+    @contextmanager
+    def _migration_connection(self, conn: Optional[Connection] = None) -> Generator[Connection, None, None]:
+        """
+        З'єднання для міграції: спільне з init_db або власна транзакція
+        
+        Args:
+            conn: Відкрите з'єднання з транзакцією (якщо міграцію викликано з init_db)
+        """
+        if conn is not None:
+            yield conn
+            return
+        with self.engine.begin() as own_conn:
+            yield own_conn
+    
+    def _schema_snapshot(self) -> Dict[str, Any]:
+        """
+        Знімок схеми БД за один прохід inspector
+        
+        Returns:
+            {'tables': множина таблиць, 'columns': {таблиця: множина колонок}} для MIGRATION_TABLES
+        """
+        inspector = inspect(self.engine)
+        tables = set(inspector.get_table_names())
+        return {
+            'tables': tables,
+            'columns': {
+                table: {col['name'] for col in inspector.get_columns(table)}
+                for table in MIGRATION_TABLES if table in tables
+            },
+        }
+    
+    def create_default_admin(self, snapshot: Optional[Dict[str, Any]] = None):
         """Створення адміністратора за замовчуванням"""
         try:
-            from werkzeug.security import generate_password_hash
             from models import User
-            from datetime import datetime
             
             # Перевіряємо чи існує таблиця users
-            inspector = inspect(self.engine)
-            if 'users' not in inspector.get_table_names():
+            snapshot = snapshot or self._schema_snapshot()
+            if 'users' not in snapshot['tables']:
                 return
             
             with self.SessionLocal() as session:
-                # Перевіряємо чи є адміністратор
-                admin = session.query(User).filter(User.role == 'admin').first()
+                # Перевіряємо чи є адміністратор (лише потрібні колонки, без ORM-об'єкта)
+                admin = session.query(User.user_id, User.password_hash).filter(User.role == 'admin').first()
                 if admin:
                     # Якщо адмін існує, але без пароля - встановлюємо стандартний
                     if not admin.password_hash:
                         default_password = "admin123"
-                        admin.password_hash = generate_password_hash(default_password)
+                        session.query(User).filter(User.user_id == admin.user_id).update(
+                            {'password_hash': generate_password_hash(default_password)},
+                            synchronize_session=False
+                        )
                         session.commit()
                         logger.log_info(f"Встановлено стандартний пароль для адміністратора (User ID: {admin.user_id})")
                     return
@@ -190,14 +356,14 @@ class DatabaseManager:
         except Exception as e:
             logger.log_error(f"Помилка створення адміністратора за замовчуванням: {e}")
     
-    def create_default_backup_settings(self):
+    def create_default_backup_settings(self, snapshot: Optional[Dict[str, Any]] = None):
         """Створення налаштувань резервного копіювання за замовчуванням"""
         try:
             from models import BackupSettings
             
             # Перевіряємо чи існує таблиця backup_settings
-            inspector = inspect(self.engine)
-            if 'backup_settings' not in inspector.get_table_names():
+            snapshot = snapshot or self._schema_snapshot()
+            if 'backup_settings' not in snapshot['tables']:
                 return
             
             with self.SessionLocal() as session:
@@ -220,12 +386,12 @@ class DatabaseManager:
         except Exception as e:
             logger.log_error(f"Помилка створення налаштувань резервного копіювання: {e}")
 
-    def create_default_quote_calculator_prices(self) -> None:
+    def create_default_quote_calculator_prices(self, snapshot: Optional[Dict[str, Any]] = None) -> None:
         """Створення дефолтного прайсу для калькулятора КП (BotConfig)."""
         try:
             # Перевіряємо чи існує таблиця bot_config
-            inspector = inspect(self.engine)
-            if 'bot_config' not in inspector.get_table_names():
+            snapshot = snapshot or self._schema_snapshot()
+            if 'bot_config' not in snapshot['tables']:
                 return
 
             default_prices = {
@@ -284,54 +450,45 @@ class DatabaseManager:
         except Exception as e:
             logger.log_error(f"Помилка створення дефолтного прайсу калькулятора КП: {e}")
     
-    def migrate_add_company_id_to_user(self):
+    def migrate_add_company_id_to_user(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: додавання колонки company_id до таблиці users"""
         try:
-            with self.engine.begin() as conn:
-                inspector = inspect(self.engine)
-                
-                if 'users' not in inspector.get_table_names():
-                    return
-                
-                columns = [col['name'] for col in inspector.get_columns('users')]
-                
-                if 'company_id' not in columns:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'users' not in snapshot['tables']:
+                return
+            
+            if 'company_id' not in snapshot['columns']['users']:
+                with self._migration_connection(conn) as conn:
                     conn.execute(text("ALTER TABLE users ADD COLUMN company_id INTEGER"))
-                    logger.log_info("Додано колонку company_id до users")
+                self._log_migration("Додано колонку company_id до users")
         except Exception as e:
-            logger.log_error(f"Помилка міграції додавання company_id: {e}")
+            self._log_migration_error(f"Помилка міграції додавання company_id: {e}")
     
-    def migrate_add_is_vip_to_user(self):
+    def migrate_add_is_vip_to_user(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: додавання колонки is_vip до таблиці users"""
         try:
-            with self.engine.begin() as conn:
-                inspector = inspect(self.engine)
-                
-                if 'users' not in inspector.get_table_names():
-                    return
-                
-                columns = [col['name'] for col in inspector.get_columns('users')]
-                
-                if 'is_vip' not in columns:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'users' not in snapshot['tables']:
+                return
+            
+            if 'is_vip' not in snapshot['columns']['users']:
+                with self._migration_connection(conn) as conn:
                     conn.execute(text("ALTER TABLE users ADD COLUMN is_vip BOOLEAN DEFAULT 0"))
-                    logger.log_info("Додано колонку is_vip до users")
+                self._log_migration("Додано колонку is_vip до users")
         except Exception as e:
-            logger.log_error(f"Помилка міграції додавання is_vip: {e}")
+            self._log_migration_error(f"Помилка міграції додавання is_vip: {e}")
     
-    def migrate_create_ticket_statuses(self):
+    def migrate_create_ticket_statuses(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: створення та заповнення справочника статусів"""
         try:
-            from models import TicketStatus
+            snapshot = snapshot or self._schema_snapshot()
+            if 'ticket_statuses' not in snapshot['tables']:
+                # Таблиця буде створена через Base.metadata.create_all
+                return
             
-            with self.get_session() as session:
-                # Перевіряємо, чи таблиця вже існує та чи є дані
-                inspector = inspect(self.engine)
-                if 'ticket_statuses' not in inspector.get_table_names():
-                    # Таблиця буде створена через Base.metadata.create_all
-                    return
-                
+            with self._migration_connection(conn) as conn:
                 # Використовуємо raw SQL для перевірки, щоб уникнути проблем з відсутніми полями
-                result = session.execute(text("SELECT COUNT(*) FROM ticket_statuses"))
+                result = conn.execute(text("SELECT COUNT(*) FROM ticket_statuses"))
                 existing_count = result.scalar()
                 if existing_count > 0:
                     return  # Дані вже є
@@ -355,263 +512,557 @@ class DatabaseManager:
                     {'code': 'DRAFT', 'name_ua': 'Чернетка', 'sort_order': 0},
                 ]
                 
-                for status_data in default_statuses:
-                    status = TicketStatus(**status_data)
-                    session.add(status)
-                
-                session.commit()
-                logger.log_info(f"Створено {len(default_statuses)} статусів заявок")
+                # Один executemany; INSERT OR IGNORE робить сідинг ідемпотентним
+                # при паралельному старті кількох процесів
+                now = datetime.now()
+                conn.execute(
+                    text(
+                        "INSERT OR IGNORE INTO ticket_statuses "
+                        "(code, name_ua, sort_order, is_active, created_at, updated_at) "
+                        "VALUES (:code, :name_ua, :sort_order, 1, :now, :now)"
+                    ),
+                    [{**status, 'now': now} for status in default_statuses]
+                )
+                self._log_migration(f"Створено {len(default_statuses)} статусів заявок")
         except Exception as e:
-            logger.log_error(f"Помилка міграції створення статусів: {e}")
+            self._log_migration_error(f"Помилка міграції створення статусів: {e}")
     
-    def migrate_add_printer_service_enabled_to_company(self):
+    def migrate_add_printer_service_enabled_to_company(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: додавання колонки printer_service_enabled до таблиці companies"""
         try:
-            with self.engine.begin() as conn:
-                inspector = inspect(self.engine)
-                
-                if 'companies' not in inspector.get_table_names():
-                    return
-                
-                columns = [col['name'] for col in inspector.get_columns('companies')]
-                
-                if 'printer_service_enabled' not in columns:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'companies' not in snapshot['tables']:
+                return
+            
+            if 'printer_service_enabled' not in snapshot['columns']['companies']:
+                with self._migration_connection(conn) as conn:
                     conn.execute(text("ALTER TABLE companies ADD COLUMN printer_service_enabled BOOLEAN DEFAULT 1"))
-                    logger.log_info("Додано колонку printer_service_enabled до companies")
+                self._log_migration("Додано колонку printer_service_enabled до companies")
         except Exception as e:
-            logger.log_error(f"Помилка міграції додавання printer_service_enabled: {e}")
+            self._log_migration_error(f"Помилка міграції додавання printer_service_enabled: {e}")
     
-    def migrate_add_color_to_ticket_status(self):
+    def migrate_add_color_to_ticket_status(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: додавання колонки color до таблиці ticket_statuses"""
         try:
-            with self.engine.begin() as conn:
-                inspector = inspect(self.engine)
-                
-                if 'ticket_statuses' not in inspector.get_table_names():
-                    return
-                
-                columns = [col['name'] for col in inspector.get_columns('ticket_statuses')]
-                
-                if 'color' not in columns:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'ticket_statuses' not in snapshot['tables']:
+                return
+            
+            if 'color' not in snapshot['columns']['ticket_statuses']:
+                with self._migration_connection(conn) as conn:
                     conn.execute(text("ALTER TABLE ticket_statuses ADD COLUMN color VARCHAR(50)"))
-                    logger.log_info("Додано колонку color до ticket_statuses")
+                self._log_migration("Додано колонку color до ticket_statuses")
         except Exception as e:
-            logger.log_error(f"Помилка міграції додавання color: {e}")
+            self._log_migration_error(f"Помилка міграції додавання color: {e}")
     
-    def migrate_create_ticket_chat_table(self):
+    def migrate_create_ticket_chat_table(self, snapshot: Optional[Dict[str, Any]] = None):
         """Міграція: створення таблиці ticket_chats (створюється автоматично через Base.metadata.create_all)"""
         try:
-            inspector = inspect(self.engine)
-            if 'ticket_chats' not in inspector.get_table_names():
+            snapshot = snapshot or self._schema_snapshot()
+            if 'ticket_chats' not in snapshot['tables']:
                 # Таблиця буде створена через Base.metadata.create_all в init_db
-                logger.log_info("Таблиця ticket_chats буде створена через Base.metadata.create_all")
+                self._log_migration("Таблиця ticket_chats буде створена через Base.metadata.create_all")
             # Якщо таблиця вже існує - це нормально, не логуємо
         except Exception as e:
-            logger.log_error(f"Помилка міграції створення ticket_chats: {e}")
+            self._log_migration_error(f"Помилка міграції створення ticket_chats: {e}")
     
-    def migrate_add_user_info_to_company(self):
+    def migrate_add_user_info_to_company(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: додавання поля user_info до таблиці companies"""
         try:
-            with self.engine.begin() as conn:
-                inspector = inspect(self.engine)
-                if 'companies' in inspector.get_table_names():
-                    columns = [col['name'] for col in inspector.get_columns('companies')]
-                    
-                    if 'user_info' not in columns:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'companies' in snapshot['tables']:
+                if 'user_info' not in snapshot['columns']['companies']:
+                    with self._migration_connection(conn) as conn:
                         conn.execute(text("ALTER TABLE companies ADD COLUMN user_info TEXT"))
-                        logger.log_info("Додано колонку user_info до companies")
+                    self._log_migration("Додано колонку user_info до companies")
         except Exception as e:
-            logger.log_error(f"Помилка міграції додавання user_info: {e}")
+            self._log_migration_error(f"Помилка міграції додавання user_info: {e}")
     
-    def migrate_add_executor_to_ticket(self):
+    def migrate_add_executor_to_ticket(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: додавання поля executor_id до таблиці tickets"""
         try:
-            with self.engine.begin() as conn:
-                inspector = inspect(self.engine)
-                if 'tickets' in inspector.get_table_names():
-                    columns = [col['name'] for col in inspector.get_columns('tickets')]
-                    
-                    if 'executor_id' not in columns:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'tickets' in snapshot['tables']:
+                if 'executor_id' not in snapshot['columns']['tickets']:
+                    with self._migration_connection(conn) as conn:
                         conn.execute(text("ALTER TABLE tickets ADD COLUMN executor_id INTEGER"))
                         # Додаємо індекс для executor_id
                         conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tickets_executor_id ON tickets(executor_id)"))
-                        logger.log_info("Додано колонку executor_id до tickets")
+                    self._log_migration("Додано колонку executor_id до tickets")
         except Exception as e:
-            logger.log_error(f"Помилка міграції додавання executor_id: {e}")
+            self._log_migration_error(f"Помилка міграції додавання executor_id: {e}")
     
-    def migrate_create_user_printers_table(self):
+    def migrate_create_user_printers_table(self, snapshot: Optional[Dict[str, Any]] = None):
         """Міграція: створення таблиці user_printers для зв'язку користувач-принтер"""
         try:
-            inspector = inspect(self.engine)
-            if 'user_printers' in inspector.get_table_names():
+            snapshot = snapshot or self._schema_snapshot()
+            if 'user_printers' in snapshot['tables']:
                 return  # Таблиця вже існує
             
             # Таблиця буде створена через Base.metadata.create_all()
             # Ця міграція лише для логування
-            logger.log_info("Таблиця user_printers буде створена через Base.metadata.create_all()")
+            self._log_migration("Таблиця user_printers буде створена через Base.metadata.create_all()")
         except Exception as e:
-            logger.log_error(f"Помилка міграції створення user_printers: {e}")
+            self._log_migration_error(f"Помилка міграції створення user_printers: {e}")
     
-    def migrate_create_tasks_table(self):
+    def migrate_create_tasks_table(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: створення таблиці tasks для модуля TO DO"""
         try:
-            inspector = inspect(self.engine)
-            if 'tasks' in inspector.get_table_names():
+            snapshot = snapshot or self._schema_snapshot()
+            if 'tasks' in snapshot['tables']:
                 # Перевіряємо, чи є поле is_important
-                columns = [col['name'] for col in inspector.get_columns('tasks')]
-                if 'is_important' not in columns:
+                if 'is_important' not in snapshot['columns']['tasks']:
                     # Додаємо поле is_important
-                    with self.engine.connect() as conn:
+                    with self._migration_connection(conn) as conn:
                         conn.execute(text("ALTER TABLE tasks ADD COLUMN is_important BOOLEAN DEFAULT 0"))
-                        conn.commit()
-                    logger.log_info("Додано поле is_important до таблиці tasks")
+                    self._log_migration("Додано поле is_important до таблиці tasks")
                 return
             
             # Таблиця буде створена через Base.metadata.create_all()
             # Ця міграція лише для логування
-            logger.log_info("Таблиця tasks буде створена через Base.metadata.create_all()")
+            self._log_migration("Таблиця tasks буде створена через Base.metadata.create_all()")
         except Exception as e:
-            logger.log_error(f"Помилка міграції створення tasks: {e}")
+            self._log_migration_error(f"Помилка міграції створення tasks: {e}")
     
-    def migrate_create_timers_table(self):
+    def migrate_create_timers_table(self, snapshot: Optional[Dict[str, Any]] = None):
         """Міграція: створення таблиці timers"""
         try:
-            inspector = inspect(self.engine)
-            if 'timers' in inspector.get_table_names():
+            snapshot = snapshot or self._schema_snapshot()
+            if 'timers' in snapshot['tables']:
                 # Таблиця вже існує
                 return
             
             # Таблиця буде створена через Base.metadata.create_all()
             # Ця міграція лише для логування
-            logger.log_info("Таблиця timers буде створена через Base.metadata.create_all()")
+            self._log_migration("Таблиця timers буде створена через Base.metadata.create_all()")
         except Exception as e:
-            logger.log_error(f"Помилка міграції створення timers: {e}")
+            self._log_migration_error(f"Помилка міграції створення timers: {e}")
     
-    def migrate_add_morning_notification_time_to_user(self):
+    def migrate_add_morning_notification_time_to_user(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: додавання колонки morning_notification_time до таблиці users"""
         try:
-            with self.engine.begin() as conn:
-                inspector = inspect(self.engine)
-                if 'users' not in inspector.get_table_names():
-                    return
-                columns = [col['name'] for col in inspector.get_columns('users')]
-                if 'morning_notification_time' not in columns:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'users' not in snapshot['tables']:
+                return
+            if 'morning_notification_time' not in snapshot['columns']['users']:
+                with self._migration_connection(conn) as conn:
                     conn.execute(text("ALTER TABLE users ADD COLUMN morning_notification_time VARCHAR(5)"))
-                    logger.log_info("Додано колонку morning_notification_time до users")
+                self._log_migration("Додано колонку morning_notification_time до users")
         except Exception as e:
-            logger.log_error(f"Помилка міграції додавання morning_notification_time: {e}")
+            self._log_migration_error(f"Помилка міграції додавання morning_notification_time: {e}")
 
-    def migrate_add_new_clients_notifications_to_user(self):
+    def migrate_add_new_clients_notifications_to_user(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: додавання колонки new_clients_notifications_enabled до таблиці users"""
         try:
-            with self.engine.begin() as conn:
-                inspector = inspect(self.engine)
-                if 'users' not in inspector.get_table_names():
-                    return
-                columns = [col['name'] for col in inspector.get_columns('users')]
-                if 'new_clients_notifications_enabled' not in columns:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'users' not in snapshot['tables']:
+                return
+            if 'new_clients_notifications_enabled' not in snapshot['columns']['users']:
+                with self._migration_connection(conn) as conn:
                     conn.execute(
                         text(
                             "ALTER TABLE users ADD COLUMN new_clients_notifications_enabled "
                             "BOOLEAN NOT NULL DEFAULT 0"
                         )
                     )
-                    logger.log_info("Додано колонку new_clients_notifications_enabled до users")
+                self._log_migration("Додано колонку new_clients_notifications_enabled до users")
         except Exception as e:
-            logger.log_error(f"Помилка міграції new_clients_notifications_enabled: {e}")
+            self._log_migration_error(f"Помилка міграції new_clients_notifications_enabled: {e}")
 
-    def migrate_add_phone_to_user(self):
+    def migrate_add_phone_to_user(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: додавання колонки phone до таблиці users"""
         try:
-            with self.engine.begin() as conn:
-                inspector = inspect(self.engine)
-                if 'users' not in inspector.get_table_names():
-                    return
-                columns = [col['name'] for col in inspector.get_columns('users')]
-                if 'phone' not in columns:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'users' not in snapshot['tables']:
+                return
+            if 'phone' not in snapshot['columns']['users']:
+                with self._migration_connection(conn) as conn:
                     conn.execute(text("ALTER TABLE users ADD COLUMN phone VARCHAR(50)"))
                     conn.execute(text("CREATE INDEX IF NOT EXISTS ix_users_phone ON users(phone)"))
-                    logger.log_info("Додано колонку phone до users")
+                self._log_migration("Додано колонку phone до users")
         except Exception as e:
-            logger.log_error(f"Помилка міграції додавання phone: {e}")
+            self._log_migration_error(f"Помилка міграції додавання phone: {e}")
 
-    def migrate_add_commands_to_knowledge_base_notes(self):
+    def migrate_add_commands_to_knowledge_base_notes(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
         """Міграція: додавання колонки commands до таблиці knowledge_base_notes"""
         try:
-            with self.engine.begin() as conn:
-                inspector = inspect(self.engine)
-                if 'knowledge_base_notes' in inspector.get_table_names():
-                    columns = [col['name'] for col in inspector.get_columns('knowledge_base_notes')]
-                    
-                    if 'commands' not in columns:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'knowledge_base_notes' in snapshot['tables']:
+                if 'commands' not in snapshot['columns']['knowledge_base_notes']:
+                    with self._migration_connection(conn) as conn:
                         conn.execute(text("ALTER TABLE knowledge_base_notes ADD COLUMN commands TEXT"))
-                        logger.log_info("Додано колонку commands до knowledge_base_notes")
+                    self._log_migration("Додано колонку commands до knowledge_base_notes")
         except Exception as e:
-            logger.log_error(f"Помилка міграції додавання commands до knowledge_base_notes: {e}")
+            self._log_migration_error(f"Помилка міграції додавання commands до knowledge_base_notes: {e}")
     
-    def migrate_create_knowledge_base_favorites_table(self):
+    def migrate_create_knowledge_base_favorites_table(self, snapshot: Optional[Dict[str, Any]] = None):
         """Міграція: створення таблиці knowledge_base_favorites для закладок"""
         try:
-            inspector = inspect(self.engine)
-            if 'knowledge_base_favorites' in inspector.get_table_names():
+            snapshot = snapshot or self._schema_snapshot()
+            if 'knowledge_base_favorites' in snapshot['tables']:
                 # Таблиця вже існує
                 return
             
             # Таблиця буде створена через Base.metadata.create_all()
             # Ця міграція лише для логування
-            logger.log_info("Таблиця knowledge_base_favorites буде створена через Base.metadata.create_all()")
+            self._log_migration("Таблиця knowledge_base_favorites буде створена через Base.metadata.create_all()")
         except Exception as e:
-            logger.log_error(f"Помилка міграції створення knowledge_base_favorites: {e}")
+            self._log_migration_error(f"Помилка міграції створення knowledge_base_favorites: {e}")
+    
+    def migrate_casefold_knowledge_base_tags(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
+        """Міграція: очищення довідника тегів, заповненого без нормалізації регістру (перезаповнює backfill)"""
+        try:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'knowledge_base_tags' not in snapshot['tables'] or 'knowledge_base_note_tags' not in snapshot['tables']:
+                return
+            
+            with self._migration_connection(conn) as conn:
+                names = conn.execute(text("SELECT name FROM knowledge_base_tags")).scalars()
+                if all(name == name.casefold() for name in names):
+                    return
+                
+                conn.execute(text("DELETE FROM knowledge_base_note_tags"))
+                conn.execute(text("DELETE FROM knowledge_base_tags"))
+                self._log_migration("Довідник тегів бази знань очищено для перезаповнення в нормалізованому регістрі")
+        except Exception as e:
+            self._log_migration_error(f"Помилка міграції нормалізації тегів бази знань: {e}")
+    
+    def migrate_backfill_knowledge_base_tags(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
+        """Міграція: заповнення довідника тегів та зв'язків з рядків tags існуючих нотаток"""
+        try:
+            from knowledge_base_manager import split_tags
+            
+            snapshot = snapshot or self._schema_snapshot()
+            if 'knowledge_base_note_tags' not in snapshot['tables'] or 'knowledge_base_notes' not in snapshot['tables']:
+                return
+            
+            with self._migration_connection(conn) as conn:
+                if conn.execute(text("SELECT 1 FROM knowledge_base_note_tags LIMIT 1")).first():
+                    return  # Зв'язки вже заповнені
+                
+                note_tags = {
+                    note_id: split_tags(tags)
+                    for note_id, tags in conn.execute(text(
+                        "SELECT id, tags FROM knowledge_base_notes WHERE tags IS NOT NULL AND tags != ''"
+                    ))
+                }
+                names = {name for tag_list in note_tags.values() for name in tag_list}
+                if not names:
+                    return
+                
+                conn.execute(
+                    text("INSERT INTO knowledge_base_tags (name) VALUES (:name) ON CONFLICT(name) DO NOTHING"),
+                    [{'name': name} for name in names]
+                )
+                tag_ids = dict(conn.execute(text("SELECT name, id FROM knowledge_base_tags")).all())
+                links = [
+                    {'note_id': note_id, 'tag_id': tag_ids[name]}
+                    for note_id, tag_list in note_tags.items() for name in tag_list
+                ]
+                conn.execute(
+                    text("INSERT INTO knowledge_base_note_tags (note_id, tag_id) VALUES (:note_id, :tag_id)"),
+                    links
+                )
+                self._log_migration(f"Заповнено теги бази знань: {len(names)} тегів, {len(links)} зв'язків")
+        except Exception as e:
+            self._log_migration_error(f"Помилка міграції заповнення тегів бази знань: {e}")
+    
+    def migrate_create_knowledge_base_fts(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
+        """Міграція: FTS5-індекс (trigram) для підрядкового пошуку по нотатках бази знань"""
+        if not self.database_url.startswith("sqlite"):
+            return
+        try:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'knowledge_base_notes' not in snapshot['tables'] or 'knowledge_base_notes_fts' in snapshot['tables']:
+                return
+            
+            with self._migration_connection(conn) as conn:
+                # External content: текст зберігається лише в knowledge_base_notes, FTS тримає індекс триграм
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE knowledge_base_notes_fts USING fts5("
+                    "title, content, tags, content='knowledge_base_notes', content_rowid='id', tokenize='trigram')"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER knowledge_base_notes_fts_ai AFTER INSERT ON knowledge_base_notes BEGIN "
+                    "INSERT INTO knowledge_base_notes_fts(rowid, title, content, tags) "
+                    "VALUES (new.id, new.title, new.content, new.tags); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER knowledge_base_notes_fts_ad AFTER DELETE ON knowledge_base_notes BEGIN "
+                    "INSERT INTO knowledge_base_notes_fts(knowledge_base_notes_fts, rowid, title, content, tags) "
+                    "VALUES ('delete', old.id, old.title, old.content, old.tags); END"
+                ))
+                conn.execute(text(
+                    "CREATE TRIGGER knowledge_base_notes_fts_au AFTER UPDATE OF title, content, tags ON knowledge_base_notes BEGIN "
+                    "INSERT INTO knowledge_base_notes_fts(knowledge_base_notes_fts, rowid, title, content, tags) "
+                    "VALUES ('delete', old.id, old.title, old.content, old.tags); "
+                    "INSERT INTO knowledge_base_notes_fts(rowid, title, content, tags) "
+                    "VALUES (new.id, new.title, new.content, new.tags); END"
+                ))
+                conn.execute(text("INSERT INTO knowledge_base_notes_fts(knowledge_base_notes_fts) VALUES ('rebuild')"))
+            self._log_migration("Створено FTS-індекс knowledge_base_notes_fts")
+        except Exception as e:
+            # Збірка SQLite без FTS5/trigram (< 3.34): пошук працює через LIKE, міграцію не вважаємо провальною
+            self._log_migration(f"FTS-індекс бази знань недоступний, пошук через LIKE: {e}", 'warning')
+    
+    def migrate_add_knowledge_base_favorites_index(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
+        """Міграція: покриваючий індекс (user_id, created_at DESC, note_id) для списку закладок"""
+        try:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'knowledge_base_favorites' not in snapshot['tables']:
+                return
+            
+            with self._migration_connection(conn) as conn:
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_kb_fav_user_created "
+                    "ON knowledge_base_favorites(user_id, created_at DESC, note_id)"
+                ))
+        except Exception as e:
+            self._log_migration_error(f"Помилка міграції індексу закладок: {e}")
+    
+    def migrate_add_knowledge_base_notes_category_index(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
+        """Міграція: індекс (category, updated_at DESC, id DESC) для списку нотаток з фільтром категорії"""
+        try:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'knowledge_base_notes' not in snapshot['tables']:
+                return
+            
+            with self._migration_connection(conn) as conn:
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_kb_notes_category_updated "
+                    "ON knowledge_base_notes(category, updated_at DESC, id DESC)"
+                ))
+        except Exception as e:
+            self._log_migration_error(f"Помилка міграції індексу категорій нотаток: {e}")
+    
+    def migrate_add_printer_cartridge_unique_index(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
+        """Міграція: унікальний індекс (printer_id, cartridge_type_id) у printer_cartridge_compatibility"""
+        try:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'printer_cartridge_compatibility' not in snapshot['tables']:
+                return
+            
+            with self._migration_connection(conn) as conn:
+                # Прибираємо дублікати, інакше унікальний індекс не створиться
+                result = conn.execute(text(
+                    "DELETE FROM printer_cartridge_compatibility WHERE id NOT IN ("
+                    "SELECT MIN(id) FROM printer_cartridge_compatibility "
+                    "GROUP BY printer_id, cartridge_type_id)"
+                ))
+                if result.rowcount:
+                    self._log_migration(f"Видалено {result.rowcount} дублікатів сумісності принтер-картридж")
+                conn.execute(text(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS uq_printer_cartridge "
+                    "ON printer_cartridge_compatibility(printer_id, cartridge_type_id)"
+                ))
+        except Exception as e:
+            self._log_migration_error(f"Помилка міграції унікального індексу сумісності: {e}")
+    
+    def migrate_add_poll_and_announcement_indexes(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
+        """Міграція: унікальні (poll_id, user_id) / (announcement_id, recipient_user_id) та (poll_id, option_id)"""
+        try:
+            snapshot = snapshot or self._schema_snapshot()
+            
+            with self._migration_connection(conn) as conn:
+                if 'poll_responses' in snapshot['tables']:
+                    # Лишаємо останню відповідь користувача, інакше унікальний індекс не створиться
+                    result = conn.execute(text(
+                        "DELETE FROM poll_responses WHERE id NOT IN ("
+                        "SELECT MAX(id) FROM poll_responses GROUP BY poll_id, user_id)"
+                    ))
+                    if result.rowcount:
+                        self._log_migration(f"Видалено {result.rowcount} дублікатів відповідей на опитування")
+                    conn.execute(text(
+                        "CREATE UNIQUE INDEX IF NOT EXISTS ix_poll_responses_poll_user "
+                        "ON poll_responses(poll_id, user_id)"
+                    ))
+                    conn.execute(text(
+                        "CREATE INDEX IF NOT EXISTS ix_poll_responses_poll_option "
+                        "ON poll_responses(poll_id, option_id)"
+                    ))
+                    # Одноколонковий індекс покривається префіксом складених
+                    conn.execute(text("DROP INDEX IF EXISTS ix_poll_responses_poll_id"))
+                
+                if 'announcement_recipients' in snapshot['tables']:
+                    result = conn.execute(text(
+                        "DELETE FROM announcement_recipients WHERE id NOT IN ("
+                        "SELECT MIN(id) FROM announcement_recipients GROUP BY announcement_id, recipient_user_id)"
+                    ))
+                    if result.rowcount:
+                        self._log_migration(f"Видалено {result.rowcount} дублікатів отримувачів оголошень")
+                    conn.execute(text(
+                        "CREATE UNIQUE INDEX IF NOT EXISTS ix_ann_recip_ann_user "
+                        "ON announcement_recipients(announcement_id, recipient_user_id)"
+                    ))
+                    conn.execute(text("DROP INDEX IF EXISTS ix_announcement_recipients_announcement_id"))
+        except Exception as e:
+            self._log_migration_error(f"Помилка міграції індексів опитувань та оголошень: {e}")
+    
+    def migrate_add_recipient_user_ids_to_polls(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
+        """Міграція: повернення колонки recipient_user_ids до polls (БД, створені без неї)"""
+        try:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'polls' not in snapshot['tables']:
+                return
+            if 'recipient_user_ids' not in snapshot['columns']['polls']:
+                with self._migration_connection(conn) as conn:
+                    conn.execute(text("ALTER TABLE polls ADD COLUMN recipient_user_ids TEXT"))
+                self._log_migration("Додано колонку recipient_user_ids до polls")
+        except Exception as e:
+            self._log_migration_error(f"Помилка міграції додавання recipient_user_ids до polls: {e}")
+    
+    def migrate_backfill_poll_recipients(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
+        """Міграція: перенесення JSON-списку polls.recipient_user_ids у таблицю poll_recipients"""
+        try:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'poll_recipients' not in snapshot['tables'] or 'polls' not in snapshot['tables']:
+                return
+            if 'recipient_user_ids' not in snapshot['columns'].get('polls', set()):
+                return
+            
+            with self._migration_connection(conn) as conn:
+                # ID видалених користувачів не переносяться (зовнішній ключ), але лишаються у старій колонці:
+                # її не очищаємо - звіт за нею відрізняє "список порожній" від "списку не було".
+                # Опитування, що вже мають рядки (перенесені або надіслані повторно), не чіпаємо
+                result = conn.execute(text(
+                    "INSERT OR IGNORE INTO poll_recipients (poll_id, user_id, sent_at) "
+                    "SELECT polls.id, CAST(recipients.value AS INTEGER), polls.created_at "
+                    "FROM polls, json_each(polls.recipient_user_ids) AS recipients "
+                    "WHERE polls.recipient_user_ids IS NOT NULL AND json_valid(polls.recipient_user_ids) "
+                    "AND CAST(recipients.value AS INTEGER) IN (SELECT user_id FROM users) "
+                    "AND NOT EXISTS (SELECT 1 FROM poll_recipients WHERE poll_recipients.poll_id = polls.id)"
+                ))
+                if result.rowcount:
+                    self._log_migration(f"Перенесено {result.rowcount} отримувачів опитувань у poll_recipients")
+        except Exception as e:
+            self._log_migration_error(f"Помилка міграції отримувачів опитувань: {e}")
+    
+    def migrate_add_active_sessions_partial_index(self, snapshot: Optional[Dict[str, Any]] = None, conn: Optional[Connection] = None):
+        """Міграція: частковий індекс (user_id, last_activity) WHERE is_active у active_sessions"""
+        try:
+            snapshot = snapshot or self._schema_snapshot()
+            if 'active_sessions' not in snapshot['tables']:
+                return
+            
+            with self._migration_connection(conn) as conn:
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_active_sessions_active_last "
+                    "ON active_sessions(user_id, last_activity) WHERE is_active = 1"
+                ))
+                conn.execute(text("DROP INDEX IF EXISTS ix_active_sessions_is_active"))
+        except Exception as e:
+            self._log_migration_error(f"Помилка міграції індексу активних сесій: {e}")
     
     @contextmanager
-    def get_session(self, max_retries: int = 3) -> Generator[Session, None, None]:
+    def get_session(self) -> Generator[Session, None, None]:
         """
-        Context manager для отримання сесії БД з retry logic
+        Context manager для отримання сесії БД
         
-        Args:
-            max_retries: Максимальна кількість спроб при блокуванні БД
+        Кожен виклик отримує окрему сесію. scoped_session тут не підходить:
+        get_session часто викликається вкладено (менеджер відкриває сесію, поки
+        зовнішня ще відкрита), а обробники бота - корутини в одному потоці, тож
+        спільна сесія потоку змішала б їх транзакції та закривалася б посеред роботи.
+        
+        Тіло блоку with не можна виконати повторно, тому retry тут немає: на блокування
+        чекає сам SQLite (busy_timeout); для повторів див. run_in_session_async.
         
         Yields:
             Session: SQLAlchemy сесія
         """
         session = self.SessionLocal()
-        retries = 0
+        try:
+            yield session
+            session.commit()
+        except (OperationalError, DatabaseError) as e:
+            session.rollback()
+            if self._is_lock_error(e):
+                logger.log_error(f"БД заблокована: {e}")
+            else:
+                logger.log_error(f"Помилка БД: {e}")
+            raise
+        except Exception as e:
+            session.rollback()
+            logger.log_error(f"Помилка в сесії БД: {e}")
+            raise
+        finally:
+            session.close()
+    
+    # Сесія для запису - звичайна get_session
+    get_write_session = get_session
+    
+    @staticmethod
+    def _is_lock_error(error: Exception) -> bool:
+        """Чи є помилка блокуванням SQLite (database is locked / busy)"""
+        # Лише повідомлення драйвера: str() помилки SQLAlchemy містить ще SQL та параметри
+        error_msg = str(getattr(error, 'orig', error)).lower()
+        return 'locked' in error_msg or 'busy' in error_msg
+    
+    def _run_in_session(self, work: Callable[[Session], T]) -> T:
+        """Виконання work(session) з commit в одній сесії (без retry)"""
+        session = self.SessionLocal()
+        try:
+            result = work(session)
+            session.commit()
+            return result
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    async def run_in_session_async(self, work: Callable[[Session], T], max_retries: int = 3) -> T:
+        """
+        Виконання work(session) в окремому потоці з retry logic для корутин
         
-        while retries < max_retries:
+        При блокуванні БД вся одиниця роботи повторюється в новій сесії, а очікування
+        між спробами - через asyncio.sleep, тож інші обробники бота не чекають.
+        
+        Args:
+            work: Функція, що приймає сесію; її результат повертається
+            max_retries: Максимальна кількість спроб при блокуванні БД
+        
+        Returns:
+            Результат work(session)
+        """
+        retries = 0
+        while True:
             try:
-                yield session
-                session.commit()
-                break
+                return await asyncio.to_thread(self._run_in_session, work)
             except (OperationalError, DatabaseError) as e:
-                session.rollback()
-                error_msg = str(e).lower()
-                
-                if 'locked' in error_msg or 'busy' in error_msg or 'database is locked' in error_msg:
-                    retries += 1
-                    if retries < max_retries:
-                        wait_time = 0.5 * retries
-                        if retries > 1:
-                            logger.log_warning(f"БД заблокована, спроба {retries}/{max_retries}, очікування {wait_time:.1f}с")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        logger.log_error(f"БД заблокована після {max_retries} спроб: {e}")
-                        raise
-                else:
+                if not self._is_lock_error(e):
                     logger.log_error(f"Помилка БД: {e}")
                     raise
-            except Exception as e:
-                session.rollback()
-                logger.log_error(f"Помилка в сесії БД: {e}")
-                raise
-            finally:
-                session.close()
+                retries += 1
+                if retries >= max_retries:
+                    logger.log_error(f"БД заблокована після {max_retries} спроб: {e}")
+                    raise
+                wait_time = min(0.1 * 2 ** retries, 2.0)
+                logger.log_warning(f"БД заблокована, спроба {retries}/{max_retries}, очікування {wait_time:.1f}с")
+                await asyncio.sleep(wait_time)
+    
+    @contextmanager
+    def get_read_session(self) -> Generator[Session, None, None]:
+        """
+        Context manager для сесії тільки для читання (read_engine, PRAGMA query_only)
+        
+        Yields:
+            Session: SQLAlchemy сесія без commit
+        """
+        session = self.ReadSessionLocal()
+        try:
+            yield session
+        except Exception as e:
+            logger.log_error(f"Помилка в сесії читання БД: {e}")
+            raise
+        finally:
+            session.close()
     
     def check_connection(self) -> bool:
         """Перевірка підключення до БД"""
         try:
-            with self.get_session() as session:
-                session.execute(text("SELECT 1"))
+            # Без сесії та commit: запит лише на читання
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
             return True
         except Exception as e:
             logger.log_error(f"Помилка підключення до БД: {e}")
@@ -624,12 +1075,21 @@ class DatabaseManager:
             return False
         
         try:
-            import shutil
+            import sqlite3
             db_file = self.database_url.replace("sqlite:///", "")
             
             os.makedirs(os.path.dirname(backup_path) if os.path.dirname(backup_path) else '.', exist_ok=True)
             
-            shutil.copy2(db_file, backup_path)
+            # Online backup API: узгоджений знімок з урахуванням WAL, копіювання порціями
+            # сторінок, щоб записуючі з'єднання блокувалися лише ненадовго
+            src = sqlite3.connect(db_file)
+            dst = sqlite3.connect(backup_path)
+            try:
+                with dst:
+                    src.backup(dst, pages=1024, sleep=0.001)
+            finally:
+                dst.close()
+                src.close()
             logger.log_info(f"Backup БД створено: {backup_path}")
             return True
         except Exception as e:
@@ -640,6 +1100,8 @@ class DatabaseManager:
         """Закриття підключення до БД"""
         try:
             self.engine.dispose()
+            if self.read_engine is not self.engine:
+                self.read_engine.dispose()
             logger.log_info("Підключення до БД закрито")
         except Exception as e:
             logger.log_error(f"Помилка закриття підключення: {e}")
@@ -671,20 +1133,49 @@ def get_db_manager() -> Optional[DatabaseManager]:
 
 
 @contextmanager
-def get_session(max_retries: int = 3) -> Generator[Session, None, None]:
+def get_session() -> Generator[Session, None, None]:
+    """
+    Shortcut для отримання сесії з глобального менеджера
+    
+    Yields:
+        Session: SQLAlchemy сесія
     """
-    Shortcut для отримання сесії з глобального менеджера з retry logic
+    if _db_manager is None:
+        raise RuntimeError("База даних не ініціалізована. Викличте init_database()")
+    
+    with _db_manager.get_session() as session:
+        yield session
+
+
+async def run_in_session_async(work: Callable[[Session], T], max_retries: int = 3) -> T:
+    """
+    Shortcut для виконання work(session) в потоці з retry logic з глобального менеджера
     
     Args:
+        work: Функція, що приймає сесію
         max_retries: Максимальна кількість спроб при блокуванні БД
     
+    Returns:
+        Результат work(session)
+    """
+    if _db_manager is None:
+        raise RuntimeError("База даних не ініціалізована. Викличте init_database()")
+    
+    return await _db_manager.run_in_session_async(work, max_retries=max_retries)
+
+
+@contextmanager
+def get_read_session() -> Generator[Session, None, None]:
+    """
+    Shortcut для отримання сесії тільки для читання з глобального менеджера
+    
     Yields:
         Session: SQLAlchemy сесія
     """
     if _db_manager is None:
         raise RuntimeError("База даних не ініціалізована. Викличте init_database()")
     
-    with _db_manager.get_session(max_retries=max_retries) as session:
+    with _db_manager.get_read_session() as session:
         yield session
 
 
@@ -702,7 +1193,7 @@ def get_bot_config(key: str, default: Optional[str] = None) -> Optional[str]:
     if _db_manager is None:
         return default
     try:
-        with get_session() as session:
+        with get_read_session() as session:
             row = session.query(BotConfig).filter(BotConfig.key == key).first()
             return row.value if row and row.value else default
     except Exception as e:
@@ -5,80 +5,80 @@ from printer_manager import get_printer_manager
 from database import init_database
 from logger import logger
 
-# База даних сумісності (оновлено з наданого списку)
-COMPATIBILITY_DATA = [
+# База даних сумісності (оновлено з наданого списку): пари (модель принтера, назва картриджа)
+COMPATIBILITY_DATA = (
     # Canon 4350d
-    {'printer_model': 'Canon 4350d', 'cartridge_name': 'Canon FX10'},
+    ('Canon 4350d', 'Canon FX10'),
     
     # Canon Laser Base MF3110
-    {'printer_model': 'Canon Laser Base MF3110', 'cartridge_name': 'Canon EP-27'},
+    ('Canon Laser Base MF3110', 'Canon EP-27'),
     
     # Canon Laser Base MF3228
-    {'printer_model': 'Canon Laser Base MF3228', 'cartridge_name': 'Canon EP-27'},
+    ('Canon Laser Base MF3228', 'Canon EP-27'),
     
     # Canon LBP1120
-    {'printer_model': 'Canon LBP1120', 'cartridge_name': 'HP92A'},
-    {'printer_model': 'Canon LBP1120', 'cartridge_name': 'C4092A'},
+    ('Canon LBP1120', 'HP92A'),
+    ('Canon LBP1120', 'C4092A'),
     
     # Canon mf 4400
-    {'printer_model': 'Canon mf 4400', 'cartridge_name': 'Canon 728'},
+    ('Canon mf 4400', 'Canon 728'),
     
     # Canon MF264dw
-    {'printer_model': 'Canon MF264dw', 'cartridge_name': 'Canon Toner Cartridje 051'},
+    ('Canon MF264dw', 'Canon Toner Cartridje 051'),
     
     # CANON MF3010
-    {'printer_model': 'CANON MF3010', 'cartridge_name': 'Canon 725'},
-    {'printer_model': 'CANON MF3010', 'cartridge_name': 'HP85A'},
+    ('CANON MF3010', 'Canon 725'),
+    ('CANON MF3010', 'HP85A'),
     
     # Canon MF4018
-    {'printer_model': 'Canon MF4018', 'cartridge_name': 'Canon FX10'},
+    ('Canon MF4018', 'Canon FX10'),
     
     # Canon MF4120
-    {'printer_model': 'Canon MF4120', 'cartridge_name': 'Canon FX10'},
+    ('Canon MF4120', 'Canon FX10'),
     
     # HP Laser Jet 1005
-    {'printer_model': 'HP Laser Jet 1005', 'cartridge_name': 'C7115A'},
-    {'printer_model': 'HP Laser Jet 1005', 'cartridge_name': 'C7115X'},
+    ('HP Laser Jet 1005', 'C7115A'),
+    ('HP Laser Jet 1005', 'C7115X'),
     
     # HP Laser Jet 1320
-    {'printer_model': 'HP Laser Jet 1320', 'cartridge_name': 'Q5949A'},
-    {'printer_model': 'HP Laser Jet 1320', 'cartridge_name': 'Q5949X'},
+    ('HP Laser Jet 1320', 'Q5949A'),
+    ('HP Laser Jet 1320', 'Q5949X'),
     
     # HP Laser Jet P2015
-    {'printer_model': 'HP Laser Jet P2015', 'cartridge_name': 'Q7553A'},
-    {'printer_model': 'HP Laser Jet P2015', 'cartridge_name': 'Q7553X'},
+    ('HP Laser Jet P2015', 'Q7553A'),
+    ('HP Laser Jet P2015', 'Q7553X'),
     
     # HP LaserJet 1200
-    {'printer_model': 'HP LaserJet 1200', 'cartridge_name': 'C7115A'},
-    {'printer_model': 'HP LaserJet 1200', 'cartridge_name': 'C7115X'},
+    ('HP LaserJet 1200', 'C7115A'),
+    ('HP LaserJet 1200', 'C7115X'),
     
     # HP LaserJet 3052
-    {'printer_model': 'HP LaserJet 3052', 'cartridge_name': 'Q2612A'},
-    {'printer_model': 'HP LaserJet 3052', 'cartridge_name': 'Canon 703'},
+    ('HP LaserJet 3052', 'Q2612A'),
+    ('HP LaserJet 3052', 'Canon 703'),
     
     # HP LaserJet PRO 400 MFP
-    {'printer_model': 'HP LaserJet PRO 400 MFP', 'cartridge_name': 'CF280a'},
-    {'printer_model': 'HP LaserJet PRO 400 MFP', 'cartridge_name': 'CF280x'},
+    ('HP LaserJet PRO 400 MFP', 'CF280a'),
+    ('HP LaserJet PRO 400 MFP', 'CF280x'),
     
     # Многофункц.уст-во Canon IR2206n, A3
-    {'printer_model': 'Многофункц.уст-во Canon IR2206n, A3', 'cartridge_name': 'Туба'},
+    ('Многофункц.уст-во Canon IR2206n, A3', 'Туба'),
     
     # Canon i-sensys MF 4320d
-    {'printer_model': 'Canon i-sensys MF 4320d', 'cartridge_name': 'Canon FX10'},
+    ('Canon i-sensys MF 4320d', 'Canon FX10'),
     
     # HP LJ P2035
-    {'printer_model': 'HP LJ P2035', 'cartridge_name': 'HPCE505A'},
-    {'printer_model': 'HP LJ P2035', 'cartridge_name': 'Canon 719'},
+    ('HP LJ P2035', 'HPCE505A'),
+    ('HP LJ P2035', 'Canon 719'),
     
     # HP LJ M428DV
-    {'printer_model': 'HP LJ M428DV', 'cartridge_name': 'HPCF259A'},
+    ('HP LJ M428DV', 'HPCF259A'),
     
     # Canon MF237w
-    {'printer_model': 'Canon MF237w', 'cartridge_name': 'Canon 737'},
+    ('Canon MF237w', 'Canon 737'),
     
     # Canon MF461dw
-    {'printer_model': 'Canon MF461dw', 'cartridge_name': 'Canon 070'},
-]
+    ('Canon MF461dw', 'Canon 070'),
+)
 
 
 def main():
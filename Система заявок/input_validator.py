@@ -2,21 +2,46 @@
 Модуль для валідації вхідних даних
 """
 import re
-from typing import Dict, Any
+import time
+from typing import Dict, Any, NamedTuple
 
 from logger import logger
 
+# Кеш активних статусів для validate_status: {'at': час завантаження, 'codes': список, 'codes_set': множина}
+STATUS_CACHE_TTL = 60  # секунд
+_STATUS_CACHE: Dict[str, Any] = {'at': 0.0, 'codes': None, 'codes_set': None}
+
+
+class ValidationResult(NamedTuple):
+    """Результат валідації"""
+    valid: bool
+    message: str
+    cleaned: Any = None  # Очищене значення (якщо валідне)
+
 
 class InputValidator:
     """Клас для валідації вхідних даних"""
     
+    # Допустимі значення (frozenset - перевірка входження за O(1) без створення списку на кожен виклик)
+    _VALID_TICKET_TYPES = frozenset({"REFILL", "REPAIR", "INCIDENT"})
+    _VALID_PRIORITIES = frozenset({"LOW", "NORMAL", "HIGH"})
+    _VALID_ROLES = frozenset({"admin", "user"})
+    # Fallback статуси, якщо БД недоступна (кортеж зберігає порядок для повідомлення)
+    _FALLBACK_STATUSES = (
+        'DRAFT', 'NEW', 'ACCEPTED', 'COLLECTING', 'SENT_TO_CONTRACTOR',
+        'WAITING_CONTRACTOR', 'RECEIVED_FROM_CONTRACTOR', 'QC_CHECK',
+        'READY', 'DELIVERED_INSTALLED', 'CLOSED',
+        'NEED_INFO', 'REJECTED_UNSUPPORTED', 'CANCELLED', 'REWORK'
+    )
+    _FALLBACK_STATUSES_SET = frozenset(_FALLBACK_STATUSES)
+    
     def __init__(self):
         """Ініціалізація валідатора"""
         # Налаштування
         self.max_message_length = 1000  # Максимальна довжина повідомлення
         self.max_comment_length = 2000  # Максимальна довжина коментаря
     
-    def validate_message_length(self, message: str) -> Dict[str, Any]:
+    def validate_message_length(self, message: str) -> ValidationResult:
         """
         Валідація довжини повідомлення
         
@@ -27,26 +52,15 @@ class InputValidator:
             Результат валідації
         """
         if not message:
-            return {
-                "valid": False,
-                "message": "Повідомлення не може бути порожнім"
-            }
+            return ValidationResult(False, "Повідомлення не може бути порожнім")
         
         if len(message) > self.max_message_length:
             logger.log_error(f"Повідомлення занадто довге: {len(message)} символів")
-            return {
-                "valid": False,
-                "message": f"Повідомлення занадто довге. Максимум {self.max_message_length} символів.",
-                "current_length": len(message),
-                "max_length": self.max_message_length
-            }
+            return ValidationResult(False, f"Повідомлення занадто довге. Максимум {self.max_message_length} символів.")
         
-        return {
-            "valid": True,
-            "message": "Повідомлення валідне"
-        }
+        return ValidationResult(True, "Повідомлення валідне")
     
-    def validate_ticket_type(self, ticket_type: str) -> Dict[str, Any]:
+    def validate_ticket_type(self, ticket_type: str) -> ValidationResult:
         """
         Валідація типу заявки
         
@@ -57,27 +71,17 @@ class InputValidator:
             Результат валідації
         """
         if not ticket_type:
-            return {
-                "valid": False,
-                "message": "Тип заявки не може бути порожнім"
-            }
+            return ValidationResult(False, "Тип заявки не може бути порожнім")
         
         ticket_type = ticket_type.strip().upper()
         
-        if ticket_type not in ["REFILL", "REPAIR", "INCIDENT"]:
+        if ticket_type not in self._VALID_TICKET_TYPES:
             logger.log_error(f"Невірний тип заявки: {ticket_type}")
-            return {
-                "valid": False,
-                "message": "Невірний тип заявки. Доступні: REFILL, REPAIR, INCIDENT"
-            }
+            return ValidationResult(False, "Невірний тип заявки. Доступні: REFILL, REPAIR, INCIDENT")
         
-        return {
-            "valid": True,
-            "message": "Тип заявки валідний",
-            "cleaned_ticket_type": ticket_type
-        }
+        return ValidationResult(True, "Тип заявки валідний", ticket_type)
     
-    def validate_priority(self, priority: str) -> Dict[str, Any]:
+    def validate_priority(self, priority: str) -> ValidationResult:
         """
         Валідація пріоритету заявки
         
@@ -88,27 +92,17 @@ class InputValidator:
             Результат валідації
         """
         if not priority:
-            return {
-                "valid": False,
-                "message": "Пріоритет не може бути порожнім"
-            }
+            return ValidationResult(False, "Пріоритет не може бути порожнім")
         
         priority = priority.strip().upper()
         
-        if priority not in ["LOW", "NORMAL", "HIGH"]:
+        if priority not in self._VALID_PRIORITIES:
             logger.log_error(f"Невірний пріоритет: {priority}")
-            return {
-                "valid": False,
-                "message": "Невірний пріоритет. Доступні: LOW, NORMAL, HIGH"
-            }
+            return ValidationResult(False, "Невірний пріоритет. Доступні: LOW, NORMAL, HIGH")
         
-        return {
-            "valid": True,
-            "message": "Пріоритет валідний",
-            "cleaned_priority": priority
-        }
+        return ValidationResult(True, "Пріоритет валідний", priority)
     
-    def validate_status(self, status: str) -> Dict[str, Any]:
+    def validate_status(self, status: str) -> ValidationResult:
         """
         Валідація статусу заявки
         
@@ -119,52 +113,54 @@ class InputValidator:
             Результат валідації
         """
         if not status:
-            return {
-                "valid": False,
-                "message": "Статус не може бути порожнім"
-            }
+            return ValidationResult(False, "Статус не може бути порожнім")
         
         status = status.strip().upper()
         
-        # Отримуємо список дозволених статусів з бази даних
+        # Отримуємо список дозволених статусів (з кешу або з бази даних)
         try:
-            from status_manager import get_status_manager
-            status_manager = get_status_manager()
-            all_statuses = status_manager.get_all_statuses(active_only=True)
-            valid_statuses = [s['code'] for s in all_statuses]
+            valid_statuses, valid_statuses_set = self._get_cached_statuses()
             
             # Якщо не вдалося отримати статуси з БД, використовуємо fallback список
             if not valid_statuses:
-                valid_statuses = [
-                    'DRAFT', 'NEW', 'ACCEPTED', 'COLLECTING', 'SENT_TO_CONTRACTOR',
-                    'WAITING_CONTRACTOR', 'RECEIVED_FROM_CONTRACTOR', 'QC_CHECK',
-                    'READY', 'DELIVERED_INSTALLED', 'CLOSED',
-                    'NEED_INFO', 'REJECTED_UNSUPPORTED', 'CANCELLED', 'REWORK'
-                ]
+                valid_statuses = self._FALLBACK_STATUSES
+                valid_statuses_set = self._FALLBACK_STATUSES_SET
         except Exception as e:
             logger.log_error(f"Помилка отримання статусів з БД: {e}")
             # Fallback до хардкодженого списку у разі помилки
-            valid_statuses = [
-                'DRAFT', 'NEW', 'ACCEPTED', 'COLLECTING', 'SENT_TO_CONTRACTOR',
-                'WAITING_CONTRACTOR', 'RECEIVED_FROM_CONTRACTOR', 'QC_CHECK',
-                'READY', 'DELIVERED_INSTALLED', 'CLOSED',
-                'NEED_INFO', 'REJECTED_UNSUPPORTED', 'CANCELLED', 'REWORK'
-            ]
+            valid_statuses = self._FALLBACK_STATUSES
+            valid_statuses_set = self._FALLBACK_STATUSES_SET
         
-        if status not in valid_statuses:
+        if status not in valid_statuses_set:
             logger.log_error(f"Невірний статус: {status}. Доступні: {', '.join(valid_statuses)}")
-            return {
-                "valid": False,
-                "message": f"Невірний статус. Доступні: {', '.join(valid_statuses)}"
-            }
+            return ValidationResult(False, f"Невірний статус. Доступні: {', '.join(valid_statuses)}")
         
-        return {
-            "valid": True,
-            "message": "Статус валідний",
-            "cleaned_status": status
-        }
+        return ValidationResult(True, "Статус валідний", status)
+    
+    def _get_cached_statuses(self):
+        """
+        Коди активних статусів з кешем на STATUS_CACHE_TTL секунд
+        
+        Returns:
+            (список кодів у порядку сортування, множина кодів)
+        """
+        now = time.monotonic()
+        if _STATUS_CACHE['codes'] is not None and now - _STATUS_CACHE['at'] < STATUS_CACHE_TTL:
+            return _STATUS_CACHE['codes'], _STATUS_CACHE['codes_set']
+        
+        from status_manager import get_status_manager
+        all_statuses = get_status_manager().get_all_statuses(active_only=True)
+        codes = [s['code'] for s in all_statuses]
+        if codes:
+            _STATUS_CACHE.update(at=now, codes=codes, codes_set=set(codes))
+        return codes, set(codes)
+    
+    @staticmethod
+    def invalidate_status_cache() -> None:
+        """Скидання кешу статусів (викликається при зміні довідника статусів)"""
+        _STATUS_CACHE.update(at=0.0, codes=None, codes_set=None)
     
-    def validate_quantity(self, quantity: int) -> Dict[str, Any]:
+    def validate_quantity(self, quantity: int) -> ValidationResult:
         """
         Валідація кількості
         
@@ -175,33 +171,17 @@ class InputValidator:
             Результат валідації
         """
         if quantity is None:
-            return {
-                "valid": False,
-                "message": "Кількість не може бути порожньою"
-            }
+            return ValidationResult(False, "Кількість не може бути порожньою")
         
         try:
             qty = int(quantity)
             if qty <= 0:
-                return {
-                    "valid": False,
-                    "message": "Кількість повинна бути більше 0"
-                }
+                return ValidationResult(False, "Кількість повинна бути більше 0")
             if qty > 1000:
-                return {
-                    "valid": False,
-                    "message": "Кількість не може перевищувати 1000"
-                }
-            return {
-                "valid": True,
-                "message": "Кількість валідна",
-                "cleaned_quantity": qty
-            }
+                return ValidationResult(False, "Кількість не може перевищувати 1000")
+            return ValidationResult(True, "Кількість валідна", qty)
         except (ValueError, TypeError):
-            return {
-                "valid": False,
-                "message": "Кількість повинна бути числом"
-            }
+            return ValidationResult(False, "Кількість повинна бути числом")
     
     def sanitize_input(self, text: str) -> str:
         """
@@ -225,46 +205,43 @@ class InputValidator:
         
         return text
     
-    def validate_guest_contact_name(self, name: str) -> Dict[str, Any]:
+    def validate_guest_contact_name(self, name: str) -> ValidationResult:
         """
         Валідація контактного імені для заявки гостя (консультація).
         """
         if not name or not name.strip():
-            return {"valid": False, "message": "Вкажіть ім'я або як до вас звертатись."}
+            return ValidationResult(False, "Вкажіть ім'я або як до вас звертатись.")
         cleaned = name.strip()
         if len(cleaned) < 2:
-            return {"valid": False, "message": "Занадто коротке ім'я."}
+            return ValidationResult(False, "Занадто коротке ім'я.")
         if len(cleaned) > 200:
-            return {"valid": False, "message": "Ім'я не довше 200 символів."}
-        return {"valid": True, "message": "OK", "cleaned": cleaned}
+            return ValidationResult(False, "Ім'я не довше 200 символів.")
+        return ValidationResult(True, "OK", cleaned)
 
-    def validate_guest_phone(self, phone: str) -> Dict[str, Any]:
+    def validate_guest_phone(self, phone: str) -> ValidationResult:
         """
         Валідація телефону для заявки гостя: дозволені цифри та + ( ) - пробіли.
         """
         if not phone or not phone.strip():
-            return {"valid": False, "message": "Вкажіть номер телефону."}
+            return ValidationResult(False, "Вкажіть номер телефону.")
         raw = phone.strip()
         if len(raw) > 50:
-            return {"valid": False, "message": "Номер занадто довгий."}
+            return ValidationResult(False, "Номер занадто довгий.")
         if not re.match(r"^[\d\s+\-()]+$", raw):
-            return {
-                "valid": False,
-                "message": "Дозволені лише цифри, +, пробіли, дужки та дефіс.",
-            }
+            return ValidationResult(False, "Дозволені лише цифри, +, пробіли, дужки та дефіс.")
         digits = re.sub(r"\D", "", raw)
         if len(digits) < 10:
-            return {"valid": False, "message": "Занадто мало цифр у номері (мінімум 10)."}
-        return {"valid": True, "message": "OK", "cleaned": raw}
+            return ValidationResult(False, "Занадто мало цифр у номері (мінімум 10).")
+        return ValidationResult(True, "OK", raw)
 
-    def validate_guest_call_time(self, text: str) -> Dict[str, Any]:
+    def validate_guest_call_time(self, text: str) -> ValidationResult:
         """Валідація поля «зручний час» (вільний текст)."""
         if not text or not text.strip():
-            return {"valid": False, "message": "Вкажіть зручний час для дзвінка."}
+            return ValidationResult(False, "Вкажіть зручний час для дзвінка.")
         cleaned = text.strip()
         if len(cleaned) > 500:
-            return {"valid": False, "message": "Текст не довше 500 символів."}
-        return {"valid": True, "message": "OK", "cleaned": cleaned}
+            return ValidationResult(False, "Текст не довше 500 символів.")
+        return ValidationResult(True, "OK", cleaned)
 
     def validate_role(self, role: str) -> bool:
         """
@@ -279,8 +256,7 @@ class InputValidator:
         if not role:
             return False
         
-        valid_roles = ['admin', 'user']
-        return role.lower() in valid_roles
+        return role.lower() in self._VALID_ROLES
 
 
 # Глобальний екземпляр валідатора
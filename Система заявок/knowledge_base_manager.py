@@ -1,20 +1,109 @@
 """
 Модуль для управління базою знань (нотатки з посиланнями)
 """
+import time
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 
-from database import get_session
-from models import KnowledgeBaseNote, KnowledgeBaseFavorite, User
+from sqlalchemy import select, func, text, tuple_, or_, bindparam, cast, String
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, load_only
+
+from database import get_session, get_read_session
+from models import KnowledgeBaseNote, KnowledgeBaseFavorite, KnowledgeBaseTag, KnowledgeBaseNoteTag, User
 from logger import logger
 
+# Максимальна довжина назви тегу (KnowledgeBaseTag.name)
+TAG_MAX_LENGTH = 64
+
+# Час життя кешу категорій та тегів (фільтри списку нотаток)
+FILTERS_CACHE_TTL = 60  # секунд
+
+# Максимальна кількість тегів у фільтрі списку (решта ігнорується)
+MAX_FILTER_TAGS = 32
+
+def _iso_datetime(column, name: str):
+    """
+    Дата у форматі ISO 8601 ('YYYY-MM-DDTHH:MM:SS.ffffff'), сформована в SQL
+    
+    SQLite зберігає DateTime як текст 'YYYY-MM-DD HH:MM:SS.ffffff', тому достатньо
+    замінити пробіл на 'T' - без розбору в datetime та .isoformat() на кожен рядок.
+    Мікросекунди зберігаються, тож datetime.fromisoformat (get_next_cursor) дає точний курсор.
+    
+    Args:
+        column: Колонка DateTime
+        name: Назва колонки в результаті
+        
+    Returns:
+        Вираз із міткою name (NULL лишається NULL)
+    """
+    return func.replace(cast(column, String), ' ', 'T').label(name)
+
+
+# Колонки нотатки у проєкції для списків (рядки замість ORM-об'єктів)
+NOTE_COLUMNS = (
+    KnowledgeBaseNote.id,
+    KnowledgeBaseNote.title,
+    KnowledgeBaseNote.content,
+    KnowledgeBaseNote.resource_url,
+    KnowledgeBaseNote.commands,
+    KnowledgeBaseNote.tags,
+    KnowledgeBaseNote.category,
+    KnowledgeBaseNote.author_id,
+    _iso_datetime(KnowledgeBaseNote.created_at, 'created_at'),
+    _iso_datetime(KnowledgeBaseNote.updated_at, 'updated_at'),
+    User.user_id.label('author_user_id'),
+    User.full_name.label('author_full_name'),
+    User.username.label('author_username'),
+)
+
+# Розмір пакета при вибірці списків нотаток (Query.yield_per)
+NOTES_FETCH_BATCH = 200
+
+# FTS5 trigram індексує триграми, тому коротші запити шукаються через LIKE
+FTS_MIN_QUERY_LENGTH = 3
+
+
+def split_tags(tags: Optional[str]) -> List[str]:
+    """
+    Розбір рядка тегів через кому в нормалізовані назви для довідника тегів
+    
+    Назви зводяться до одного регістру через str.casefold(): SQLite lower() змінює лише
+    ASCII, тому порівняння без урахування регістру (кирилиця) робиться в Python, а в SQL -
+    звичайна рівність по унікальному індексу name.
+    
+    Args:
+        tags: Теги через кому
+        
+    Returns:
+        Список тегів без порожніх значень та дублікатів, у порядку введення
+    """
+    if not tags:
+        return []
+    return list(dict.fromkeys(
+        tag.strip().casefold()[:TAG_MAX_LENGTH] for tag in tags.split(',') if tag.strip()
+    ))
+
 
 class KnowledgeBaseManager:
     """Клас для управління нотатками бази знань"""
     
     def __init__(self):
         """Ініціалізація менеджера бази знань"""
-        pass
+        # Наявність FTS-індексу knowledge_base_notes_fts (визначається при першому пошуку)
+        self._fts_available: Optional[bool] = None
+        # Кеші фільтрів: (time.monotonic() моменту заповнення, значення)
+        self._categories_cache: Optional[Tuple[float, List[str]]] = None
+        self._tags_cache: Optional[Tuple[float, List[str]]] = None
+        # Готовий запит для найчастішого виклику get_notes (без фільтрів і курсора):
+        # компілюється один раз, далі змінюються лише параметри limit/offset
+        self._default_notes_stmt = select(*NOTE_COLUMNS).outerjoin(
+            User, User.user_id == KnowledgeBaseNote.author_id
+        ).order_by(
+            KnowledgeBaseNote.updated_at.desc(), KnowledgeBaseNote.id.desc()
+        ).limit(bindparam('limit')).offset(bindparam('offset')).execution_options(
+            yield_per=NOTES_FETCH_BATCH
+        )
     
     def create_note(
         self,
@@ -54,12 +143,14 @@ class KnowledgeBaseManager:
                     commands=commands.strip() if commands else None,
                     tags=tags.strip() if tags else None,
                     category=category.strip() if category else None,
-                    author_id=author_id,
-                    created_at=datetime.now(),
-                    updated_at=datetime.now()
+                    author_id=author_id
+                    # created_at/updated_at заповнюють default колонок моделі
                 )
                 session.add(note)
+                session.flush()  # Отримуємо ID нотатки
+                self._sync_note_tags(session, note.id, note.tags)
                 session.commit()
+                self._invalidate_filters_cache()
                 
                 logger.log_info(f"Створено нотатку {note.id}: {title[:50]}")
                 return note.id
@@ -79,12 +170,52 @@ class KnowledgeBaseManager:
             Словник з даними нотатки або None
         """
         try:
-            with get_session() as session:
-                note = session.query(KnowledgeBaseNote).filter(KnowledgeBaseNote.id == note_id).first()
+            with get_read_session() as session:
+                row = self._notes_query(session).filter(KnowledgeBaseNote.id == note_id).first()
+                if not row:
+                    return None
+                
+                return self._row_to_dict(row)
+        except Exception as e:
+            logger.log_error(f"Помилка отримання нотатки {note_id}: {e}")
+            return None
+    
+    def get_note_summary(self, note_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Отримання короткої інформації про нотатку (без content/commands та автора)
+        
+        Для перевірок існування та списків, де текст нотатки не потрібен.
+        
+        Args:
+            note_id: ID нотатки
+            
+        Returns:
+            Словник з метаданими нотатки або None
+        """
+        try:
+            with get_read_session() as session:
+                note = session.query(KnowledgeBaseNote).options(
+                    load_only(
+                        KnowledgeBaseNote.title,
+                        KnowledgeBaseNote.resource_url,
+                        KnowledgeBaseNote.tags,
+                        KnowledgeBaseNote.category,
+                        KnowledgeBaseNote.author_id,
+                        KnowledgeBaseNote.updated_at
+                    )
+                ).filter(KnowledgeBaseNote.id == note_id).first()
                 if not note:
                     return None
                 
-                return self._note_to_dict(note)
+                return {
+                    'id': note.id,
+                    'title': note.title,
+                    'resource_url': note.resource_url,
+                    'tags': note.tags,
+                    'category': note.category,
+                    'author_id': note.author_id,
+                    'updated_at': note.updated_at.isoformat() if note.updated_at else None
+                }
         except Exception as e:
             logger.log_error(f"Помилка отримання нотатки {note_id}: {e}")
             return None
@@ -115,38 +246,43 @@ class KnowledgeBaseManager:
             True якщо оновлено успішно
         """
         try:
+            if title is not None and not title.strip():
+                logger.log_error("Заголовок нотатки не може бути порожнім")
+                return False
+            
+            # Оновлюємо лише передані поля
+            updates: Dict[str, Any] = {}
+            if title is not None:
+                updates['title'] = title.strip()
+            if content is not None:
+                updates['content'] = content.strip() if content else None
+            if resource_url is not None:
+                updates['resource_url'] = resource_url.strip() if resource_url else None
+            if commands is not None:
+                updates['commands'] = commands.strip() if commands else None
+            if tags is not None:
+                updates['tags'] = tags.strip() if tags else None
+            if category is not None:
+                updates['category'] = category.strip() if category else None
+            # updated_at встановлює onupdate колонки (ORM UPDATE його враховує)
+            
             with get_session() as session:
-                note = session.query(KnowledgeBaseNote).filter(KnowledgeBaseNote.id == note_id).first()
-                if not note:
-                    logger.log_error(f"Нотатку {note_id} не знайдено")
-                    return False
-                
-                if title is not None:
-                    if not title.strip():
-                        logger.log_error("Заголовок нотатки не може бути порожнім")
-                        return False
-                    note.title = title.strip()
-                
-                if content is not None:
-                    note.content = content.strip() if content else None
-                
-                if resource_url is not None:
-                    note.resource_url = resource_url.strip() if resource_url else None
-                
-                if commands is not None:
-                    note.commands = commands.strip() if commands else None
-                
-                if tags is not None:
-                    note.tags = tags.strip() if tags else None
-                
-                if category is not None:
-                    note.category = category.strip() if category else None
-                
-                note.updated_at = datetime.now()
+                # Один UPDATE за первинним ключем без попереднього SELECT
+                updated = session.query(KnowledgeBaseNote).filter(
+                    KnowledgeBaseNote.id == note_id
+                ).update(updates, synchronize_session=False)
+                if updated and tags is not None:
+                    self._sync_note_tags(session, note_id, updates['tags'])
                 session.commit()
-                
-                logger.log_info(f"Оновлено нотатку {note_id}")
-                return True
+            
+            # Логуємо після виходу з сесії: logger пише в БД окремим з'єднанням
+            if not updated:
+                logger.log_error(f"Нотатку {note_id} не знайдено")
+                return False
+            
+            self._invalidate_filters_cache()
+            logger.log_info(f"Оновлено нотатку {note_id}")
+            return True
                 
         except Exception as e:
             logger.log_error(f"Помилка оновлення нотатки {note_id}: {e}")
@@ -171,6 +307,7 @@ class KnowledgeBaseManager:
                 
                 session.delete(note)
                 session.commit()
+                self._invalidate_filters_cache()
                 
                 logger.log_info(f"Видалено нотатку {note_id}")
                 return True
@@ -186,7 +323,8 @@ class KnowledgeBaseManager:
         limit: Optional[int] = None,
         offset: int = 0,
         category: Optional[str] = None,
-        tags: Optional[str] = None
+        tags: Optional[str] = None,
+        cursor: Optional[Tuple[datetime, int]] = None
     ) -> List[Dict[str, Any]]:
         """
         Отримання списку нотаток з фільтрацією та пагінацією
@@ -198,13 +336,23 @@ class KnowledgeBaseManager:
             offset: Зміщення для пагінації
             category: Фільтр за категорією
             tags: Фільтр за тегами (через кому)
+            cursor: Keyset-курсор (updated_at, id) останньої нотатки попередньої сторінки,
+                див. get_next_cursor; вартість сторінки не залежить від її глибини
             
         Returns:
             Список нотаток
         """
         try:
-            with get_session() as session:
-                query = session.query(KnowledgeBaseNote)
+            with get_read_session() as session:
+                if not category and not tags and not cursor:
+                    # LIMIT -1 у SQLite означає "без обмеження"
+                    rows = session.execute(
+                        self._default_notes_stmt,
+                        {'limit': limit or -1, 'offset': offset or 0}
+                    )
+                    return list(map(self._row_to_dict, rows))
+                
+                query = self._notes_query(session)
                 
                 # Якщо не адмін, показуємо всі нотатки (всі бачать всі)
                 # Але можна додати фільтр за автором, якщо потрібно
@@ -215,17 +363,17 @@ class KnowledgeBaseManager:
                 
                 # Фільтр за тегами
                 if tags:
-                    tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
+                    tag_list = split_tags(tags)
                     if tag_list:
                         # Пошук нотаток, що містять хоча б один з тегів
-                        from sqlalchemy import or_
-                        conditions = []
-                        for tag in tag_list:
-                            conditions.append(KnowledgeBaseNote.tags.contains(tag))
-                        query = query.filter(or_(*conditions))
+                        query = query.filter(self._tags_filter(tag_list))
+                
+                # Keyset-пагінація
+                if cursor:
+                    query = query.filter(self._cursor_filter(cursor))
                 
-                # Сортування за датою оновлення (новіші спочатку)
-                query = query.order_by(KnowledgeBaseNote.updated_at.desc())
+                # Сортування за датою оновлення (новіші спочатку), id - для стабільного порядку
+                query = query.order_by(KnowledgeBaseNote.updated_at.desc(), KnowledgeBaseNote.id.desc())
                 
                 # Пагінація
                 if limit:
@@ -233,9 +381,8 @@ class KnowledgeBaseManager:
                 if offset:
                     query = query.offset(offset)
                 
-                notes = query.all()
-                
-                return [self._note_to_dict(note) for note in notes]
+                # Пакетна вибірка: словники будуються по мірі читання рядків
+                return list(map(self._row_to_dict, query.yield_per(NOTES_FETCH_BATCH)))
                 
         except Exception as e:
             logger.log_error(f"Помилка отримання списку нотаток: {e}")
@@ -249,7 +396,8 @@ class KnowledgeBaseManager:
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None,
         limit: Optional[int] = None,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[Tuple[datetime, int]] = None
     ) -> List[Dict[str, Any]]:
         """
         Розширений пошук нотаток
@@ -262,54 +410,23 @@ class KnowledgeBaseManager:
             date_to: Кінцева дата (створення/оновлення)
             limit: Максимальна кількість результатів
             offset: Зміщення для пагінації
+            cursor: Keyset-курсор (updated_at, id), див. get_next_cursor
             
         Returns:
             Список знайдених нотаток
         """
         try:
-            with get_session() as session:
-                query = session.query(KnowledgeBaseNote)
-                
-                # Пошук по тексту
-                if search_text:
-                    search_text = search_text.strip()
-                    from sqlalchemy import or_
-                    query = query.filter(
-                        or_(
-                            KnowledgeBaseNote.title.contains(search_text),
-                            KnowledgeBaseNote.content.contains(search_text),
-                            KnowledgeBaseNote.tags.contains(search_text)
-                        )
-                    )
-                
-                # Фільтр за тегами
-                if tags:
-                    tag_list = [tag.strip() for tag in tags.split(',') if tag.strip()]
-                    if tag_list:
-                        from sqlalchemy import or_
-                        conditions = []
-                        for tag in tag_list:
-                            conditions.append(KnowledgeBaseNote.tags.contains(tag))
-                        query = query.filter(or_(*conditions))
-                
-                # Фільтр за категорією
-                if category:
-                    query = query.filter(KnowledgeBaseNote.category == category)
+            with get_read_session() as session:
+                query = self._notes_query(session).filter(
+                    *self._search_filters(session, search_text, tags, category, date_from, date_to)
+                )
                 
-                # Фільтр за датою
-                if date_from:
-                    query = query.filter(
-                        (KnowledgeBaseNote.created_at >= date_from) |
-                        (KnowledgeBaseNote.updated_at >= date_from)
-                    )
-                if date_to:
-                    query = query.filter(
-                        (KnowledgeBaseNote.created_at <= date_to) |
-                        (KnowledgeBaseNote.updated_at <= date_to)
-                    )
+                # Keyset-пагінація
+                if cursor:
+                    query = query.filter(self._cursor_filter(cursor))
                 
                 # Сортування за релевантністю (новіші спочатку)
-                query = query.order_by(KnowledgeBaseNote.updated_at.desc())
+                query = query.order_by(KnowledgeBaseNote.updated_at.desc(), KnowledgeBaseNote.id.desc())
                 
                 # Пагінація
                 if limit:
@@ -317,14 +434,46 @@ class KnowledgeBaseManager:
                 if offset:
                     query = query.offset(offset)
                 
-                notes = query.all()
-                
-                return [self._note_to_dict(note) for note in notes]
+                # Пакетна вибірка: словники будуються по мірі читання рядків
+                return list(map(self._row_to_dict, query.yield_per(NOTES_FETCH_BATCH)))
                 
         except Exception as e:
             logger.log_error(f"Помилка пошуку нотаток: {e}")
             return []
     
+    def count_notes(
+        self,
+        search_text: Optional[str] = None,
+        tags: Optional[str] = None,
+        category: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> int:
+        """
+        Кількість нотаток за тими ж фільтрами, що й search_notes
+        
+        Для пагінації списків: сторінка вибирається через limit/cursor, а не зрізом
+        повного списку.
+        
+        Args:
+            search_text: Текст для пошуку (заголовок, вміст, теги)
+            tags: Фільтр за тегами (через кому)
+            category: Фільтр за категорією
+            date_from: Початкова дата (створення/оновлення)
+            date_to: Кінцева дата (створення/оновлення)
+            
+        Returns:
+            Кількість нотаток
+        """
+        try:
+            with get_read_session() as session:
+                return session.query(func.count(KnowledgeBaseNote.id)).filter(
+                    *self._search_filters(session, search_text, tags, category, date_from, date_to)
+                ).scalar() or 0
+        except Exception as e:
+            logger.log_error(f"Помилка підрахунку нотаток: {e}")
+            return 0
+    
     def get_user_notes(self, user_id: int, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
         """
         Отримання нотаток конкретного користувача
@@ -338,8 +487,8 @@ class KnowledgeBaseManager:
             Список нотаток користувача
         """
         try:
-            with get_session() as session:
-                query = session.query(KnowledgeBaseNote).filter(
+            with get_read_session() as session:
+                query = self._notes_query(session).filter(
                     KnowledgeBaseNote.author_id == user_id
                 ).order_by(KnowledgeBaseNote.updated_at.desc())
                 
@@ -348,9 +497,8 @@ class KnowledgeBaseManager:
                 if offset:
                     query = query.offset(offset)
                 
-                notes = query.all()
-                
-                return [self._note_to_dict(note) for note in notes]
+                # Пакетна вибірка: словники будуються по мірі читання рядків
+                return list(map(self._row_to_dict, query.yield_per(NOTES_FETCH_BATCH)))
                 
         except Exception as e:
             logger.log_error(f"Помилка отримання нотаток користувача {user_id}: {e}")
@@ -381,18 +529,18 @@ class KnowledgeBaseManager:
         Returns:
             True якщо користувач може редагувати нотатку
         """
+        # Адміністратор може редагувати будь-яку нотатку (існування перевіряють викликачі)
+        if is_admin:
+            return True
+        
         try:
-            with get_session() as session:
-                note = session.query(KnowledgeBaseNote).filter(KnowledgeBaseNote.id == note_id).first()
-                if not note:
-                    return False
-                
-                # Адміністратор може редагувати будь-яку нотатку
-                if is_admin:
-                    return True
+            with get_read_session() as session:
+                author_id = session.query(KnowledgeBaseNote.author_id).filter(
+                    KnowledgeBaseNote.id == note_id
+                ).scalar()
                 
                 # Користувач може редагувати тільки свої нотатки
-                return note.author_id == user_id
+                return author_id is not None and author_id == user_id
                 
         except Exception as e:
             logger.log_error(f"Помилка перевірки прав на редагування нотатки {note_id}: {e}")
@@ -405,13 +553,19 @@ class KnowledgeBaseManager:
         Returns:
             Список унікальних категорій
         """
+        cached = self._categories_cache
+        if cached is not None and time.monotonic() - cached[0] < FILTERS_CACHE_TTL:
+            return list(cached[1])
+        
         try:
-            with get_session() as session:
+            with get_read_session() as session:
                 categories = session.query(KnowledgeBaseNote.category).filter(
                     KnowledgeBaseNote.category.isnot(None)
                 ).distinct().all()
                 
-                return [cat[0] for cat in categories if cat[0]]
+                result = [cat[0] for cat in categories if cat[0]]
+                self._categories_cache = (time.monotonic(), result)
+                return list(result)
                 
         except Exception as e:
             logger.log_error(f"Помилка отримання категорій: {e}")
@@ -422,53 +576,258 @@ class KnowledgeBaseManager:
         Отримання списку всіх тегів
         
         Returns:
-            Список унікальних тегів
+            Список унікальних тегів, що використовуються в нотатках
         """
+        cached = self._tags_cache
+        if cached is not None and time.monotonic() - cached[0] < FILTERS_CACHE_TTL:
+            return list(cached[1])
+        
         try:
-            with get_session() as session:
-                notes = session.query(KnowledgeBaseNote.tags).filter(
-                    KnowledgeBaseNote.tags.isnot(None)
-                ).all()
-                
-                all_tags = set()
-                for note_tags in notes:
-                    if note_tags[0]:
-                        tag_list = [tag.strip() for tag in note_tags[0].split(',') if tag.strip()]
-                        all_tags.update(tag_list)
+            with get_read_session() as session:
+                tags = session.query(KnowledgeBaseTag.name).join(
+                    KnowledgeBaseNoteTag,
+                    KnowledgeBaseNoteTag.tag_id == KnowledgeBaseTag.id
+                ).distinct().order_by(KnowledgeBaseTag.name).all()
                 
-                return sorted(list(all_tags))
+                result = [tag[0] for tag in tags]
+                self._tags_cache = (time.monotonic(), result)
+                return list(result)
                 
         except Exception as e:
             logger.log_error(f"Помилка отримання тегів: {e}")
             return []
     
-    def _note_to_dict(self, note: KnowledgeBaseNote) -> Dict[str, Any]:
+    def _invalidate_filters_cache(self) -> None:
+        """Скидання кешу категорій та тегів (викликається після змін нотаток)"""
+        self._categories_cache = None
+        self._tags_cache = None
+    
+    def _has_fts(self, session: Session) -> bool:
+        """
+        Перевірка наявності FTS-індексу бази знань (результат кешується)
+        
+        Args:
+            session: Поточна сесія
+            
+        Returns:
+            True якщо таблиця knowledge_base_notes_fts існує
+        """
+        if self._fts_available is None:
+            if session.get_bind().dialect.name != 'sqlite':
+                self._fts_available = False
+            else:
+                self._fts_available = session.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'knowledge_base_notes_fts'"
+                )).first() is not None
+        return self._fts_available
+    
+    def _search_filters(
+        self,
+        session: Session,
+        search_text: Optional[str],
+        tags: Optional[str],
+        category: Optional[str],
+        date_from: Optional[datetime],
+        date_to: Optional[datetime]
+    ) -> List[Any]:
+        """
+        Умови пошуку нотаток (спільні для search_notes та count_notes)
+        
+        Args:
+            session: Сесія БД (перевірка наявності FTS-індексу)
+            search_text: Текст для пошуку (заголовок, вміст, теги)
+            tags: Фільтр за тегами (через кому)
+            category: Фільтр за категорією
+            date_from: Початкова дата (створення/оновлення)
+            date_to: Кінцева дата (створення/оновлення)
+            
+        Returns:
+            Список SQLAlchemy умов для filter()
+        """
+        filters = []
+        
+        # Пошук по тексту
+        if search_text:
+            search_text = search_text.strip()
+            if len(search_text) >= FTS_MIN_QUERY_LENGTH and self._has_fts(session):
+                # Підрядковий пошук через trigram-індекс замість трьох LIKE '%...%'
+                phrase = '"' + search_text.replace('"', '""') + '"'
+                filters.append(KnowledgeBaseNote.id.in_(
+                    select(text("rowid")).select_from(text("knowledge_base_notes_fts")).where(
+                        text("knowledge_base_notes_fts MATCH :phrase").bindparams(phrase=phrase)
+                    )
+                ))
+            else:
+                filters.append(
+                    or_(
+                        KnowledgeBaseNote.title.contains(search_text),
+                        KnowledgeBaseNote.content.contains(search_text),
+                        KnowledgeBaseNote.tags.contains(search_text)
+                    )
+                )
+        
+        # Фільтр за тегами
+        if tags:
+            tag_list = split_tags(tags)
+            if tag_list:
+                filters.append(self._tags_filter(tag_list))
+        
+        # Фільтр за категорією
+        if category:
+            filters.append(KnowledgeBaseNote.category == category)
+        
+        # Фільтр за датою
+        if date_from:
+            filters.append(
+                (KnowledgeBaseNote.created_at >= date_from) |
+                (KnowledgeBaseNote.updated_at >= date_from)
+            )
+        if date_to:
+            filters.append(
+                (KnowledgeBaseNote.created_at <= date_to) |
+                (KnowledgeBaseNote.updated_at <= date_to)
+            )
+        
+        return filters
+    
+    @staticmethod
+    def get_next_cursor(notes: List[Dict[str, Any]]) -> Optional[Tuple[datetime, int]]:
+        """
+        Keyset-курсор для наступної сторінки get_notes/search_notes
+        
+        Args:
+            notes: Поточна сторінка нотаток
+            
+        Returns:
+            (updated_at, id) останньої нотатки або None, якщо сторінка порожня
+        """
+        if not notes or not notes[-1]['updated_at']:
+            return None
+        last = notes[-1]
+        return datetime.fromisoformat(last['updated_at']), last['id']
+    
+    @staticmethod
+    def cursor_to_param(cursor: Optional[Tuple[datetime, int]]) -> Optional[str]:
+        """
+        Курсор у вигляді параметра URL ('<updated_at ISO>_<id>')
+        
+        Args:
+            cursor: Курсор get_next_cursor або None
+            
+        Returns:
+            Рядок для query string або None
+        """
+        if cursor is None:
+            return None
+        updated_at, note_id = cursor
+        return f"{updated_at.isoformat()}_{note_id}"
+    
+    @staticmethod
+    def cursor_from_param(value: Optional[str]) -> Optional[Tuple[datetime, int]]:
+        """
+        Розбір курсора з параметра URL (cursor_to_param)
+        
+        Args:
+            value: Значення параметра
+            
+        Returns:
+            Курсор або None, якщо параметр відсутній чи некоректний
+        """
+        if not value:
+            return None
+        updated_at, _, note_id = value.rpartition('_')
+        try:
+            return datetime.fromisoformat(updated_at), int(note_id)
+        except ValueError:
+            return None
+    
+    def _cursor_filter(self, cursor: Tuple[datetime, int]):
+        """
+        Умова "після курсора" для порядку (updated_at DESC, id DESC)
+        
+        Args:
+            cursor: (updated_at, id) останньої нотатки попередньої сторінки
+            
+        Returns:
+            SQLAlchemy умова для filter()
+        """
+        return tuple_(KnowledgeBaseNote.updated_at, KnowledgeBaseNote.id) < tuple_(*cursor)
+    
+    def _tags_filter(self, tag_list: List[str]):
+        """
+        Умова "нотатка має хоча б один з тегів" через таблицю зв'язків (без LIKE '%tag%')
+        
+        Args:
+            tag_list: Нормалізовані теги (split_tags), враховуються перші MAX_FILTER_TAGS
+            
+        Returns:
+            SQLAlchemy умова для filter()
+        """
+        return KnowledgeBaseNote.id.in_(
+            select(KnowledgeBaseNoteTag.note_id).join(
+                KnowledgeBaseTag,
+                KnowledgeBaseTag.id == KnowledgeBaseNoteTag.tag_id
+            ).where(KnowledgeBaseTag.name.in_(tag_list[:MAX_FILTER_TAGS]))
+        )
+    
+    def _sync_note_tags(self, session: Session, note_id: int, tags: Optional[str]) -> None:
         """
-        Конвертація нотатки в словник
+        Синхронізація зв'язків нотатки з довідником тегів
         
         Args:
-            note: Об'єкт нотатки
+            session: Поточна сесія (commit виконує викликач)
+            note_id: ID нотатки
+            tags: Теги через кому
+        """
+        names = split_tags(tags)
+        session.query(KnowledgeBaseNoteTag).filter(
+            KnowledgeBaseNoteTag.note_id == note_id
+        ).delete(synchronize_session=False)
+        if not names:
+            return
+        
+        session.execute(
+            text("INSERT INTO knowledge_base_tags (name) VALUES (:name) ON CONFLICT(name) DO NOTHING"),
+            [{'name': name} for name in names]
+        )
+        tag_ids = session.query(KnowledgeBaseTag.id).filter(KnowledgeBaseTag.name.in_(names)).all()
+        session.execute(
+            text("INSERT INTO knowledge_base_note_tags (note_id, tag_id) VALUES (:note_id, :tag_id)"),
+            [{'note_id': note_id, 'tag_id': tag_id} for (tag_id,) in tag_ids]
+        )
+    
+    def _notes_query(self, session: Session):
+        """
+        Запит рядків нотаток (NOTE_COLUMNS) з автором через LEFT JOIN, без ORM-гідратації
+        
+        Args:
+            session: Сесія БД
+            
+        Returns:
+            Query, рядки якого перетворюються через _row_to_dict
+        """
+        return session.query(*NOTE_COLUMNS).outerjoin(
+            User, User.user_id == KnowledgeBaseNote.author_id
+        )
+    
+    def _row_to_dict(self, row) -> Dict[str, Any]:
+        """
+        Конвертація рядка нотатки (NOTE_COLUMNS) в словник
+        
+        Args:
+            row: Рядок результату _notes_query
             
         Returns:
             Словник з даними нотатки
         """
-        author_name = None
-        if note.author:
-            author_name = note.author.full_name or note.author.username or f"ID: {note.author.user_id}"
-        
-        return {
-            'id': note.id,
-            'title': note.title,
-            'content': note.content,
-            'resource_url': note.resource_url,
-            'commands': note.commands,
-            'tags': note.tags,
-            'category': note.category,
-            'author_id': note.author_id,
-            'author_name': author_name,
-            'created_at': note.created_at.isoformat() if note.created_at else None,
-            'updated_at': note.updated_at.isoformat() if note.updated_at else None
-        }
+        note = row._asdict()
+        author_user_id = note.pop('author_user_id')
+        author_full_name = note.pop('author_full_name')
+        author_username = note.pop('author_username')
+        note['author_name'] = (
+            author_full_name or author_username or f"ID: {author_user_id}"
+        ) if author_user_id is not None else None
+        return note
     
     def add_favorite(self, user_id: int, note_id: int) -> bool:
         """
@@ -483,25 +842,16 @@ class KnowledgeBaseManager:
         """
         try:
             with get_session() as session:
-                # Перевіряємо, чи вже є в закладках
-                existing = session.query(KnowledgeBaseFavorite).filter(
-                    KnowledgeBaseFavorite.user_id == user_id,
-                    KnowledgeBaseFavorite.note_id == note_id
-                ).first()
-                
-                if existing:
-                    return True  # Вже в закладках
-                
-                favorite = KnowledgeBaseFavorite(
-                    user_id=user_id,
-                    note_id=note_id,
-                    created_at=datetime.now()
-                )
-                session.add(favorite)
+                # Один INSERT: дублікат відсікає унікальний ключ uq_user_note_favorite
+                stmt = sqlite_insert(KnowledgeBaseFavorite).values(
+                    user_id=user_id, note_id=note_id
+                ).on_conflict_do_nothing(index_elements=['user_id', 'note_id'])
+                added = session.execute(stmt).rowcount > 0
                 session.commit()
-                
+            
+            if added:
                 logger.log_info(f"Додано нотатку {note_id} в закладки користувача {user_id}")
-                return True
+            return True  # Додано або вже в закладках
                 
         except Exception as e:
             logger.log_error(f"Помилка додавання в закладки: {e}")
@@ -520,15 +870,14 @@ class KnowledgeBaseManager:
         """
         try:
             with get_session() as session:
-                favorite = session.query(KnowledgeBaseFavorite).filter(
+                deleted = session.query(KnowledgeBaseFavorite).filter(
                     KnowledgeBaseFavorite.user_id == user_id,
                     KnowledgeBaseFavorite.note_id == note_id
-                ).first()
+                ).delete(synchronize_session=False)
                 
-                if not favorite:
+                if not deleted:
                     return True  # Вже не в закладках
                 
-                session.delete(favorite)
                 session.commit()
                 
                 logger.log_info(f"Видалено нотатку {note_id} з закладок користувача {user_id}")
@@ -550,18 +899,59 @@ class KnowledgeBaseManager:
             True якщо нотатка в закладках
         """
         try:
-            with get_session() as session:
-                favorite = session.query(KnowledgeBaseFavorite).filter(
-                    KnowledgeBaseFavorite.user_id == user_id,
-                    KnowledgeBaseFavorite.note_id == note_id
-                ).first()
-                
-                return favorite is not None
+            with get_read_session() as session:
+                return self._favorite_exists(session, user_id, note_id)
                 
         except Exception as e:
             logger.log_error(f"Помилка перевірки закладки: {e}")
             return False
     
+    def get_favorite_note_ids(self, user_id: int, note_ids: List[int]) -> Set[int]:
+        """
+        Які з переданих нотаток є в закладках користувача (один запит на сторінку)
+        
+        Args:
+            user_id: ID користувача
+            note_ids: ID нотаток
+            
+        Returns:
+            Множина ID нотаток, що є в закладках
+        """
+        if not note_ids:
+            return set()
+        
+        try:
+            with get_read_session() as session:
+                rows = session.query(KnowledgeBaseFavorite.note_id).filter(
+                    KnowledgeBaseFavorite.user_id == user_id,
+                    KnowledgeBaseFavorite.note_id.in_(note_ids)
+                ).all()
+                
+                return {row[0] for row in rows}
+                
+        except Exception as e:
+            logger.log_error(f"Помилка отримання закладок користувача {user_id}: {e}")
+            return set()
+    
+    def _favorite_exists(self, session: Session, user_id: int, note_id: int) -> bool:
+        """
+        SELECT EXISTS по унікальному індексу (user_id, note_id) без завантаження рядка
+        
+        Args:
+            session: Поточна сесія
+            user_id: ID користувача
+            note_id: ID нотатки
+            
+        Returns:
+            True якщо нотатка в закладках
+        """
+        return session.query(
+            session.query(KnowledgeBaseFavorite).filter(
+                KnowledgeBaseFavorite.user_id == user_id,
+                KnowledgeBaseFavorite.note_id == note_id
+            ).exists()
+        ).scalar()
+    
     def get_user_favorites(self, user_id: int, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
         """
         Отримати закладки користувача з пагінацією
@@ -575,8 +965,8 @@ class KnowledgeBaseManager:
             Список нотаток з закладок
         """
         try:
-            with get_session() as session:
-                query = session.query(KnowledgeBaseNote).join(
+            with get_read_session() as session:
+                query = self._notes_query(session).join(
                     KnowledgeBaseFavorite,
                     KnowledgeBaseNote.id == KnowledgeBaseFavorite.note_id
                 ).filter(
@@ -588,9 +978,8 @@ class KnowledgeBaseManager:
                 if offset:
                     query = query.offset(offset)
                 
-                notes = query.all()
-                
-                return [self._note_to_dict(note) for note in notes]
+                # Пакетна вибірка: словники будуються по мірі читання рядків
+                return list(map(self._row_to_dict, query.yield_per(NOTES_FETCH_BATCH)))
                 
         except Exception as e:
             logger.log_error(f"Помилка отримання закладок користувача {user_id}: {e}")
@@ -607,12 +996,11 @@ class KnowledgeBaseManager:
             Кількість закладок
         """
         try:
-            with get_session() as session:
-                count = session.query(KnowledgeBaseFavorite).filter(
+            with get_read_session() as session:
+                # COUNT(*) напряму, без підзапиту Query.count(); відповідає індекс ix_knowledge_base_favorites_user_id
+                return session.query(func.count()).select_from(KnowledgeBaseFavorite).filter(
                     KnowledgeBaseFavorite.user_id == user_id
-                ).count()
-                
-                return count
+                ).scalar()
                 
         except Exception as e:
             logger.log_error(f"Помилка підрахунку закладок користувача {user_id}: {e}")
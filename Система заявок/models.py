@@ -1,7 +1,7 @@
 """
 SQLAlchemy моделі для системи заявок на заправку картриджей та ремонт принтерів
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, UniqueConstraint, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -143,6 +143,11 @@ class PrinterCartridgeCompatibility(Base):
     printer = relationship('Printer', backref='compatibilities')
     cartridge_type = relationship('CartridgeType', backref='compatibilities')
     
+    # Унікальний індекс на (printer_id, cartridge_type_id) — ціль для ON CONFLICT при імпорті
+    __table_args__ = (
+        Index('uq_printer_cartridge', 'printer_id', 'cartridge_type_id', unique=True),
+    )
+    
     def __repr__(self):
         return f"<PrinterCartridgeCompatibility(printer_id={self.printer_id}, cartridge_type_id={self.cartridge_type_id}, is_default={self.is_default})>"
 
@@ -254,11 +259,16 @@ class AnnouncementRecipient(Base):
     __tablename__ = 'announcement_recipients'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    announcement_id = Column(Integer, ForeignKey('announcements.id'), nullable=False, index=True)
+    announcement_id = Column(Integer, ForeignKey('announcements.id'), nullable=False)
     recipient_user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, index=True)
     sent_at = Column(DateTime, default=datetime.now, index=True)
     status = Column(String(20), default='sent')  # sent, failed, blocked
     
+    # Один запис на отримувача; індекс також обслуговує вибірку отримувачів оголошення
+    __table_args__ = (
+        Index('ix_ann_recip_ann_user', 'announcement_id', 'recipient_user_id', unique=True),
+    )
+    
     def __repr__(self):
         return f"<AnnouncementRecipient(announcement_id={self.announcement_id}, recipient_user_id={self.recipient_user_id}, status='{self.status}')>"
 
@@ -274,7 +284,16 @@ class ActiveSession(Base):
     user_agent = Column(String(500), nullable=True)
     login_time = Column(DateTime, default=datetime.now, nullable=False)
     last_activity = Column(DateTime, default=datetime.now, nullable=False, index=True)
-    is_active = Column(Boolean, default=True, nullable=False, index=True)
+    is_active = Column(Boolean, default=True, nullable=False)
+    
+    # Частковий індекс лише по активних сесіях: "активні сесії користувача" та відбір застарілих за last_activity
+    __table_args__ = (
+        Index(
+            'ix_active_sessions_active_last', 'user_id', 'last_activity',
+            sqlite_where=text('is_active = 1'),
+            postgresql_where=text('is_active = true')
+        ),
+    )
     
     user = relationship('User', backref='active_sessions')
     
@@ -329,7 +348,7 @@ class Poll(Base):
     expires_at = Column(DateTime, nullable=True, index=True)  # Термін дії опитування
     sent_to_users = Column(Boolean, default=False)  # Чи відправлено опитування користувачам
     is_anonymous = Column(Boolean, default=False)  # Чи є опитування анонімним
-    recipient_user_ids = Column(Text, nullable=True)  # JSON список ID користувачів
+    recipient_user_ids = Column(Text, nullable=True)  # Застарілий JSON список ID користувачів (лише читання; нові - у poll_recipients)
     
     def __repr__(self):
         return f"<Poll(id={self.id}, question='{self.question[:50]}...', is_closed={self.is_closed}, is_anonymous={self.is_anonymous})>"
@@ -353,15 +372,40 @@ class PollResponse(Base):
     __tablename__ = 'poll_responses'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    poll_id = Column(Integer, ForeignKey('polls.id', ondelete='CASCADE'), nullable=False, index=True)
+    poll_id = Column(Integer, ForeignKey('polls.id', ondelete='CASCADE'), nullable=False)
     option_id = Column(Integer, ForeignKey('poll_options.id', ondelete='CASCADE'), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, index=True)
     responded_at = Column(DateTime, default=datetime.now, index=True)
     
+    # Одна відповідь користувача на опитування ("чи голосував X у Y") та підрахунок голосів по варіантах
+    __table_args__ = (
+        Index('ix_poll_responses_poll_user', 'poll_id', 'user_id', unique=True),
+        Index('ix_poll_responses_poll_option', 'poll_id', 'option_id'),
+    )
+    
     def __repr__(self):
         return f"<PollResponse(poll_id={self.poll_id}, user_id={self.user_id}, option_id={self.option_id})>"
 
 
+class PollRecipient(Base):
+    """Модель отримувача опитування"""
+    __tablename__ = 'poll_recipients'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    poll_id = Column(Integer, ForeignKey('polls.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    sent_at = Column(DateTime, default=datetime.now)
+    
+    # Отримувачі опитування та опитування, надіслані користувачу
+    __table_args__ = (
+        Index('ix_poll_recipients_poll_user', 'poll_id', 'user_id', unique=True),
+        Index('ix_pr_user_poll', 'user_id', 'poll_id'),
+    )
+    
+    def __repr__(self):
+        return f"<PollRecipient(poll_id={self.poll_id}, user_id={self.user_id})>"
+
+
 class TicketChat(Base):
     """Модель повідомлень чату в заявці"""
     __tablename__ = 'ticket_chats'
@@ -466,12 +510,43 @@ class KnowledgeBaseNote(Base):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, index=True)
     
     # Relationships
-    author = relationship('User', foreign_keys=[author_id])
+    # lazy='raise': автор завантажується явно (JOIN у проєкції NOTE_COLUMNS), випадковий lazy load - помилка, а не N+1
+    author = relationship('User', foreign_keys=[author_id], lazy='raise')
+    # Нормалізовані теги (рядок tags лишається для відображення)
+    tag_items = relationship('KnowledgeBaseTag', secondary='knowledge_base_note_tags', backref='notes')
+    
+    # Фільтр за категорією + сортування (updated_at DESC, id DESC) одним впорядкованим проходом індексу
+    __table_args__ = (
+        Index('ix_kb_notes_category_updated', category, updated_at.desc(), id.desc()),
+    )
     
     def __repr__(self):
         return f"<KnowledgeBaseNote(id={self.id}, title='{self.title[:50]}...', author_id={self.author_id})>"
 
 
+class KnowledgeBaseTag(Base):
+    """Довідник тегів бази знань"""
+    __tablename__ = 'knowledge_base_tags'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(64), unique=True, nullable=False, index=True)  # Назва тегу
+    
+    def __repr__(self):
+        return f"<KnowledgeBaseTag(id={self.id}, name='{self.name}')>"
+
+
+class KnowledgeBaseNoteTag(Base):
+    """Зв'язок нотаток бази знань з тегами"""
+    __tablename__ = 'knowledge_base_note_tags'
+    
+    # Складений первинний ключ (note_id, tag_id) - унікальність пари та пошук тегів нотатки
+    note_id = Column(Integer, ForeignKey('knowledge_base_notes.id', ondelete='CASCADE'), primary_key=True)
+    tag_id = Column(Integer, ForeignKey('knowledge_base_tags.id', ondelete='CASCADE'), primary_key=True, index=True)
+    
+    def __repr__(self):
+        return f"<KnowledgeBaseNoteTag(note_id={self.note_id}, tag_id={self.tag_id})>"
+
+
 class KnowledgeBaseFavorite(Base):
     """Модель закладок користувачів для нотаток бази знань"""
     __tablename__ = 'knowledge_base_favorites'
@@ -486,8 +561,10 @@ class KnowledgeBaseFavorite(Base):
     note = relationship('KnowledgeBaseNote', foreign_keys=[note_id])
     
     # Унікальний індекс на (user_id, note_id)
+    # Покриваючий індекс для списку закладок: фільтр user_id + сортування created_at DESC + note_id для JOIN
     __table_args__ = (
         UniqueConstraint('user_id', 'note_id', name='uq_user_note_favorite'),
+        Index('ix_kb_fav_user_created', user_id, created_at.desc(), note_id),
     )
     
     def __repr__(self):
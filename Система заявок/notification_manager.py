@@ -1,12 +1,25 @@
 """
 Модуль для відправки уведомлень через Telegram
 """
+import asyncio
 import html
+import importlib.util
 import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Coroutine, Iterable, List, Optional, Tuple, TypeVar
+
+import httpx
+import orjson
 import requests
-from typing import Optional
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from logger import logger
 
@@ -14,14 +27,249 @@ load_dotenv("config.env")
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}" if TELEGRAM_BOT_TOKEN else None
+_SEND_MESSAGE_URL = f"{TELEGRAM_API_URL}/sendMessage" if TELEGRAM_API_URL else None
+
+# Таймаут одного запиту до Telegram Bot API
+SEND_TIMEOUT = 10  # секунд
+
+# Тіло sendMessage серіалізується заздалегідь (orjson), тому заголовок ставимо самі
+_JSON_HEADERS = MappingProxyType({'Content-Type': 'application/json'})
+
+# Максимум одночасних з'єднань при розсилці (глобальний ліміт Telegram - 30 повідомлень/с)
+BROADCAST_MAX_CONNECTIONS = 30
+
+# HTTP/2: запити розсилки мультиплексуються в кількох TLS-з'єднаннях (потрібен пакет h2 - httpx[http2])
+BROADCAST_HTTP2 = importlib.util.find_spec('h2') is not None
+BROADCAST_HTTP2_MAX_CONNECTIONS = 4
+
+# Ліміти Telegram Bot API: 30 повідомлень/с загалом і 1 повідомлення/с в один чат
+GLOBAL_RATE_LIMIT = 30
+PER_CHAT_RATE_LIMIT = 1
+# Скільки чатів пам'ятає обмежувач (найдавніші витісняються)
+RATE_LIMITER_MAX_CHATS = 10000
+
+# Повтори відправки в розсилці після відповіді 429 (retry_after)
+BROADCAST_MAX_RETRIES = 3
+
+# Назви статусів заявок для оповіщень
+_STATUS_NAMES = MappingProxyType({
+    'NEW': '🆕 Нова',
+    'ACCEPTED': '✅ Прийнято',
+    'COLLECTING': '📦 Збір',
+    'SENT_TO_CONTRACTOR': '📤 Відправлено підряднику',
+    'WAITING_CONTRACTOR': '⏳ Очікування від підрядника',
+    'RECEIVED_FROM_CONTRACTOR': '📥 Отримано від підрядника',
+    'QC_CHECK': '🔍 Контроль якості',
+    'READY': '✅ Готово',
+    'DELIVERED_INSTALLED': '🎉 Видано та встановлено',
+    'CLOSED': '✔️ Закрито',
+    'NEED_INFO': 'ℹ️ Потрібна інформація',
+    'REJECTED_UNSUPPORTED': '❌ Відхилено',
+    'CANCELLED': '🚫 Скасовано',
+    'REWORK': '🔄 Переробка'
+})
+
+# Назви типів заявок
+_TYPE_NAMES = MappingProxyType({
+    "REFILL": "🖨️ Заправка картриджів",
+    "REPAIR": "🔧 Ремонт принтера",
+    "INCIDENT": "⚠️ Інцидент"
+})
+
+# Назви пріоритетів
+_PRIORITY_NAMES = MappingProxyType({
+    'LOW': '🟢 Низький',
+    'NORMAL': '🔵 Нормальний',
+    'HIGH': '🔴 Високий'
+})
+
+# Незмінні частини повідомлень про рішення щодо доступу
+_ACCESS_APPROVAL_HEADER = (
+    "✅ <b>Ваш запит на доступ схвалено!</b>\n\n"
+    "Тепер ви маєте доступ до системи заявок.\n\n"
+)
+_ACCESS_APPROVAL_FOOTER = "Використовуйте команду /start або /menu для початку роботи."
+_ACCESS_DENIAL_MESSAGE = (
+    "❌ <b>Ваш запит на доступ відхилено</b>\n\n"
+    "На жаль, ваш запит на доступ до системи заявок було відхилено адміністратором.\n\n"
+    "Якщо ви вважаєте, що це помилка, зверніться до адміністратора."
+)
+
+T = TypeVar('T')
+
+
+def _send_message_body(user_id: int, message: str) -> bytes:
+    """JSON-тіло запиту sendMessage (HTML-розмітка)"""
+    return orjson.dumps({
+        'chat_id': user_id,
+        'text': message,
+        'parse_mode': 'HTML'
+    })
+
+
+@lru_cache(maxsize=256)
+def _status_change_body(old_status: str, new_status: str, ticket_type: str) -> str:
+    """
+    Тіло повідомлення про зміну статусу (без заголовка з номером заявки та коментаря)
+    
+    Набір комбінацій (старий статус, новий статус, тип) невеликий, тому текст
+    формується один раз на комбінацію.
+    """
+    type_name = "Заправка картриджів" if ticket_type == "REFILL" else "Ремонт принтера"
+    old_status_name = _STATUS_NAMES.get(old_status, old_status)
+    new_status_name = _STATUS_NAMES.get(new_status, new_status)
+    return (
+        f"Тип: {type_name}\n"
+        f"Статус: {old_status_name} → {new_status_name}\n"
+    )
+
+
+def _run_coroutine(coro: Coroutine[None, None, T]) -> T:
+    """
+    Виконання корутини з синхронного коду
+    
+    Якщо в поточному потоці вже працює цикл подій (обробники бота викликають менеджери
+    синхронно), корутина виконується в окремому потоці з власним циклом.
+    
+    Args:
+        coro: Корутина
+        
+    Returns:
+        Результат корутини
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class TelegramRateLimiter:
+    """
+    Token bucket для лімітів Telegram: глобальний (30/с, запас 30) та на чат (1/с, запас 1)
+    
+    Кожен виклик reserve() бронює найближчий дозволений момент відправки і повертає
+    затримку до нього. Стан - лише часові мітки під threading.Lock, тому один обмежувач
+    спільний для синхронних відправок і розсилок у різних циклах подій. Чекає на затримку
+    лише розсилка (wait_async); синхронні відправки тільки відмічаються через record().
+    """
+    
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_RATE_LIMIT,
+        per_chat_rate: float = PER_CHAT_RATE_LIMIT,
+        max_chats: int = RATE_LIMITER_MAX_CHATS
+    ):
+        """
+        Ініціалізація обмежувача
+        
+        Args:
+            global_rate: Повідомлень на секунду загалом (він же розмір запасу)
+            per_chat_rate: Повідомлень на секунду в один чат
+            max_chats: Розмір LRU чатів
+        """
+        self._lock = threading.Lock()
+        self._global_interval = 1.0 / global_rate
+        # Допуск сплеску: global_rate повідомлень можна відправити одразу
+        self._global_burst = (global_rate - 1) * self._global_interval
+        self._global_next = 0.0
+        self._chat_interval = 1.0 / per_chat_rate
+        self._chat_next: "OrderedDict[int, float]" = OrderedDict()
+        self._max_chats = max_chats
+    
+    def reserve(self, chat_id: int) -> float:
+        """
+        Бронювання відправки в чат
+        
+        Args:
+            chat_id: ID чату
+            
+        Returns:
+            Затримка в секундах до дозволеного моменту відправки
+        """
+        with self._lock:
+            now = time.monotonic()
+            # Ліміт чату: не раніше ніж через інтервал після попереднього повідомлення
+            send_at = max(now, self._chat_next.get(chat_id, 0.0))
+            # Глобальний ліміт (GCRA): сплеск до global_rate, далі рівномірно
+            send_at = max(send_at, self._global_next - self._global_burst)
+            self._global_next = max(self._global_next, send_at) + self._global_interval
+            
+            self._set_chat_next(chat_id, send_at + self._chat_interval)
+            return send_at - now
+    
+    def record(self, chat_id: int) -> None:
+        """
+        Відмітка відправки в чат, що відбувається зараз (без очікування)
+        
+        На відміну від reserve() не бронює місце в майбутньому, тож серія синхронних
+        відправок не відсуває розсилку в цей чат на секунди вперед.
+        
+        Args:
+            chat_id: ID чату
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._global_next = max(self._global_next, now) + self._global_interval
+            self._set_chat_next(chat_id, max(self._chat_next.get(chat_id, 0.0), now + self._chat_interval))
+    
+    def _set_chat_next(self, chat_id: int, next_at: float) -> None:
+        """Найраніший момент наступної відправки в чат (LRU з max_chats чатів); під self._lock"""
+        self._chat_next[chat_id] = next_at
+        self._chat_next.move_to_end(chat_id)
+        if len(self._chat_next) > self._max_chats:
+            self._chat_next.popitem(last=False)
+    
+    async def wait_async(self, chat_id: int) -> None:
+        """Асинхронне очікування черги на відправку в чат"""
+        delay = self.reserve(chat_id)
+        if delay > 0:
+            await asyncio.sleep(delay)
 
 
 class NotificationManager:
     """Клас для відправки уведомлень через Telegram"""
     
+    __slots__ = ('_session', '_rate_limiter')
+    
     def __init__(self):
         """Ініціалізація менеджера уведомлень"""
-        pass
+        # Одна сесія на менеджер: keep-alive з'єднання до api.telegram.org перевикористовуються
+        # між повідомленнями (без нового TCP+TLS рукостискання на кожне)
+        self._session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            # Без 429: очікування retry_after блокувало б потік обробників бота
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["POST"],
+            raise_on_status=False  # після вичерпання спроб повертаємо останню відповідь
+        )
+        self._session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=30, max_retries=retry))
+        # Спільний для всіх відправок обмежувач частоти
+        self._rate_limiter = TelegramRateLimiter()
+    
+    def _post_message(self, user_id: int, message: str) -> requests.Response:
+        """
+        Відправка повідомлення (sendMessage) з урахуванням лімітів Telegram
+        
+        Args:
+            user_id: ID чату
+            message: Текст повідомлення (HTML)
+            
+        Returns:
+            Відповідь Telegram Bot API
+        """
+        # Синхронні відправки викликаються з обробників бота в потоці циклу подій, тому не чекають:
+        # короткі сплески в один чат Telegram допускає, а відмітку враховує розсилка
+        self._rate_limiter.record(user_id)
+        return self._session.post(
+            _SEND_MESSAGE_URL,
+            data=_send_message_body(user_id, message),
+            headers=_JSON_HEADERS,
+            timeout=SEND_TIMEOUT
+        )
     
     def send_ticket_status_notification(
         self,
@@ -46,50 +294,20 @@ class NotificationManager:
         Returns:
             True якщо уведомлення відправлено
         """
-        if not TELEGRAM_BOT_TOKEN:
+        if not TELEGRAM_BOT_TOKEN or not user_id:
             return False
         
         # Формуємо повідомлення
-        status_names = {
-            'NEW': '🆕 Нова',
-            'ACCEPTED': '✅ Прийнято',
-            'COLLECTING': '📦 Збір',
-            'SENT_TO_CONTRACTOR': '📤 Відправлено підряднику',
-            'WAITING_CONTRACTOR': '⏳ Очікування від підрядника',
-            'RECEIVED_FROM_CONTRACTOR': '📥 Отримано від підрядника',
-            'QC_CHECK': '🔍 Контроль якості',
-            'READY': '✅ Готово',
-            'DELIVERED_INSTALLED': '🎉 Видано та встановлено',
-            'CLOSED': '✔️ Закрито',
-            'NEED_INFO': 'ℹ️ Потрібна інформація',
-            'REJECTED_UNSUPPORTED': '❌ Відхилено',
-            'CANCELLED': '🚫 Скасовано',
-            'REWORK': '🔄 Переробка'
-        }
-        
-        type_name = "Заправка картриджів" if ticket_type == "REFILL" else "Ремонт принтера"
-        old_status_name = status_names.get(old_status, old_status)
-        new_status_name = status_names.get(new_status, new_status)
-        
         message = (
             f"📋 <b>Оновлення заявки #{ticket_id}</b>\n\n"
-            f"Тип: {type_name}\n"
-            f"Статус: {old_status_name} → {new_status_name}\n"
+            f"{_status_change_body(old_status, new_status, ticket_type)}"
         )
         
         if admin_comment:
             message += f"\n💬 Коментар адміна:\n{admin_comment}"
         
         try:
-            response = requests.post(
-                f"{TELEGRAM_API_URL}/sendMessage",
-                json={
-                    'chat_id': user_id,
-                    'text': message,
-                    'parse_mode': 'HTML'
-                },
-                timeout=10
-            )
+            response = self._post_message(user_id, message)
             
             if response.status_code == 200:
                 logger.log_info(f"Уведомлення про зміну статусу заявки {ticket_id} відправлено користувачу {user_id}")
@@ -129,77 +347,99 @@ class NotificationManager:
         Returns:
             True якщо уведомлення відправлено
         """
-        if not TELEGRAM_BOT_TOKEN:
+        if not TELEGRAM_BOT_TOKEN or not user_id:
             return False
         
-        # Назви типів заявок
-        type_names = {
-            "REFILL": "🖨️ Заправка картриджів",
-            "REPAIR": "🔧 Ремонт принтера",
-            "INCIDENT": "⚠️ Інцидент"
-        }
-        type_name = type_names.get(ticket_type, ticket_type)
-        
-        # Назви пріоритетів
-        priority_names = {
-            'LOW': '🟢 Низький',
-            'NORMAL': '🔵 Нормальний',
-            'HIGH': '🔴 Високий'
-        }
-        priority_name = priority_names.get(priority, priority)
+        message = self._format_new_ticket_message(
+            ticket_id, ticket_type, company_name, user_name, priority, items, comment
+        )
         
-        # Формуємо повідомлення
-        message = (
+        try:
+            response = self._post_message(user_id, message)
+            
+            if response.status_code == 200:
+                logger.log_info(f"Оповіщення про нову заявку {ticket_id} відправлено користувачу {user_id}")
+                return True
+            else:
+                logger.log_warning(f"Помилка відправки оповіщення про нову заявку користувачу {user_id}: {response.text}")
+                return False
+                
+        except Exception as e:
+            logger.log_error(f"Помилка відправки оповіщення про нову заявку: {e}")
+            return False
+    
+    def broadcast_new_ticket_notification(
+        self,
+        user_ids: Iterable[int],
+        ticket_id: int,
+        ticket_type: str,
+        company_name: str,
+        user_name: str,
+        priority: str,
+        items: list,
+        comment: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """
+        Одночасна розсилка оповіщення про нову заявку кільком виконавцям
+        
+        Args:
+            user_ids: ID користувачів-виконавців
+            Решта аргументів - як у send_new_ticket_notification
+        
+        Returns:
+            (успішно, помилок)
+        """
+        message = self._format_new_ticket_message(
+            ticket_id, ticket_type, company_name, user_name, priority, items, comment
+        )
+        return self.broadcast(user_ids, message, f"Оповіщення про нову заявку {ticket_id}")
+    
+    def _format_new_ticket_message(
+        self,
+        ticket_id: int,
+        ticket_type: str,
+        company_name: str,
+        user_name: str,
+        priority: str,
+        items: list,
+        comment: Optional[str] = None
+    ) -> str:
+        """Текст оповіщення про нову заявку (аргументи - як у send_new_ticket_notification)"""
+        type_name = _TYPE_NAMES.get(ticket_type, ticket_type)
+        priority_name = _PRIORITY_NAMES.get(priority, priority)
+        
+        # Формуємо повідомлення частинами і з'єднуємо один раз (без += у циклі)
+        parts = [
             f"📋 <b>Нова заявка #{ticket_id}</b>\n\n"
             f"<b>Тип:</b> {type_name}\n"
             f"<b>Пріоритет:</b> {priority_name}\n"
             f"<b>Компанія:</b> {company_name}\n"
             f"<b>Від:</b> {user_name}\n\n"
-        )
+        ]
         
         # Додаємо позиції заявки (тільки якщо є позиції)
         if items:
-            message += "<b>Позиції:</b>\n"
+            parts.append("<b>Позиції:</b>\n")
             for idx, item in enumerate(items, 1):
-                if item.get('item_type') == 'CARTRIDGE':
-                    cartridge_name = item.get('cartridge_name', 'Невідомо')
-                    quantity = item.get('quantity', 1)
-                    printer_name = item.get('printer_name', '')
+                get = item.get
+                item_type = get('item_type')
+                if item_type == 'CARTRIDGE':
+                    cartridge_name = get('cartridge_name', 'Невідомо')
+                    quantity = get('quantity', 1)
+                    printer_name = get('printer_name', '')
                     if printer_name:
-                        message += f"{idx}. {cartridge_name} (для {printer_name}) - {quantity} шт.\n"
+                        parts.append(f"{idx}. {cartridge_name} (для {printer_name}) - {quantity} шт.\n")
                     else:
-                        message += f"{idx}. {cartridge_name} - {quantity} шт.\n"
-                elif item.get('item_type') == 'PRINTER':
-                    printer_name = item.get('printer_name', 'Невідомо')
-                    message += f"{idx}. Принтер: {printer_name}\n"
+                        parts.append(f"{idx}. {cartridge_name} - {quantity} шт.\n")
+                elif item_type == 'PRINTER':
+                    parts.append(f"{idx}. Принтер: {get('printer_name', 'Невідомо')}\n")
         
         # Додаємо коментар, якщо є
         if comment:
-            message += f"\n💬 <b>Коментар:</b>\n{comment}\n"
+            parts.append(f"\n💬 <b>Коментар:</b>\n{comment}\n")
         
-        message += f"\n🆔 ID заявки: #{ticket_id}"
-        
-        try:
-            response = requests.post(
-                f"{TELEGRAM_API_URL}/sendMessage",
-                json={
-                    'chat_id': user_id,
-                    'text': message,
-                    'parse_mode': 'HTML'
-                },
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                logger.log_info(f"Оповіщення про нову заявку {ticket_id} відправлено користувачу {user_id}")
-                return True
-            else:
-                logger.log_warning(f"Помилка відправки оповіщення про нову заявку користувачу {user_id}: {response.text}")
-                return False
-                
-        except Exception as e:
-            logger.log_error(f"Помилка відправки оповіщення про нову заявку: {e}")
-            return False
+        parts.append(f"\n🆔 ID заявки: #{ticket_id}")
+        return "".join(parts)
 
     def send_service_consultation_notification(
         self,
@@ -216,9 +456,79 @@ class NotificationManager:
         """
         Оповіщення про нову заявку на консультацію від гостя (користувачі з «Нові клієнти»).
         """
-        if not TELEGRAM_BOT_TOKEN:
+        if not TELEGRAM_BOT_TOKEN or not user_id:
             return False
 
+        message = self._format_service_consultation_message(
+            request_id=request_id,
+            contact_name=contact_name,
+            phone=phone,
+            preferred_call_time=preferred_call_time,
+            telegram_user_id=telegram_user_id,
+            telegram_username=telegram_username,
+            telegram_first_name=telegram_first_name,
+            telegram_last_name=telegram_last_name,
+        )
+
+        try:
+            response = self._post_message(user_id, message)
+            if response.status_code == 200:
+                logger.log_info(
+                    f"Оповіщення про заявку на консультацію #{request_id} відправлено користувачу {user_id}"
+                )
+                return True
+            logger.log_warning(
+                f"Помилка відправки оповіщення про консультацію користувачу {user_id}: {response.text}"
+            )
+            return False
+        except Exception as e:
+            logger.log_error(f"Помилка відправки оповіщення про консультацію: {e}")
+            return False
+
+    def broadcast_service_consultation_notification(
+        self,
+        user_ids: Iterable[int],
+        request_id: int,
+        contact_name: str,
+        phone: str,
+        preferred_call_time: str,
+        telegram_user_id: int,
+        telegram_username: Optional[str],
+        telegram_first_name: Optional[str],
+        telegram_last_name: Optional[str],
+    ) -> Tuple[int, int]:
+        """
+        Одночасна розсилка оповіщення про заявку на консультацію всім отримувачам.
+
+        Returns:
+            (успішно, помилок)
+        """
+        message = self._format_service_consultation_message(
+            request_id=request_id,
+            contact_name=contact_name,
+            phone=phone,
+            preferred_call_time=preferred_call_time,
+            telegram_user_id=telegram_user_id,
+            telegram_username=telegram_username,
+            telegram_first_name=telegram_first_name,
+            telegram_last_name=telegram_last_name,
+        )
+        return self.broadcast(user_ids, message, f"Оповіщення про заявку на консультацію #{request_id}")
+
+    def _format_service_consultation_message(
+        self,
+        request_id: int,
+        contact_name: str,
+        phone: str,
+        preferred_call_time: str,
+        telegram_user_id: int,
+        telegram_username: Optional[str],
+        telegram_first_name: Optional[str],
+        telegram_last_name: Optional[str],
+    ) -> str:
+        """
+        Текст оповіщення про заявку на консультацію.
+        """
         uname = f"@{html.escape(telegram_username)}" if telegram_username else "немає username"
         fn = html.escape(telegram_first_name or "") or "—"
         ln = html.escape(telegram_last_name or "") or "—"
@@ -230,7 +540,7 @@ class NotificationManager:
             if re.fullmatch(r"[a-zA-Z0-9_]{5,32}", u):
                 tme_link_line = f'• <a href="https://t.me/{u}">Написати в Telegram</a>\n'
 
-        message = (
+        return (
             "📞 <b>Нова заявка на консультацію</b>\n\n"
             f"<b>№ заявки:</b> #{request_id}\n"
             f"<b>Контактне ім'я:</b> {html.escape(contact_name)}\n"
@@ -244,29 +554,6 @@ class NotificationManager:
             f"• Прізвище: {ln}\n"
         )
 
-        try:
-            response = requests.post(
-                f"{TELEGRAM_API_URL}/sendMessage",
-                json={
-                    "chat_id": user_id,
-                    "text": message,
-                    "parse_mode": "HTML",
-                },
-                timeout=10,
-            )
-            if response.status_code == 200:
-                logger.log_info(
-                    f"Оповіщення про заявку на консультацію #{request_id} відправлено користувачу {user_id}"
-                )
-                return True
-            logger.log_warning(
-                f"Помилка відправки оповіщення про консультацію користувачу {user_id}: {response.text}"
-            )
-            return False
-        except Exception as e:
-            logger.log_error(f"Помилка відправки оповіщення про консультацію: {e}")
-            return False
-
     def send_access_approval_notification(
         self,
         user_id: int,
@@ -282,29 +569,14 @@ class NotificationManager:
         Returns:
             True якщо уведомлення відправлено
         """
-        if not TELEGRAM_BOT_TOKEN:
+        if not TELEGRAM_BOT_TOKEN or not user_id:
             return False
         
-        message = (
-            "✅ <b>Ваш запит на доступ схвалено!</b>\n\n"
-            "Тепер ви маєте доступ до системи заявок.\n\n"
-        )
-        
-        if company_name:
-            message += f"<b>Компанія:</b> {company_name}\n\n"
-        
-        message += "Використовуйте команду /start або /menu для початку роботи."
+        company_line = f"<b>Компанія:</b> {company_name}\n\n" if company_name else ""
+        message = f"{_ACCESS_APPROVAL_HEADER}{company_line}{_ACCESS_APPROVAL_FOOTER}"
         
         try:
-            response = requests.post(
-                f"{TELEGRAM_API_URL}/sendMessage",
-                json={
-                    'chat_id': user_id,
-                    'text': message,
-                    'parse_mode': 'HTML'
-                },
-                timeout=10
-            )
+            response = self._post_message(user_id, message)
             
             if response.status_code == 200:
                 logger.log_info(f"Оповіщення про схвалення доступу відправлено користувачу {user_id}")
@@ -330,25 +602,11 @@ class NotificationManager:
         Returns:
             True якщо уведомлення відправлено
         """
-        if not TELEGRAM_BOT_TOKEN:
+        if not TELEGRAM_BOT_TOKEN or not user_id:
             return False
         
-        message = (
-            "❌ <b>Ваш запит на доступ відхилено</b>\n\n"
-            "На жаль, ваш запит на доступ до системи заявок було відхилено адміністратором.\n\n"
-            "Якщо ви вважаєте, що це помилка, зверніться до адміністратора."
-        )
-        
         try:
-            response = requests.post(
-                f"{TELEGRAM_API_URL}/sendMessage",
-                json={
-                    'chat_id': user_id,
-                    'text': message,
-                    'parse_mode': 'HTML'
-                },
-                timeout=10
-            )
+            response = self._post_message(user_id, _ACCESS_DENIAL_MESSAGE)
             
             if response.status_code == 200:
                 logger.log_info(f"Оповіщення про відхилення доступу відправлено користувачу {user_id}")
@@ -378,26 +636,13 @@ class NotificationManager:
         Returns:
             True якщо уведомлення відправлено
         """
-        if not TELEGRAM_BOT_TOKEN:
+        if not TELEGRAM_BOT_TOKEN or not user_id:
             return False
         
-        message = (
-            "🔐 <b>Новий запит на доступ до системи</b>\n\n"
-            f"👤 <b>Користувач:</b> @{requesting_username}\n"
-            f"🆔 <b>ID:</b> {requesting_user_id}\n\n"
-            "Перегляньте запит у веб-інтерфейсі та надайте або відхиліть доступ."
-        )
+        message = self._format_new_access_request_message(requesting_user_id, requesting_username)
         
         try:
-            response = requests.post(
-                f"{TELEGRAM_API_URL}/sendMessage",
-                json={
-                    'chat_id': user_id,
-                    'text': message,
-                    'parse_mode': 'HTML'
-                },
-                timeout=10
-            )
+            response = self._post_message(user_id, message)
             
             if response.status_code == 200:
                 logger.log_info(f"Оповіщення про новий запит на доступ від {requesting_user_id} відправлено користувачу {user_id}")
@@ -410,6 +655,35 @@ class NotificationManager:
             logger.log_error(f"Помилка відправки оповіщення про новий запит на доступ: {e}")
             return False
     
+    def broadcast_new_access_request_notification(
+        self,
+        user_ids: Iterable[int],
+        requesting_user_id: int,
+        requesting_username: str
+    ) -> Tuple[int, int]:
+        """
+        Одночасна розсилка оповіщення про новий запит на доступ
+        
+        Args:
+            user_ids: ID користувачів-отримувачів оповіщення (виконавців)
+            requesting_user_id: ID користувача, який подав запит
+            requesting_username: Username користувача, який подав запит
+        
+        Returns:
+            (успішно, помилок)
+        """
+        message = self._format_new_access_request_message(requesting_user_id, requesting_username)
+        return self.broadcast(user_ids, message, f"Оповіщення про новий запит на доступ від {requesting_user_id}")
+    
+    def _format_new_access_request_message(self, requesting_user_id: int, requesting_username: str) -> str:
+        """Текст оповіщення про новий запит на доступ"""
+        return (
+            "🔐 <b>Новий запит на доступ до системи</b>\n\n"
+            f"👤 <b>Користувач:</b> @{requesting_username}\n"
+            f"🆔 <b>ID:</b> {requesting_user_id}\n\n"
+            "Перегляньте запит у веб-інтерфейсі та надайте або відхиліть доступ."
+        )
+    
     def send_todo_tasks_notification(
         self,
         user_id: int,
@@ -427,56 +701,176 @@ class NotificationManager:
         Returns:
             True якщо уведомлення відправлено
         """
-        if not TELEGRAM_BOT_TOKEN:
+        if not TELEGRAM_BOT_TOKEN or not user_id:
             return False
         
         if not tasks:
             # Якщо завдань немає, не відправляємо повідомлення
             return False
         
+        message = self._format_todo_tasks_message(tasks, header_text)
+        
+        try:
+            response = self._post_message(user_id, message)
+            
+            if response.status_code == 200:
+                logger.log_info(f"Ранковий звіт про завдання відправлено користувачу {user_id}")
+                return True
+            else:
+                logger.log_warning(f"Помилка відправки ранкового звіту користувачу {user_id}: {response.text}")
+                return False
+                
+        except Exception as e:
+            logger.log_error(f"Помилка відправки ранкового звіту: {e}")
+            return False
+    
+    def broadcast_todo_tasks_notification(
+        self,
+        user_ids: Iterable[int],
+        tasks: list,
+        header_text: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """
+        Одночасна розсилка ранкового звіту про завдання на сьогодні
+        
+        Args:
+            user_ids: ID користувачів
+            tasks: Список завдань на сьогодні
+            header_text: Текст шапки повідомлення (за замовчуванням «Задачи на сегодня»)
+            
+        Returns:
+            (успішно, помилок); без завдань нічого не відправляється - (0, 0)
+        """
+        if not tasks:
+            return 0, 0
+        
+        message = self._format_todo_tasks_message(tasks, header_text)
+        return self.broadcast(user_ids, message, "Ранковий звіт про завдання")
+    
+    def _format_todo_tasks_message(self, tasks: list, header_text: Optional[str] = None) -> str:
+        """Текст ранкового звіту про завдання (аргументи - як у send_todo_tasks_notification)"""
         # Нормалізація: старий український заголовок зберігаємо як російський
         raw_header = (header_text or "Задачи на сегодня").strip()
         if raw_header in ("Завдання на сьогодні", "Завдання на сьогодні:"):
             raw_header = "Задачи на сегодня"
         header = raw_header[:200] if len(raw_header) > 200 else raw_header
-        message = f"📋 <b>{header}</b>\n\n"
+        parts = [f"📋 <b>{header}</b>\n\n"]
         
         for task in tasks:
             list_name = task.get('list_name', '')
             title = task.get('title', 'Без названия')
             notes = task.get('notes', '')
             
-            if list_name:
-                message += f"[{list_name}] {title}"
-            else:
-                message += title
-            
+            line = f"[{list_name}] {title}" if list_name else title
             if notes:
-                message += f" — {notes[:50]}{'...' if len(notes) > 50 else ''}"
+                line += f" — {notes[:50]}{'...' if len(notes) > 50 else ''}"
+            parts.append(line + "\n")
+        
+        return "".join(parts)
+    
+    def broadcast(self, user_ids: Iterable[int], message: str, description: str) -> Tuple[int, int]:
+        """
+        Одночасна відправка одного повідомлення кільком користувачам
+        
+        Усі запити йдуть паралельно через один пул з'єднань, тому розсилка N отримувачам
+        триває приблизно один RTT до api.telegram.org, а не N. Викликається із синхронного
+        коду: цикл подій створюється один раз на всю розсилку.
+        
+        Args:
+            user_ids: ID отримувачів
+            message: Текст повідомлення (HTML)
+            description: Опис повідомлення для логів
             
-            message += "\n"
+        Returns:
+            (успішно, помилок)
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return 0, 0
+        if not TELEGRAM_BOT_TOKEN:
+            return 0, len(user_ids)
         
         try:
-            response = requests.post(
-                f"{TELEGRAM_API_URL}/sendMessage",
-                json={
-                    'chat_id': user_id,
-                    'text': message,
-                    'parse_mode': 'HTML'
-                },
-                timeout=10
-            )
+            errors = self.broadcast_results(user_ids, message)
+        except Exception as e:
+            logger.log_error(f"Помилка розсилки ({description}): {e}")
+            return 0, len(user_ids)
+        
+        # Логи пишуться в БД синхронно - тому вже після завершення всіх запитів
+        failed = 0
+        for user_id, error in zip(user_ids, errors):
+            if error is not None:
+                failed += 1
+                logger.log_warning(f"Помилка відправки ({description}) користувачу {user_id}: {error}")
+        sent = len(user_ids) - failed
+        if sent:
+            logger.log_info(f"{description} відправлено {sent} з {len(user_ids)} користувачів")
+        return sent, failed
+    
+    def broadcast_results(self, user_ids: List[int], message: str) -> List[Optional[str]]:
+        """
+        Розсилка із синхронного коду з результатом для кожного отримувача
+        
+        Args:
+            user_ids: ID отримувачів
+            message: Текст повідомлення (HTML)
             
-            if response.status_code == 200:
-                logger.log_info(f"Ранковий звіт про завдання відправлено користувачу {user_id}")
-                return True
-            else:
-                logger.log_warning(f"Помилка відправки ранкового звіту користувачу {user_id}: {response.text}")
-                return False
-                
+        Returns:
+            Для кожного отримувача (у тому ж порядку): None при успіху або текст помилки
+            (для відповідей Telegram - JSON з error_code та description)
+        """
+        return _run_coroutine(self.broadcast_async(user_ids, message))
+    
+    async def broadcast_async(self, user_ids: List[int], message: str) -> List[Optional[str]]:
+        """
+        Паралельна відправка повідомлення через httpx.AsyncClient
+        
+        Args:
+            user_ids: ID отримувачів
+            message: Текст повідомлення (HTML)
+            
+        Returns:
+            Для кожного отримувача (у тому ж порядку): None при успіху або текст помилки
+        """
+        # Без h2 - HTTP/1.1, де кожен паралельний запит займає окреме з'єднання
+        max_connections = BROADCAST_HTTP2_MAX_CONNECTIONS if BROADCAST_HTTP2 else BROADCAST_MAX_CONNECTIONS
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+        async with httpx.AsyncClient(http2=BROADCAST_HTTP2, timeout=SEND_TIMEOUT, limits=limits) as client:
+            return await asyncio.gather(
+                *(self._send_one_async(client, user_id, message) for user_id in user_ids)
+            )
+    
+    async def _send_one_async(self, client: httpx.AsyncClient, user_id: int, message: str) -> Optional[str]:
+        """
+        Відправка одного повідомлення в межах розсилки
+        
+        Returns:
+            None при успіху або текст помилки
+        """
+        try:
+            body = _send_message_body(user_id, message)
+            for attempt in range(BROADCAST_MAX_RETRIES + 1):
+                await self._rate_limiter.wait_async(user_id)
+                response = await client.post(
+                    _SEND_MESSAGE_URL,
+                    content=body,
+                    headers=_JSON_HEADERS
+                )
+                if response.status_code == 200:
+                    return None
+                if response.status_code != 429 or attempt == BROADCAST_MAX_RETRIES:
+                    return response.text
+                # Перевищено ліміт: Telegram вказує, скільки секунд чекати
+                try:
+                    retry_after = float(response.json()['parameters']['retry_after'])
+                except (ValueError, KeyError, TypeError):
+                    retry_after = 1.0
+                await asyncio.sleep(retry_after)
         except Exception as e:
-            logger.log_error(f"Помилка відправки ранкового звіту: {e}")
-            return False
+            return str(e) or type(e).__name__
 
 
 # Глобальний екземпляр менеджера уведомлень
@@ -489,4 +883,3 @@ def get_notification_manager() -> NotificationManager:
     if _notification_manager is None:
         _notification_manager = NotificationManager()
     return _notification_manager
-
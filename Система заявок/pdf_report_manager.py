@@ -3,9 +3,12 @@
 """
 import os
 import platform
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import BinaryIO, List, Dict, Any, Optional, Set, Tuple
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -14,162 +17,397 @@ from reportlab.lib.units import mm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
+from sqlalchemy import select
 
-from database import get_session
+from database import get_read_session
 from models import Ticket, TicketItem, Company, User, CartridgeType, Printer, Contractor
 from logger import logger
 
+# PDF до цього розміру тримається в пам'яті, більший - автоматично переноситься у тимчасовий файл
+PDF_SPOOL_MAX_SIZE = 4 * 1024 * 1024  # байт
 
-class PDFReportManager:
-    """Клас для генерації PDF звітів"""
-    
-    def __init__(self):
-        """Ініціалізація менеджера PDF"""
-        # Реєструємо шрифт для української мови
-        self._register_ukrainian_font()
+# Довгі таблиці розбиваються на послідовні таблиці по стільки рядків: reportlab при переносі
+# на нову сторінку перераховує всі рядки, що залишились, тож одна велика таблиця - O(N²)
+TABLE_CHUNK_ROWS = 50
+
+# Операційна система - визначається один раз при імпорті
+_PLATFORM = platform.system()
+
+# Базові стилі reportlab - один раз на процес
+_SAMPLE_STYLES = getSampleStyleSheet()
+
+
+@lru_cache(maxsize=1)
+def _register_ukrainian_font() -> Tuple[str, str]:
+    """
+    Реєстрація шрифту з підтримкою кирилиці (один раз на процес)
     
-    def _register_ukrainian_font(self):
-        """Реєстрація шрифту з підтримкою кирилиці"""
-        try:
-            # Список можливих шляхів до шрифтів з підтримкою кирилиці
-            font_paths = []
-            
-            if platform.system() == 'Windows':
-                # Windows шрифти
-                windows_fonts_dir = os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')
-                font_paths.extend([
-                    os.path.join(windows_fonts_dir, 'arial.ttf'),
-                    os.path.join(windows_fonts_dir, 'arialbd.ttf'),
-                    os.path.join(windows_fonts_dir, 'times.ttf'),
-                    os.path.join(windows_fonts_dir, 'timesbd.ttf'),
-                    os.path.join(windows_fonts_dir, 'calibri.ttf'),
-                    os.path.join(windows_fonts_dir, 'calibrib.ttf'),
-                ])
-            elif platform.system() == 'Linux':
-                # Linux шрифти
-                font_paths.extend([
-                    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
-                    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
-                    '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
-                    '/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf',
-                ])
-            
-            # Спробуємо завантажити перший доступний шрифт
-            font_registered = False
-            regular_font_path = None
-            bold_font_path = None
-            
-            # Спочатку знаходимо звичайний шрифт
-            for font_path in font_paths:
-                if os.path.exists(font_path) and 'bd' not in font_path.lower() and 'bold' not in font_path.lower():
-                    regular_font_path = font_path
-                    break
-            
-            # Знаходимо жирний шрифт
-            if regular_font_path:
-                # Для Windows
-                if platform.system() == 'Windows':
-                    base_name = os.path.basename(regular_font_path).lower()
-                    if 'arial' in base_name:
-                        bold_font_path = regular_font_path.replace('arial.ttf', 'arialbd.ttf')
-                    elif 'times' in base_name:
-                        bold_font_path = regular_font_path.replace('times.ttf', 'timesbd.ttf')
-                    elif 'calibri' in base_name:
-                        bold_font_path = regular_font_path.replace('calibri.ttf', 'calibrib.ttf')
-                    else:
-                        bold_font_path = regular_font_path
-                # Для Linux
-                elif platform.system() == 'Linux':
-                    if 'DejaVuSans' in regular_font_path:
-                        bold_font_path = regular_font_path.replace('DejaVuSans.ttf', 'DejaVuSans-Bold.ttf')
-                    elif 'LiberationSans' in regular_font_path:
-                        bold_font_path = regular_font_path.replace('LiberationSans-Regular.ttf', 'LiberationSans-Bold.ttf')
-                    else:
-                        bold_font_path = regular_font_path
+    Returns:
+        (звичайний шрифт, жирний шрифт) - імена для ParagraphStyle/TableStyle
+    """
+    try:
+        # Список можливих шляхів до шрифтів з підтримкою кирилиці
+        font_paths = []
+        
+        if _PLATFORM == 'Windows':
+            # Windows шрифти
+            windows_fonts_dir = os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')
+            font_paths.extend([
+                os.path.join(windows_fonts_dir, 'arial.ttf'),
+                os.path.join(windows_fonts_dir, 'arialbd.ttf'),
+                os.path.join(windows_fonts_dir, 'times.ttf'),
+                os.path.join(windows_fonts_dir, 'timesbd.ttf'),
+                os.path.join(windows_fonts_dir, 'calibri.ttf'),
+                os.path.join(windows_fonts_dir, 'calibrib.ttf'),
+            ])
+        elif _PLATFORM == 'Linux':
+            # Linux шрифти
+            font_paths.extend([
+                '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+                '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',
+                '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
+                '/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf',
+            ])
+        
+        # Спробуємо завантажити перший доступний шрифт
+        font_registered = False
+        regular_font_path = None
+        bold_font_path = None
+        
+        # Спочатку знаходимо звичайний шрифт
+        for font_path in font_paths:
+            if os.path.exists(font_path) and 'bd' not in font_path.lower() and 'bold' not in font_path.lower():
+                regular_font_path = font_path
+                break
+        
+        # Знаходимо жирний шрифт
+        if regular_font_path:
+            # Для Windows
+            if _PLATFORM == 'Windows':
+                base_name = os.path.basename(regular_font_path).lower()
+                if 'arial' in base_name:
+                    bold_font_path = regular_font_path.replace('arial.ttf', 'arialbd.ttf')
+                elif 'times' in base_name:
+                    bold_font_path = regular_font_path.replace('times.ttf', 'timesbd.ttf')
+                elif 'calibri' in base_name:
+                    bold_font_path = regular_font_path.replace('calibri.ttf', 'calibrib.ttf')
                 else:
                     bold_font_path = regular_font_path
-                
-                # Перевіряємо, чи існує жирний шрифт
-                if not os.path.exists(bold_font_path):
+            # Для Linux
+            elif _PLATFORM == 'Linux':
+                if 'DejaVuSans' in regular_font_path:
+                    bold_font_path = regular_font_path.replace('DejaVuSans.ttf', 'DejaVuSans-Bold.ttf')
+                elif 'LiberationSans' in regular_font_path:
+                    bold_font_path = regular_font_path.replace('LiberationSans-Regular.ttf', 'LiberationSans-Bold.ttf')
+                else:
                     bold_font_path = regular_font_path
-                
-                try:
-                    # Реєструємо звичайний шрифт
-                    pdfmetrics.registerFont(TTFont('UkrainianFont', regular_font_path))
-                    # Реєструємо жирний шрифт
-                    pdfmetrics.registerFont(TTFont('UkrainianFont-Bold', bold_font_path))
-                    font_registered = True
-                    logger.log_info(f"Зареєстровано український шрифт: {regular_font_path}")
-                except Exception as e:
-                    logger.log_warning(f"Не вдалося завантажити шрифт {regular_font_path}: {e}")
-            
-            if not font_registered:
-                # Якщо не знайшли системний шрифт, використовуємо вбудований Helvetica
-                # (він не підтримує кирилицю, але хоча б не буде помилки)
-                logger.log_warning("Не знайдено шрифт з підтримкою кирилиці, використовується Helvetica")
-                self._ukrainian_font = 'Helvetica'
-                self._ukrainian_font_bold = 'Helvetica-Bold'
             else:
-                self._ukrainian_font = 'UkrainianFont'
-                self._ukrainian_font_bold = 'UkrainianFont-Bold'
-                
-        except Exception as e:
-            logger.log_error(f"Помилка реєстрації українського шрифту: {e}")
-            self._ukrainian_font = 'Helvetica'
-            self._ukrainian_font_bold = 'Helvetica-Bold'
+                bold_font_path = regular_font_path
+            
+            # Перевіряємо, чи існує жирний шрифт
+            if not os.path.exists(bold_font_path):
+                bold_font_path = regular_font_path
+            
+            try:
+                # Реєструємо звичайний шрифт
+                pdfmetrics.registerFont(TTFont('UkrainianFont', regular_font_path))
+                # Реєструємо жирний шрифт
+                pdfmetrics.registerFont(TTFont('UkrainianFont-Bold', bold_font_path))
+                # Сімейство шрифтів: розмітка <b> у Paragraph перемикається на жирний шрифт
+                pdfmetrics.registerFontFamily(
+                    'UkrainianFont',
+                    normal='UkrainianFont',
+                    bold='UkrainianFont-Bold',
+                    italic='UkrainianFont',
+                    boldItalic='UkrainianFont-Bold'
+                )
+                font_registered = True
+                logger.log_info(f"Зареєстровано український шрифт: {regular_font_path}")
+            except Exception as e:
+                logger.log_warning(f"Не вдалося завантажити шрифт {regular_font_path}: {e}")
+        
+        if not font_registered:
+            # Якщо не знайшли системний шрифт, використовуємо вбудований Helvetica
+            # (він не підтримує кирилицю, але хоча б не буде помилки)
+            logger.log_warning("Не знайдено шрифт з підтримкою кирилиці, використовується Helvetica")
+            return 'Helvetica', 'Helvetica-Bold'
+        return 'UkrainianFont', 'UkrainianFont-Bold'
+            
+    except Exception as e:
+        logger.log_error(f"Помилка реєстрації українського шрифту: {e}")
+        return 'Helvetica', 'Helvetica-Bold'
+
+
+# Шрифт реєструється при імпорті, а не при кожному створенні менеджера
+_register_ukrainian_font()
+
+
+class PDFReportManager:
+    """Клас для генерації PDF звітів"""
     
-    def generate_quote_receipt_pdf(self, title: str, lines: List[str]) -> BytesIO:
+    def __init__(self):
+        """Ініціалізація менеджера PDF"""
+        # Шрифт для української мови (зареєстрований при імпорті модуля)
+        self._ukrainian_font, self._ukrainian_font_bold = _register_ukrainian_font()
+        # Стилі залежать лише від шрифту, тому створюються один раз
+        self._build_styles()
+    
+    def _load_names(self, session, id_column, name_column, ids: Set[int]) -> Dict[int, Any]:
         """
-        Згенерувати PDF-чек з довільних рядків (під калькулятор/копіювання).
-
+        Словник id -> назва одним запитом WHERE id IN (...)
+        
         Args:
-            title: Заголовок документа.
-            lines: Рядки тексту чеку (безпечний plain text).
-
+            session: Сесія БД
+            id_column: Колонка ID (напр. CartridgeType.id)
+            name_column: Колонка назви (напр. CartridgeType.name)
+            ids: Потрібні ID
+        
         Returns:
-            BytesIO з PDF.
+            Словник для знайдених ID
         """
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=15 * mm,
-            leftMargin=15 * mm,
-            topMargin=15 * mm,
-            bottomMargin=15 * mm,
-            title=title,
-        )
-
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
+        if not ids:
+            return {}
+        return dict(session.execute(select(id_column, name_column).where(id_column.in_(ids))).all())
+    
+    def _open_output(self, output: Optional[BinaryIO]) -> BinaryIO:
+        """
+        Приймач для PDF: переданий файл/потік або SpooledTemporaryFile
+        
+        SimpleDocTemplate пише одразу в приймач, тому документ не копіюється ще раз у BytesIO;
+        великі звіти з тимчасового файлу не тримаються цілком у пам'яті.
+        """
+        if output is not None:
+            return output
+        return SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE)
+    
+    def _rewind(self, output: BinaryIO) -> BinaryIO:
+        """Повернення позиції на початок (якщо приймач це підтримує) для подальшого читання"""
+        if output.seekable():
+            output.seek(0)
+        return output
+    
+    def _build_styles(self):
+        """Створення стилів абзаців і таблиць для всіх звітів"""
+        # Чек калькулятора КП
+        self._quote_title_style = ParagraphStyle(
             name="QuoteTitle",
-            parent=styles["Title"],
+            parent=_SAMPLE_STYLES["Title"],
             fontName=self._ukrainian_font_bold,
             fontSize=16,
             leading=20,
             spaceAfter=10,
         )
-        body_style = ParagraphStyle(
+        self._quote_body_style = ParagraphStyle(
             name="QuoteBody",
-            parent=styles["BodyText"],
+            parent=_SAMPLE_STYLES["BodyText"],
             fontName=self._ukrainian_font,
             fontSize=10.5,
             leading=14,
             spaceAfter=2,
         )
-        meta_style = ParagraphStyle(
+        self._quote_meta_style = ParagraphStyle(
             name="QuoteMeta",
-            parent=styles["BodyText"],
+            parent=_SAMPLE_STYLES["BodyText"],
             fontName=self._ukrainian_font,
             fontSize=9.5,
             leading=12,
             textColor=colors.grey,
             spaceAfter=8,
         )
+        
+        # Заголовок звіту по заявках
+        self._report_title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=_SAMPLE_STYLES['Heading1'],
+            fontName=self._ukrainian_font_bold,
+            fontSize=16,
+            textColor=colors.HexColor('#1a237e'),
+            spaceAfter=30,
+            alignment=1  # Center
+        )
+        
+        # Заголовок заявок підряднику (адаптовано під стиль сайту)
+        self._contractor_title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=_SAMPLE_STYLES['Heading1'],
+            fontName=self._ukrainian_font_bold,
+            fontSize=18,
+            textColor=colors.HexColor('#0d6efd'),  # Bootstrap primary color
+            spaceAfter=25,
+            alignment=1
+        )
+        
+        # Звичайний текст ("нічого не знайдено")
+        self._normal_style = ParagraphStyle(
+            'NormalUA',
+            parent=_SAMPLE_STYLES['Normal'],
+            fontName=self._ukrainian_font,
+            fontSize=10
+        )
+        self._contractor_normal_style = ParagraphStyle(
+            'NormalUA',
+            parent=_SAMPLE_STYLES['Normal'],
+            fontName=self._ukrainian_font,
+            fontSize=10,
+            leading=12
+        )
+        
+        # Стиль для тексту в комірках
+        self._cell_style = ParagraphStyle(
+            'CellStyle',
+            parent=_SAMPLE_STYLES['Normal'],
+            fontName=self._ukrainian_font,
+            fontSize=10,
+            leading=12,
+            leftIndent=0,
+            rightIndent=0,
+            wordWrap='CJK'  # Автоматичний перенос слів
+        )
+        
+        # Стиль для заголовків комірок
+        self._cell_header_style = ParagraphStyle(
+            'HeaderStyle',
+            parent=_SAMPLE_STYLES['Normal'],
+            fontName=self._ukrainian_font_bold,
+            fontSize=11,
+            textColor=colors.white,
+            alignment=1  # По центру
+        )
+        
+        self._tickets_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), self._ukrainian_font_bold),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('FONTNAME', (0, 1), (-1, -1), self._ukrainian_font),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        # Продовження таблиці (без рядка заголовка)
+        self._tickets_table_continuation_style = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, -1), self._ukrainian_font),
+            ('BACKGROUND', (0, 0), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+        
+        # Спільне для таблиць підряднику: заголовок синій як на сайті, світла сітка
+        contractor_header = [
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0d6efd')),  # Bootstrap primary
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),  # Заголовки по центру
+            ('FONTNAME', (0, 0), (-1, 0), self._ukrainian_font_bold),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('TOPPADDING', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
+            ('TOPPADDING', (0, 1), (-1, -1), 8),
+        ]
+        contractor_grid = [
+            # Сітчаста рамка
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dee2e6')),  # Світла сіра рамка
+            # Зовнішня рамка товстіша
+            ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.HexColor('#0d6efd')),
+        ]
+        
+        self._refill_table_style = TableStyle(contractor_header + [
+            ('ALIGN', (0, 1), (2, -2), 'LEFT'),  # Дані по лівому краю
+            ('ALIGN', (3, 1), (3, -2), 'CENTER'),  # Кількість по центру
+            ('ALIGN', (0, -1), (-1, -1), 'CENTER'),  # Підсумок по центру
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTNAME', (0, 1), (-1, -2), self._ukrainian_font),
+            ('FONTSIZE', (0, 1), (-1, -2), 10),
+            # Тіло таблиці - світлий сірий фон
+            ('BACKGROUND', (0, 1), (-1, -2), colors.HexColor('#f8f9fa')),  # Bootstrap light
+            # Підсумок - трохи темніший
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e9ecef')),  # Bootstrap secondary-light
+            ('FONTNAME', (0, -1), (-1, -1), self._ukrainian_font_bold),
+            ('FONTSIZE', (0, -1), (-1, -1), 11),
+        ] + contractor_grid + [
+            ('LINEABOVE', (0, -1), (-1, -1), 1.5, colors.HexColor('#0d6efd'))
+        ])
+        
+        self._repair_table_style = TableStyle(contractor_header + [
+            ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # Модель принтера по центру
+            ('ALIGN', (1, 1), (1, -1), 'LEFT'),  # Опис проблеми по лівому краю
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Вирівнювання по верху для багаторядкового тексту
+            ('FONTNAME', (0, 1), (-1, -1), self._ukrainian_font),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+            # Тіло таблиці - світлий сірий фон
+            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),  # Bootstrap light
+        ] + contractor_grid)
+        self._repair_table_continuation_style = TableStyle([
+            ('ALIGN', (0, 0), (0, -1), 'CENTER'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('FONTNAME', (0, 0), (-1, -1), self._ukrainian_font),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8f9fa')),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dee2e6')),
+        ])
+    
+    def _append_table(
+        self,
+        story: List[Any],
+        data: List[List[Any]],
+        col_widths: List[float],
+        style: TableStyle,
+        continuation_style: TableStyle
+    ) -> None:
+        """
+        Додавання таблиці в story частинами по TABLE_CHUNK_ROWS рядків
+        
+        Частини йдуть одна за одною без відступів і виглядають як одна таблиця; при переносі
+        сторінки reportlab ділить лише поточну частину, а не всю таблицю.
+        
+        Args:
+            story: Елементи документа
+            data: Рядки таблиці, перший - заголовок
+            col_widths: Ширини колонок
+            style: Стиль першої частини (з заголовком)
+            continuation_style: Стиль наступних частин (лише рядки даних)
+        """
+        first = Table(data[:TABLE_CHUNK_ROWS + 1], colWidths=col_widths)
+        first.setStyle(style)
+        story.append(first)
+        for start in range(TABLE_CHUNK_ROWS + 1, len(data), TABLE_CHUNK_ROWS):
+            chunk = Table(data[start:start + TABLE_CHUNK_ROWS], colWidths=col_widths)
+            chunk.setStyle(continuation_style)
+            story.append(chunk)
+    
+    def generate_quote_receipt_pdf(self, title: str, lines: List[str]) -> BytesIO:
+        """
+        Згенерувати PDF-чек з довільних рядків (під калькулятор/копіювання).
+
+        Args:
+            title: Заголовок документа.
+            lines: Рядки тексту чеку (безпечний plain text).
+
+        Returns:
+            BytesIO з PDF.
+        """
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            rightMargin=15 * mm,
+            leftMargin=15 * mm,
+            topMargin=15 * mm,
+            bottomMargin=15 * mm,
+            title=title,
+        )
 
         story: List[Any] = []
-        story.append(Paragraph(title, title_style))
-        story.append(Paragraph(f"Дата: {datetime.now().strftime('%Y-%m-%d %H:%M')}", meta_style))
+        story.append(Paragraph(title, self._quote_title_style))
+        story.append(Paragraph(f"Дата: {datetime.now().strftime('%Y-%m-%d %H:%M')}", self._quote_meta_style))
         story.append(Spacer(1, 4 * mm))
 
         for raw in lines:
@@ -183,7 +421,7 @@ class PDFReportManager:
                 .replace("<", "&lt;")
                 .replace(">", "&gt;")
             )
-            story.append(Paragraph(safe, body_style))
+            story.append(Paragraph(safe, self._quote_body_style))
 
         doc.build(story)
         buffer.seek(0)
@@ -194,8 +432,9 @@ class PDFReportManager:
         tickets: List[Dict[str, Any]],
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        company_filter: Optional[str] = None
-    ) -> BytesIO:
+        company_filter: Optional[str] = None,
+        output: Optional[BinaryIO] = None
+    ) -> BinaryIO:
         """
         Генерація звіту по заявках
         
@@ -204,25 +443,14 @@ class PDFReportManager:
             start_date: Початкова дата (опціонально)
             end_date: Кінцева дата (опціонально)
             company_filter: Фільтр по компанії (опціонально)
+            output: Куди писати PDF (файл/потік); за замовчуванням - SpooledTemporaryFile
         
         Returns:
-            BytesIO об'єкт з PDF
+            Файловий об'єкт з PDF (output або тимчасовий), позиція на початку
         """
-        buffer = BytesIO()
+        buffer = self._open_output(output)
         doc = SimpleDocTemplate(buffer, pagesize=A4)
         story = []
-        styles = getSampleStyleSheet()
-        
-        # Заголовок з українським шрифтом
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontName=self._ukrainian_font_bold,
-            fontSize=16,
-            textColor=colors.HexColor('#1a237e'),
-            spaceAfter=30,
-            alignment=1  # Center
-        )
         
         title_text = "Звіт по заявках"
         if start_date and end_date:
@@ -230,56 +458,41 @@ class PDFReportManager:
         if company_filter:
             title_text += f"<br/>Компанія: {company_filter}"
         
-        story.append(Paragraph(title_text, title_style))
+        story.append(Paragraph(title_text, self._report_title_style))
         story.append(Spacer(1, 12))
         
         # Таблиця заявок
         if tickets:
             data = [['№', 'Тип', 'Статус', 'Компанія', 'Користувач', 'Дата створення']]
-            
-            for ticket in tickets:
-                data.append([
+            data += [
+                [
                     str(ticket.get('id', '')),
                     ticket.get('ticket_type', ''),
                     ticket.get('status', ''),
                     ticket.get('company_name', ''),
                     ticket.get('user_name', ''),
-                    ticket.get('created_at', '')[:10] if ticket.get('created_at') else ''
-                ])
-            
-            table = Table(data, colWidths=[20*mm, 30*mm, 40*mm, 50*mm, 50*mm, 40*mm])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), self._ukrainian_font_bold),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('FONTNAME', (0, 1), (-1, -1), self._ukrainian_font),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+                    (ticket.get('created_at') or '')[:10]
+                ]
+                for ticket in tickets
+            ]
             
-            story.append(table)
-        else:
-            normal_style = ParagraphStyle(
-                'NormalUA',
-                parent=styles['Normal'],
-                fontName=self._ukrainian_font,
-                fontSize=10
+            self._append_table(
+                story, data, [20*mm, 30*mm, 40*mm, 50*mm, 50*mm, 40*mm],
+                self._tickets_table_style, self._tickets_table_continuation_style
             )
-            story.append(Paragraph("Заявок не знайдено", normal_style))
+        else:
+            story.append(Paragraph("Заявок не знайдено", self._normal_style))
         
         doc.build(story)
-        buffer.seek(0)
-        return buffer
+        return self._rewind(buffer)
     
     def generate_contractor_request_refill(
         self,
         tickets: List[Dict[str, Any]],
         contractor: Dict[str, Any],
-        company_name: Optional[str] = None
-    ) -> BytesIO:
+        company_name: Optional[str] = None,
+        output: Optional[BinaryIO] = None
+    ) -> BinaryIO:
         """
         Генерація заявки підряднику на заправку
         
@@ -287,159 +500,103 @@ class PDFReportManager:
             tickets: Список заявок на заправку
             contractor: Дані підрядника
             company_name: Назва компанії (опціонально)
+            output: Куди писати PDF (файл/потік); за замовчуванням - SpooledTemporaryFile
         
         Returns:
-            BytesIO об'єкт з PDF
+            Файловий об'єкт з PDF (output або тимчасовий), позиція на початку
         """
-        buffer = BytesIO()
+        buffer = self._open_output(output)
         doc = SimpleDocTemplate(buffer, pagesize=A4)
         story = []
-        styles = getSampleStyleSheet()
-        
-        # Стилі для тексту з українським шрифтом
-        normal_style = ParagraphStyle(
-            'NormalUA',
-            parent=styles['Normal'],
-            fontName=self._ukrainian_font,
-            fontSize=10,
-            leading=12
-        )
-        
-        header_style = ParagraphStyle(
-            'HeaderUA',
-            parent=styles['Heading2'],
-            fontName=self._ukrainian_font_bold,
-            fontSize=12,
-            textColor=colors.HexColor('#1a237e'),
-            spaceAfter=10,
-            spaceBefore=10
-        )
-        
-        # Заголовок з українським шрифтом (адаптовано під стиль сайту)
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontName=self._ukrainian_font_bold,
-            fontSize=18,
-            textColor=colors.HexColor('#0d6efd'),  # Bootstrap primary color
-            spaceAfter=25,
-            alignment=1
-        )
         
         title_text = "Заявка на заправку картриджів"
         title_text += f"<br/>Дата: {datetime.now().strftime('%d.%m.%Y')}"
         
-        story.append(Paragraph(title_text, title_style))
+        story.append(Paragraph(title_text, self._contractor_title_style))
         story.append(Spacer(1, 20))
         
         # Структура: Компанія -> Принтер -> Картриджі
         # {company_name: {printer_model: {cartridge_name: quantity}}}
-        structure = {}
+        structure = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
         total_cartridges = 0
         
-        with get_session() as session:
-            for ticket in tickets:
-                ticket_company = ticket.get('company_name', 'Не вказано')
-                if company_name and ticket_company != company_name:
-                    continue
-                
-                if ticket_company not in structure:
-                    structure[ticket_company] = {}
-                
-                for item in ticket.get('items', []):
-                    if item.get('item_type') == 'CARTRIDGE' and item.get('cartridge_type_id'):
-                        cartridge = session.query(CartridgeType).filter(
-                            CartridgeType.id == item['cartridge_type_id']
-                        ).first()
+        # Назви картриджів і моделі принтерів - одним IN-запитом на таблицю, а не запитом на позицію
+        cartridge_items = [
+            item
+            for ticket in tickets
+            for item in ticket.get('items', [])
+            if item.get('item_type') == 'CARTRIDGE' and item.get('cartridge_type_id')
+        ]
+        cartridge_names: Dict[int, Any] = {}
+        printer_models: Dict[int, Any] = {}
+        # Без картриджів (зокрема порожній список заявок) сесія БД не відкривається
+        if cartridge_items:
+            with get_read_session() as session:
+                cartridge_names = self._load_names(
+                    session, CartridgeType.id, CartridgeType.name,
+                    {item['cartridge_type_id'] for item in cartridge_items}
+                )
+                printer_models = self._load_names(
+                    session, Printer.id, Printer.model,
+                    {item['printer_model_id'] for item in cartridge_items if item.get('printer_model_id')}
+                )
+        
+        for ticket in tickets:
+            ticket_company = ticket.get('company_name', 'Не вказано')
+            if company_name and ticket_company != company_name:
+                continue
+            
+            # Компанія потрапляє в таблицю навіть без картриджів (як і раніше)
+            company_printers = structure[ticket_company]
+            
+            for item in ticket.get('items', []):
+                if item.get('item_type') == 'CARTRIDGE' and item.get('cartridge_type_id'):
+                    cartridge_name = cartridge_names.get(item['cartridge_type_id'])
+                    
+                    if cartridge_name:
+                        quantity = item.get('quantity', 0)
+                        total_cartridges += quantity
+                        
+                        # Отримуємо принтер, якщо вказано
+                        printer_model = 'Без принтера'
+                        if item.get('printer_model_id'):
+                            printer_model = printer_models.get(item['printer_model_id'], printer_model)
                         
-                        if cartridge:
-                            cartridge_name = cartridge.name
-                            quantity = item.get('quantity', 0)
-                            total_cartridges += quantity
-                            
-                            # Отримуємо принтер, якщо вказано
-                            printer_model = 'Без принтера'
-                            if item.get('printer_model_id'):
-                                printer = session.query(Printer).filter(
-                                    Printer.id == item['printer_model_id']
-                                ).first()
-                                if printer:
-                                    printer_model = printer.model
-                            
-                            if printer_model not in structure[ticket_company]:
-                                structure[ticket_company][printer_model] = {}
-                            
-                            if cartridge_name in structure[ticket_company][printer_model]:
-                                structure[ticket_company][printer_model][cartridge_name] += quantity
-                            else:
-                                structure[ticket_company][printer_model][cartridge_name] = quantity
+                        company_printers[printer_model][cartridge_name] += quantity
         
         # Формуємо таблицю
         if structure:
-            # Заголовок таблиці
-            data = [['Компанія', 'Модель принтера', 'Картридж', 'Кількість']]
-            
-            # Заповнюємо дані
-            for company_name_key, printers in sorted(structure.items()):
-                for printer_model, cartridges in sorted(printers.items()):
-                    for cartridge_name, quantity in sorted(cartridges.items()):
-                        data.append([
-                            company_name_key,
-                            printer_model,
-                            cartridge_name,
-                            str(quantity)
-                        ])
-            
-            # Підсумок
-            data.append(['ВСЬОГО', '', '', str(total_cartridges)])
+            # Заголовок таблиці, дані (компанія -> принтер -> картридж за алфавітом) та підсумок
+            data = [
+                ['Компанія', 'Модель принтера', 'Картридж', 'Кількість'],
+                *(
+                    [company_name_key, printer_model, cartridge_name, str(quantity)]
+                    for company_name_key, printers in sorted(structure.items())
+                    for printer_model, cartridges in sorted(printers.items())
+                    for cartridge_name, quantity in sorted(cartridges.items())
+                ),
+                ['ВСЬОГО', '', '', str(total_cartridges)]
+            ]
             
             # Ширини колонок: Компанія, Модель принтера, Картридж, Кількість
             # Збільшуємо ширину "Модель принтера" для довгих назв
             table = Table(data, colWidths=[45*mm, 75*mm, 55*mm, 25*mm])
-            table.setStyle(TableStyle([
-                # Заголовок таблиці - синій колір як на сайті
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0d6efd')),  # Bootstrap primary
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),  # Заголовки по центру
-                ('ALIGN', (0, 1), (2, -2), 'LEFT'),  # Дані по лівому краю
-                ('ALIGN', (3, 1), (3, -2), 'CENTER'),  # Кількість по центру
-                ('ALIGN', (0, -1), (-1, -1), 'CENTER'),  # Підсумок по центру
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('FONTNAME', (0, 0), (-1, 0), self._ukrainian_font_bold),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('FONTNAME', (0, 1), (-1, -2), self._ukrainian_font),
-                ('FONTSIZE', (0, 1), (-1, -2), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                ('TOPPADDING', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                ('TOPPADDING', (0, 1), (-1, -1), 8),
-                # Тіло таблиці - світлий сірий фон
-                ('BACKGROUND', (0, 1), (-1, -2), colors.HexColor('#f8f9fa')),  # Bootstrap light
-                # Підсумок - трохи темніший
-                ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e9ecef')),  # Bootstrap secondary-light
-                ('FONTNAME', (0, -1), (-1, -1), self._ukrainian_font_bold),
-                ('FONTSIZE', (0, -1), (-1, -1), 11),
-                # Сітчаста рамка
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dee2e6')),  # Світла сіра рамка
-                # Зовнішня рамка товстіша
-                ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.HexColor('#0d6efd')),
-                ('LINEABOVE', (0, -1), (-1, -1), 1.5, colors.HexColor('#0d6efd'))
-            ]))
+            table.setStyle(self._refill_table_style)
             
             story.append(table)
         else:
-            story.append(Paragraph("Картриджів не знайдено", normal_style))
+            story.append(Paragraph("Картриджів не знайдено", self._contractor_normal_style))
         
         doc.build(story)
-        buffer.seek(0)
-        return buffer
+        return self._rewind(buffer)
     
     def generate_contractor_request_repair(
         self,
         tickets: List[Dict[str, Any]],
         contractor: Dict[str, Any],
-        company_name: Optional[str] = None
-    ) -> BytesIO:
+        company_name: Optional[str] = None,
+        output: Optional[BinaryIO] = None
+    ) -> BinaryIO:
         """
         Генерація заявки підряднику на ремонт
         
@@ -447,134 +604,87 @@ class PDFReportManager:
             tickets: Список заявок на ремонт
             contractor: Дані підрядника
             company_name: Назва компанії (опціонально)
+            output: Куди писати PDF (файл/потік); за замовчуванням - SpooledTemporaryFile
         
         Returns:
-            BytesIO об'єкт з PDF
+            Файловий об'єкт з PDF (output або тимчасовий), позиція на початку
         """
-        buffer = BytesIO()
+        buffer = self._open_output(output)
         doc = SimpleDocTemplate(buffer, pagesize=A4)
         story = []
-        styles = getSampleStyleSheet()
-        
-        # Заголовок з українським шрифтом (адаптовано під стиль сайту)
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontName=self._ukrainian_font_bold,
-            fontSize=18,
-            textColor=colors.HexColor('#0d6efd'),  # Bootstrap primary color
-            spaceAfter=25,
-            alignment=1
-        )
         
         title_text = "Заявка на ремонт принтерів"
         title_text += f"<br/>Дата: {datetime.now().strftime('%d.%m.%Y')}"
         
-        story.append(Paragraph(title_text, title_style))
+        story.append(Paragraph(title_text, self._contractor_title_style))
         story.append(Spacer(1, 20))
         
-        # Збираємо принтери
-        printers_list = []
+        # Збираємо принтери: однакові (модель, опис проблеми) - один рядок з кількістю
+        printers_counts: Dict[Tuple[Any, str], int] = {}
         
-        with get_session() as session:
-            for ticket in tickets:
-                for item in ticket.get('items', []):
-                    if item.get('item_type') == 'PRINTER' and item.get('printer_model_id'):
-                        printer = session.query(Printer).filter(
-                            Printer.id == item['printer_model_id']
-                        ).first()
+        # Моделі принтерів - одним IN-запитом замість запиту на кожну позицію
+        printer_ids = {
+            item['printer_model_id']
+            for ticket in tickets
+            for item in ticket.get('items', [])
+            if item.get('item_type') == 'PRINTER' and item.get('printer_model_id')
+        }
+        printer_models: Dict[int, Any] = {}
+        # Без принтерів (зокрема порожній список заявок) сесія БД не відкривається
+        if printer_ids:
+            with get_read_session() as session:
+                printer_models = self._load_names(session, Printer.id, Printer.model, printer_ids)
+        
+        for ticket in tickets:
+            for item in ticket.get('items', []):
+                if item.get('item_type') == 'PRINTER' and item.get('printer_model_id'):
+                    if item['printer_model_id'] in printer_models:
+                        # Беремо коментар адміністратора, якщо є, інакше коментар користувача
+                        admin_comment = ticket.get('admin_comment') or ''
+                        problem_description = admin_comment.strip() if admin_comment else ''
+                        
+                        if not problem_description:
+                            user_comment = ticket.get('comment') or ''
+                            problem_description = user_comment.strip() if user_comment else ''
                         
-                        if printer:
-                            # Беремо коментар адміністратора, якщо є, інакше коментар користувача
-                            admin_comment = ticket.get('admin_comment') or ''
-                            problem_description = admin_comment.strip() if admin_comment else ''
-                            
-                            if not problem_description:
-                                user_comment = ticket.get('comment') or ''
-                                problem_description = user_comment.strip() if user_comment else ''
-                            
-                            printers_list.append({
-                                'model': printer.model,
-                                'comment': problem_description
-                            })
+                        key = (printer_models[item['printer_model_id']], problem_description)
+                        printers_counts[key] = printers_counts.get(key, 0) + 1
         
         # Таблиця принтерів
-        if printers_list:
-            # Стиль для тексту в комірках
-            cell_style = ParagraphStyle(
-                'CellStyle',
-                parent=styles['Normal'],
-                fontName=self._ukrainian_font,
-                fontSize=10,
-                leading=12,
-                leftIndent=0,
-                rightIndent=0,
-                wordWrap='CJK'  # Автоматичний перенос слів
-            )
-            
-            # Стиль для заголовків
-            header_style = ParagraphStyle(
-                'HeaderStyle',
-                parent=styles['Normal'],
-                fontName=self._ukrainian_font_bold,
-                fontSize=11,
-                textColor=colors.white,
-                alignment=1  # По центру
-            )
-            
+        if printers_counts:
+            cell_style = self._cell_style
+            header_style = self._cell_header_style
             data = [[Paragraph('Модель принтера', header_style), Paragraph('Опис проблеми', header_style)]]
             
-            for printer_info in printers_list:
-                model_text = printer_info['model'] or 'Не вказано'
-                comment_text = printer_info['comment'] or 'Не вказано'
+            # Збільшуємо ширину колонки "Опис проблеми" та зменшуємо "Модель принтера"
+            col_widths = [60*mm, 120*mm]
+            # Ширина тексту в комірці моделі (мінус LEFTPADDING/RIGHTPADDING)
+            model_text_width = col_widths[0] - 12
+            
+            for (model, comment), count in printers_counts.items():
+                model_text = model or 'Не вказано'
+                if count > 1:
+                    model_text += f' ({count} шт.)'
+                comment_text = comment or 'Не вказано'
                 
-                # Використовуємо Paragraph для автоматичного переносу тексту
+                # Модель зазвичай вміщується в один рядок - тоді звичайний рядок без розбору
+                # розмітки і розрахунку переносів; Paragraph лише для довгих назв і опису проблеми
+                if pdfmetrics.stringWidth(model_text, self._ukrainian_font, 10) > model_text_width:
+                    model_text = Paragraph(model_text, cell_style)
                 data.append([
-                    Paragraph(model_text, cell_style),
+                    model_text,
                     Paragraph(comment_text, cell_style)
                 ])
             
-            # Збільшуємо ширину колонки "Опис проблеми" та зменшуємо "Модель принтера"
-            table = Table(data, colWidths=[60*mm, 120*mm])
-            table.setStyle(TableStyle([
-                # Заголовок таблиці - синій колір як на сайті
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0d6efd')),  # Bootstrap primary
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),  # Заголовки по центру
-                ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # Модель принтера по центру
-                ('ALIGN', (1, 1), (1, -1), 'LEFT'),  # Опис проблеми по лівому краю
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),  # Вирівнювання по верху для багаторядкового тексту
-                ('FONTNAME', (0, 0), (-1, 0), self._ukrainian_font_bold),
-                ('FONTSIZE', (0, 0), (-1, 0), 11),
-                ('FONTNAME', (0, 1), (-1, -1), self._ukrainian_font),
-                ('FONTSIZE', (0, 1), (-1, -1), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                ('TOPPADDING', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-                ('TOPPADDING', (0, 1), (-1, -1), 8),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                # Тіло таблиці - світлий сірий фон
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f8f9fa')),  # Bootstrap light
-                # Сітчаста рамка
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dee2e6')),  # Світла сіра рамка
-                # Зовнішня рамка товстіша
-                ('LINEBELOW', (0, 0), (-1, 0), 1.5, colors.HexColor('#0d6efd'))
-            ]))
-            
-            story.append(table)
-        else:
-            normal_style = ParagraphStyle(
-                'NormalUA',
-                parent=styles['Normal'],
-                fontName=self._ukrainian_font,
-                fontSize=10
+            self._append_table(
+                story, data, col_widths,
+                self._repair_table_style, self._repair_table_continuation_style
             )
-            story.append(Paragraph("Принтерів не знайдено", normal_style))
+        else:
+            story.append(Paragraph("Принтерів не знайдено", self._normal_style))
         
         doc.build(story)
-        buffer.seek(0)
-        return buffer
+        return self._rewind(buffer)
 
 
 # Глобальний екземпляр менеджера PDF
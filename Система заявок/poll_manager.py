@@ -3,14 +3,15 @@
 Створення опитувань через Telegram та опрацювання результатів адміном
 """
 import os
-import json
 import requests
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from dotenv import load_dotenv
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from database import get_session
-from models import Poll, PollOption, PollResponse, User
+from models import Poll, PollOption, PollResponse, PollRecipient, User
 from logger import logger
 
 # Завантажуємо змінні середовища
@@ -374,26 +375,20 @@ class PollManager:
                     logger.log_error(f"Опитування {poll_id} не знайдено")
                     return {'sent': 0, 'failed': 0}
                 
-                # Отримуємо список ID отримувачів з опитування
-                recipient_user_ids = []
-                if poll.recipient_user_ids:
-                    try:
-                        recipient_user_ids = json.loads(poll.recipient_user_ids)
-                    except (json.JSONDecodeError, TypeError):
-                        logger.log_warning(f"Не вдалося розпарсити recipient_user_ids для опитування {poll_id}")
-                        # Якщо не вдалося розпарсити, використовуємо всіх користувачів (fallback)
-                        users = session.query(User).filter(User.role == 'user').all()
-                    else:
-                        # Отримуємо тільки тих користувачів, яким було відправлено опитування
-                        if recipient_user_ids:
-                            users = session.query(User).filter(
-                                User.role == 'user',
-                                User.user_id.in_(recipient_user_ids)
-                            ).all()
-                        else:
-                            users = []
-                else:
-                    # Якщо список отримувачів не збережено, використовуємо всіх користувачів (fallback для старих опитувань)
+                # Отримуємо тільки тих користувачів, яким було відправлено опитування
+                users = session.query(User).join(
+                    PollRecipient, PollRecipient.user_id == User.user_id
+                ).filter(
+                    PollRecipient.poll_id == poll_id,
+                    User.role == 'user'
+                ).all()
+                has_recipients = bool(users) or session.query(
+                    session.query(PollRecipient).filter(PollRecipient.poll_id == poll_id).exists()
+                ).scalar()
+                
+                if not has_recipients and poll.recipient_user_ids is None:
+                    # Якщо список отримувачів не збережено, використовуємо всіх користувачів (fallback для старих опитувань).
+                    # Непорожня стара колонка без рядків означає, що всіх отримувачів видалено - звіт нікому не надсилаємо
                     logger.log_warning(f"Опитування {poll_id} не має збереженого списку отримувачів, використовуємо всіх користувачів")
                     users = session.query(User).filter(User.role == 'user').all()
                 
@@ -531,9 +526,14 @@ class PollManager:
                         failed_count += 1
                         logger.log_error(f"Помилка відправки опитування користувачу {user.user_id}: {e}")
                 
-                # Зберігаємо список отримувачів у JSON форматі
+                # Зберігаємо список отримувачів (повторна відправка замінює попередній список)
                 poll.sent_to_users = True
-                poll.recipient_user_ids = json.dumps(recipient_ids) if recipient_ids else None
+                if recipient_ids:
+                    session.execute(delete(PollRecipient).where(PollRecipient.poll_id == poll_id))
+                    session.execute(
+                        insert(PollRecipient),
+                        [{'poll_id': poll_id, 'user_id': recipient_id} for recipient_id in recipient_ids]
+                    )
                 session.commit()
                 
                 logger.log_info(f"Опитування {poll_id} відправлено: {sent_count} успішно, {failed_count} помилок")
@@ -566,25 +566,19 @@ class PollManager:
                     logger.log_warning(f"Опитування {poll_id} вже закрите")
                     return False
                 
-                # Перевіряємо чи користувач вже відповів
-                existing_response = session.query(PollResponse).filter(
-                    PollResponse.poll_id == poll_id,
-                    PollResponse.user_id == user_id
-                ).first()
-                
-                if existing_response:
-                    # Оновлюємо існуючу відповідь
-                    existing_response.option_id = option_id
-                    existing_response.responded_at = datetime.now()
-                else:
-                    # Створюємо нову відповідь
-                    response = PollResponse(
-                        poll_id=poll_id,
-                        option_id=option_id,
-                        user_id=user_id
-                    )
-                    session.add(response)
-                
+                # Нова відповідь або заміна попередньої одним запитом (унікальний індекс poll_id, user_id):
+                # повторні натискання кнопки не впираються в IntegrityError
+                responded_at = datetime.now()
+                stmt = sqlite_insert(PollResponse).values(
+                    poll_id=poll_id,
+                    option_id=option_id,
+                    user_id=user_id,
+                    responded_at=responded_at
+                )
+                session.execute(stmt.on_conflict_do_update(
+                    index_elements=['poll_id', 'user_id'],
+                    set_={'option_id': stmt.excluded.option_id, 'responded_at': responded_at}
+                ))
                 session.commit()
                 logger.log_info(f"Відповідь користувача {user_id} на опитування {poll_id} збережено")
                 return True
@@ -1,7 +1,10 @@
 """
 Модуль для управління принтерами та сумісністю картриджів
 """
-from typing import List, Optional, Dict, Any
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterable, Union, Tuple, Set
+
+from sqlalchemy import insert, select, text
 
 from database import get_session
 from models import Printer, CartridgeType, PrinterCartridgeCompatibility, UserPrinter
@@ -189,71 +192,125 @@ class PrinterManager:
             logger.log_error(f"Помилка додавання сумісності: {e}")
             return False
     
-    def import_compatibility_data(self, data: List[Dict[str, Any]]) -> Dict[str, int]:
+    def _get_or_create_ids(self, session, model, name_column, names: Set[str], defaults: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Словник назва -> id; відсутні записи створюються одним INSERT
+        
+        Args:
+            session: Сесія БД
+            model: Модель (Printer, CartridgeType)
+            name_column: Колонка назви (Printer.model, CartridgeType.name)
+            names: Потрібні назви
+            defaults: Значення інших колонок для нових записів
+        
+        Returns:
+            Словник для всіх назв; при дублікатах назви - найменший id
+        """
+        def load_ids() -> Dict[str, int]:
+            ids = {}
+            rows = session.execute(
+                select(name_column, model.id).where(name_column.in_(names)).order_by(model.id)
+            )
+            for name, row_id in rows:
+                ids.setdefault(name, row_id)
+            return ids
+        
+        ids = load_ids()
+        missing = names - ids.keys()
+        if missing:
+            session.execute(insert(model), [{name_column.key: name, **defaults} for name in sorted(missing)])
+            ids = load_ids()
+        return ids
+    
+    def import_compatibility_data(self, data: Iterable[Union[Tuple[str, str], Dict[str, Any]]]) -> Dict[str, int]:
         """
         Масовий імпорт сумісності
         
         Args:
-            data: Список словників [{'printer_model': 'Canon 4350d', 'cartridge_name': 'Canon FX10'}, ...]
+            data: Пари (модель принтера, назва картриджа) [('Canon 4350d', 'Canon FX10'), ...]
+                або словники [{'printer_model': 'Canon 4350d', 'cartridge_name': 'Canon FX10'}, ...]
         
         Returns:
             Статистика імпорту {'added': int, 'skipped': int, 'errors': int}
         """
         stats = {'added': 0, 'skipped': 0, 'errors': 0}
         
+        # Розбір вхідних даних - до відкриття транзакції, щоб запис помилок у лог не чекав на неї
+        name_pairs = []
+        for item in data:
+            try:
+                if isinstance(item, dict):
+                    printer_model = item.get('printer_model')
+                    cartridge_name = item.get('cartridge_name')
+                else:
+                    printer_model, cartridge_name = item
+                
+                if not printer_model or not cartridge_name:
+                    stats['errors'] += 1
+                    continue
+                
+                name_pairs.append((printer_model, cartridge_name))
+                
+            except Exception as e:
+                logger.log_error(f"Помилка імпорту сумісності {item}: {e}")
+                stats['errors'] += 1
+        
+        if not name_pairs:
+            return stats
+        
         try:
             with get_session() as session:
-                for item in data:
-                    try:
-                        printer_model = item.get('printer_model')
-                        cartridge_name = item.get('cartridge_name')
-                        
-                        if not printer_model or not cartridge_name:
-                            stats['errors'] += 1
-                            continue
-                        
-                        # Знаходимо або створюємо принтер
-                        printer = session.query(Printer).filter(Printer.model == printer_model).first()
-                        if not printer:
-                            printer = Printer(model=printer_model, is_active=True)
-                            session.add(printer)
-                            session.flush()
-                        
-                        # Знаходимо або створюємо картридж
-                        cartridge = session.query(CartridgeType).filter(CartridgeType.name == cartridge_name).first()
-                        if not cartridge:
-                            cartridge = CartridgeType(name=cartridge_name, service_mode='OUTSOURCE')
-                            session.add(cartridge)
-                            session.flush()
-                        
-                        # Додаємо сумісність
-                        existing = session.query(PrinterCartridgeCompatibility).filter(
-                            PrinterCartridgeCompatibility.printer_id == printer.id,
-                            PrinterCartridgeCompatibility.cartridge_type_id == cartridge.id
-                        ).first()
-                        
-                        if not existing:
-                            compatibility = PrinterCartridgeCompatibility(
-                                printer_id=printer.id,
-                                cartridge_type_id=cartridge.id,
-                                is_default=False
-                            )
-                            session.add(compatibility)
-                            stats['added'] += 1
-                        else:
-                            stats['skipped'] += 1
-                            
-                    except Exception as e:
-                        logger.log_error(f"Помилка імпорту сумісності {item}: {e}")
-                        stats['errors'] += 1
+                printer_ids = self._get_or_create_ids(
+                    session, Printer, Printer.model,
+                    {printer_model for printer_model, _ in name_pairs},
+                    {'is_active': True}
+                )
+                cartridge_ids = self._get_or_create_ids(
+                    session, CartridgeType, CartridgeType.name,
+                    {cartridge_name for _, cartridge_name in name_pairs},
+                    {'service_mode': 'OUTSOURCE'}
+                )
+                
+                # Наявна сумісність для цих принтерів - одним запитом, далі лише перевірка в множині
+                existing = set(session.execute(
+                    select(
+                        PrinterCartridgeCompatibility.printer_id,
+                        PrinterCartridgeCompatibility.cartridge_type_id
+                    ).where(PrinterCartridgeCompatibility.printer_id.in_(set(printer_ids.values())))
+                ).all())
+                
+                # Нові унікальні пари (printer_id, cartridge_type_id) у порядку появи
+                pairs = {}
+                for printer_model, cartridge_name in name_pairs:
+                    key = (printer_ids[printer_model], cartridge_ids[cartridge_name])
+                    if key in existing or key in pairs:
+                        stats['skipped'] += 1
+                    else:
+                        pairs[key] = {'printer_id': key[0], 'cartridge_type_id': key[1]}
+                
+                # Додаємо сумісність одним executemany; пари, додані паралельним імпортом, відкидає унікальний індекс
+                if pairs:
+                    now = datetime.now()
+                    result = session.execute(
+                        text(
+                            "INSERT INTO printer_cartridge_compatibility "
+                            "(printer_id, cartridge_type_id, is_default, created_at) "
+                            "VALUES (:printer_id, :cartridge_type_id, 0, :created_at) "
+                            "ON CONFLICT(printer_id, cartridge_type_id) DO NOTHING"
+                        ),
+                        [{**row, 'created_at': now} for row in pairs.values()]
+                    )
+                    stats['added'] += result.rowcount
+                    stats['skipped'] += len(pairs) - result.rowcount
                 
                 session.commit()
-                logger.log_info(f"Імпорт сумісності завершено: додано {stats['added']}, пропущено {stats['skipped']}, помилок {stats['errors']}")
                 
         except Exception as e:
             logger.log_error(f"Помилка масового імпорту сумісності: {e}")
             stats['errors'] += 1
+            return stats
         
+        logger.log_info(f"Імпорт сумісності завершено: додано {stats['added']}, пропущено {stats['skipped']}, помилок {stats['errors']}")
         return stats
     
     def update_printer(self, printer_id: int, model: str, description: Optional[str] = None, is_active: bool = True) -> bool:
@@ -2,9 +2,10 @@
 Модуль для управління справочником статусів заявок
 """
 from typing import List, Optional, Dict, Any
-from database import get_session
+from database import get_session, get_read_session
 from models import TicketStatus
 from logger import logger
+from input_validator import input_validator
 
 
 class StatusManager:
@@ -21,7 +22,7 @@ class StatusManager:
             Список статусів
         """
         try:
-            with get_session() as session:
+            with get_read_session() as session:
                 query = session.query(TicketStatus)
                 if active_only:
                     query = query.filter(TicketStatus.is_active == True)
@@ -53,7 +54,7 @@ class StatusManager:
             Словник з даними статусу або None
         """
         try:
-            with get_session() as session:
+            with get_read_session() as session:
                 status = session.query(TicketStatus).filter(TicketStatus.code == code).first()
                 if not status:
                     return None
@@ -114,6 +115,7 @@ class StatusManager:
                 )
                 session.add(status)
                 session.commit()
+                input_validator.invalidate_status_cache()
                 
                 logger.log_info(f"Додано статус: {code} - {name_ua} (колір: {color})")
                 return status.id
@@ -151,6 +153,7 @@ class StatusManager:
                     status.color = color if color else None
                 
                 session.commit()
+                input_validator.invalidate_status_cache()
                 logger.log_info(f"Оновлено статус ID: {status_id}")
                 return True
         except Exception as e:
@@ -188,6 +191,7 @@ class StatusManager:
                 
                 session.delete(status)
                 session.commit()
+                input_validator.invalidate_status_cache()
                 logger.log_info(f"Видалено статус ID: {status_id}")
                 return True
         except Exception as e:
@@ -5,7 +5,9 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from calendar import monthrange
 
-from database import get_session
+from sqlalchemy.orm import Session
+
+from database import get_session, run_in_session_async
 from models import Task, User
 from logger import logger
 
@@ -190,6 +192,46 @@ class TaskManager:
             logger.log_error(f"Помилка видалення завдання {task_id}: {e}")
             return False
     
+    def _complete_task(self, session: Session, task_id: int) -> Optional[bool]:
+        """
+        Позначення завдання як виконане в переданій сесії (commit робить викликач)
+        
+        Args:
+            session: SQLAlchemy сесія
+            task_id: ID завдання
+            
+        Returns:
+            True якщо позначено зараз, False якщо вже виконано, None якщо не знайдено
+        """
+        task = session.query(Task).filter(Task.id == task_id).first()
+        if not task:
+            return None
+        
+        if task.is_completed:
+            return False  # Вже виконано
+        
+        # Позначаємо як виконане
+        task.is_completed = True
+        task.completed_at = datetime.now()
+        task.updated_at = datetime.now()
+        
+        # Обробляємо повторюваність
+        if task.recurrence_type:
+            new_task = self.handle_recurrence(task, session)
+            if new_task:
+                session.add(new_task)
+        
+        return True
+    
+    def _log_completion(self, task_id: int, completed: Optional[bool]) -> bool:
+        """Логування результату _complete_task; True якщо завдання виконане"""
+        if completed is None:
+            logger.log_error(f"Завдання {task_id} не знайдено")
+            return False
+        if completed:
+            logger.log_info(f"Завдання {task_id} позначено як виконане")
+        return True
+    
     def complete_task(self, task_id: int) -> bool:
         """
         Позначення завдання як виконане з обробкою повторюваності
@@ -202,33 +244,33 @@ class TaskManager:
         """
         try:
             with get_session() as session:
-                task = session.query(Task).filter(Task.id == task_id).first()
-                if not task:
-                    logger.log_error(f"Завдання {task_id} не знайдено")
-                    return False
-                
-                if task.is_completed:
-                    return True  # Вже виконано
-                
-                # Позначаємо як виконане
-                task.is_completed = True
-                task.completed_at = datetime.now()
-                task.updated_at = datetime.now()
-                
-                # Обробляємо повторюваність
-                if task.recurrence_type:
-                    new_task = self.handle_recurrence(task, session)
-                    if new_task:
-                        session.add(new_task)
-                
-                session.commit()
-                
-                logger.log_info(f"Завдання {task_id} позначено як виконане")
-                return True
-                
+                completed = self._complete_task(session, task_id)
         except Exception as e:
             logger.log_error(f"Помилка виконання завдання {task_id}: {e}")
             return False
+        
+        return self._log_completion(task_id, completed)
+    
+    async def complete_task_async(self, task_id: int) -> bool:
+        """
+        Позначення завдання як виконане для обробників бота
+        
+        Вся одиниця роботи виконується в окремому потоці через run_in_session_async,
+        тож очікування блокування БД і повтори не зупиняють event loop.
+        
+        Args:
+            task_id: ID завдання
+            
+        Returns:
+            True якщо виконано успішно
+        """
+        try:
+            completed = await run_in_session_async(lambda session: self._complete_task(session, task_id))
+        except Exception as e:
+            logger.log_error(f"Помилка виконання завдання {task_id}: {e}")
+            return False
+        
+        return self._log_completion(task_id, completed)
     
     def uncomplete_task(self, task_id: int) -> bool:
         """
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+
+
+class KnowledgeBaseTagsFilterTests(unittest.TestCase):
+    """Фільтр нотаток за тегами не залежить від регістру, зокрема для кирилиці."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        import database
+        from knowledge_base_manager import get_knowledge_base_manager
+
+        cls._tmp_dir = tempfile.TemporaryDirectory()
+        database.init_database(f"sqlite:///{cls._tmp_dir.name}/test.db")
+
+        cls.manager = get_knowledge_base_manager()
+        cls.note_id = cls.manager.create_note(title="VPN", tags="Мережа, net", author_id=1)
+        cls.manager.create_note(title="Принтер", tags="Друк", author_id=1)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        import database
+
+        database.get_db_manager().close()
+        database._db_manager = None
+        cls._tmp_dir.cleanup()
+
+    def _note_ids(self, tags: str) -> list:
+        return [note['id'] for note in self.manager.get_notes(is_admin=True, tags=tags)]
+
+    def test_filters_by_cyrillic_tag_in_any_case(self) -> None:
+        self.assertEqual(self._note_ids("Мережа"), [self.note_id])
+        self.assertEqual(self._note_ids("мережа"), [self.note_id])
+        self.assertEqual(self._note_ids("МЕРЕЖА"), [self.note_id])
+
+    def test_filters_by_latin_tag(self) -> None:
+        self.assertEqual(self._note_ids("NET"), [self.note_id])
+
+    def test_search_filters_by_cyrillic_tag(self) -> None:
+        notes = self.manager.search_notes(tags="мережа")
+        self.assertEqual([note['id'] for note in notes], [self.note_id])
+
+    def test_unknown_tag_matches_nothing(self) -> None:
+        self.assertEqual(self._note_ids("сервер"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
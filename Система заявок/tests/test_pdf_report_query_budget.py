@@ -0,0 +1,89 @@
+import tempfile
+import unittest
+
+
+class PdfReportQueryBudgetTests(unittest.TestCase):
+    """Генерація PDF не повинна робити запит до БД на кожну заявку/позицію (N+1)."""
+
+    TICKETS_COUNT = 200
+    QUERY_BUDGET = 3
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        import database
+        from models import CartridgeType, Printer
+
+        cls._tmp_dir = tempfile.TemporaryDirectory()
+        database.init_database(f"sqlite:///{cls._tmp_dir.name}/test.db")
+
+        with database.get_session() as session:
+            printers = [Printer(model=f"HP LaserJet {i}") for i in range(5)]
+            cartridges = [CartridgeType(name=f"CE{i}") for i in range(5)]
+            session.add_all(printers + cartridges)
+            session.commit()
+            printer_ids = [printer.id for printer in printers]
+            cartridge_ids = [cartridge.id for cartridge in cartridges]
+
+        cls.tickets = [
+            {
+                'id': n,
+                'company_name': f"Компанія {n % 7}",
+                'comment': f"Коментар {n % 3}",
+                'admin_comment': None,
+                'items': [
+                    {
+                        'item_type': 'CARTRIDGE',
+                        'cartridge_type_id': cartridge_ids[n % 5],
+                        'printer_model_id': printer_ids[n % 5],
+                        'quantity': 1,
+                    },
+                    {'item_type': 'PRINTER', 'printer_model_id': printer_ids[(n + 1) % 5]},
+                ],
+            }
+            for n in range(cls.TICKETS_COUNT)
+        ]
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        import database
+
+        database.get_db_manager().close()
+        database._db_manager = None
+        cls._tmp_dir.cleanup()
+
+    def setUp(self) -> None:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+
+        self.statements = []
+
+        def count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+            if statement.lstrip().upper().startswith("SELECT"):
+                self.statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", count_query)
+        self.addCleanup(event.remove, Engine, "before_cursor_execute", count_query)
+
+    def test_refill_request_query_budget(self) -> None:
+        from pdf_report_manager import get_pdf_report_manager
+
+        get_pdf_report_manager().generate_contractor_request_refill(self.tickets, {})
+        self.assertLessEqual(len(self.statements), self.QUERY_BUDGET, self.statements)
+
+    def test_repair_request_query_budget(self) -> None:
+        from pdf_report_manager import get_pdf_report_manager
+
+        get_pdf_report_manager().generate_contractor_request_repair(self.tickets, {})
+        self.assertLessEqual(len(self.statements), self.QUERY_BUDGET, self.statements)
+
+    def test_empty_request_does_not_query(self) -> None:
+        from pdf_report_manager import get_pdf_report_manager
+
+        manager = get_pdf_report_manager()
+        manager.generate_contractor_request_refill([], {})
+        manager.generate_contractor_request_repair([], {})
+        self.assertEqual(self.statements, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+
+
+class PollRecipientDeleteUserTests(unittest.TestCase):
+    """Користувача, якому надсилали опитування, можна видалити."""
+
+    def setUp(self) -> None:
+        import database
+
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        database.init_database(f"sqlite:///{self._tmp_dir.name}/test.db")
+
+    def tearDown(self) -> None:
+        import database
+
+        database.get_db_manager().close()
+        database._db_manager = None
+        self._tmp_dir.cleanup()
+
+    def test_delete_poll_recipient_removes_recipient_rows(self) -> None:
+        import database
+        from models import Poll, PollRecipient, User
+
+        with database.get_session() as session:
+            session.add(User(user_id=555, username="recipient", role="user"))
+            poll = Poll(question="Питання?", author_id=1, sent_to_users=True)
+            session.add(poll)
+            session.flush()
+            session.add(PollRecipient(poll_id=poll.id, user_id=555))
+            session.commit()
+
+        with database.get_session() as session:
+            session.delete(session.query(User).filter(User.user_id == 555).one())
+
+        with database.get_session() as session:
+            self.assertEqual(session.query(User).filter(User.user_id == 555).count(), 0)
+            self.assertEqual(session.query(PollRecipient).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import asyncio
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+
+class RunInSessionAsyncTests(unittest.TestCase):
+    """Повтор при блокуванні БД виконується поза event loop і не зупиняє інші корутини."""
+
+    LOCK_HOLD_SECONDS = 0.3
+
+    def setUp(self) -> None:
+        import database
+        from task_manager import TaskManager
+
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.db_manager = database.init_database(f"sqlite:///{self._tmp_dir.name}/test.db")
+        self.task_manager = TaskManager()
+        self.task_id = self.task_manager.create_task(title="Замінити картридж")
+
+    def tearDown(self) -> None:
+        import database
+
+        database.get_db_manager().close()
+        database._db_manager = None
+        self._tmp_dir.cleanup()
+
+    def _fail_first_attempt_with_lock(self) -> list:
+        """Перша спроба довго "чекає" на блокування у своєму потоці та падає з database is locked"""
+        from sqlalchemy.exc import OperationalError
+
+        attempts = []
+        run_in_session = self.db_manager._run_in_session
+
+        def locked_then_ok(work):
+            attempts.append((threading.current_thread(), time.monotonic()))
+            if len(attempts) == 1:
+                time.sleep(self.LOCK_HOLD_SECONDS)
+                attempts.append((threading.current_thread(), time.monotonic()))
+                raise OperationalError("UPDATE tasks", {}, sqlite3.OperationalError("database is locked"))
+            return run_in_session(work)
+
+        self.db_manager._run_in_session = locked_then_ok
+        return attempts
+
+    async def _complete_with_ticker(self) -> tuple:
+        ticks = []
+        done = asyncio.Event()
+
+        async def ticker() -> None:
+            while not done.is_set():
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        ticker_task = asyncio.create_task(ticker())
+        try:
+            result = await self.task_manager.complete_task_async(self.task_id)
+        finally:
+            done.set()
+            await ticker_task
+        return result, ticks
+
+    def test_retries_lock_error_without_blocking_loop(self) -> None:
+        attempts = self._fail_first_attempt_with_lock()
+
+        result, ticks = asyncio.run(self._complete_with_ticker())
+
+        (first_thread, locked_from), (_, locked_until), (retry_thread, _) = attempts
+        self.assertTrue(result)
+        self.assertIsNot(first_thread, threading.main_thread())
+        self.assertIsNot(retry_thread, threading.main_thread())
+        # Поки перша спроба чекала в потоці, event loop продовжував обслуговувати інші корутини
+        ticks_while_locked = [tick for tick in ticks if locked_from < tick < locked_until]
+        self.assertGreaterEqual(len(ticks_while_locked), 10)
+        self.assertTrue(self.task_manager.get_task(self.task_id)['is_completed'])
+
+    def test_non_lock_error_is_not_retried(self) -> None:
+        from sqlalchemy.exc import OperationalError
+
+        attempts = []
+
+        def broken(work):
+            attempts.append(work)
+            raise OperationalError("UPDATE tasks", {}, sqlite3.OperationalError("no such table: tasks"))
+
+        self.db_manager._run_in_session = broken
+
+        self.assertFalse(asyncio.run(self.task_manager.complete_task_async(self.task_id)))
+        self.assertEqual(len(attempts), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,13 +4,25 @@
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 
-from database import get_session
-from models import Ticket, TicketItem, User, Company, Log, Printer, CartridgeType
+from sqlalchemy.orm import joinedload, selectinload
+
+from database import get_session, get_read_session
+from models import Ticket, TicketItem, User, Company, Log
 from logger import logger
 from input_validator import input_validator
 from notification_manager import get_notification_manager
 from contact_utils import telegram_username_to_link
 
+# Зв'язки, які читає _ticket_to_dict: автор, компанія, виконавець - JOIN у тому ж запиті,
+# позиції з назвами картриджів/принтерів - один додатковий SELECT ... IN на всю вибірку
+TICKET_LOAD_OPTIONS = (
+    joinedload(Ticket.user),
+    joinedload(Ticket.company),
+    joinedload(Ticket.executor),
+    selectinload(Ticket.items).joinedload(TicketItem.cartridge_type),
+    selectinload(Ticket.items).joinedload(TicketItem.printer_model),
+)
+
 
 class TicketManager:
     """Клас для управління заявками"""
@@ -47,18 +59,18 @@ class TicketManager:
         try:
             # Валідація типу заявки
             type_validation = input_validator.validate_ticket_type(ticket_type)
-            if not type_validation['valid']:
+            if not type_validation.valid:
                 logger.log_error(f"Невірний тип заявки: {ticket_type}")
                 return None
             
             # Валідація пріоритету
             priority_validation = input_validator.validate_priority(priority)
-            if not priority_validation['valid']:
+            if not priority_validation.valid:
                 logger.log_error(f"Невірний пріоритет: {priority}")
                 return None
             
-            ticket_type = type_validation['cleaned_ticket_type']
-            priority = priority_validation['cleaned_priority']
+            ticket_type = type_validation.cleaned
+            priority = priority_validation.cleaned
             
             with get_session() as session:
                 # Перевіряємо чи існує користувач
@@ -121,10 +133,10 @@ class TicketManager:
                     notification_manager = get_notification_manager()
                     # Отримуємо всіх користувачів з увімкненими оповіщеннями (тільки Telegram користувачі)
                     # Запит до таблиці User гарантує, що користувач вже схвалений
-                    notified_users = session.query(User).filter(
+                    notified_user_ids = [row.user_id for row in session.query(User.user_id).filter(
                         User.notifications_enabled == True,
                         User.user_id > 0  # Тільки Telegram користувачі
-                    ).all()
+                    )]
                     
                     # Отримуємо дані заявки для оповіщення
                     user_name = user.full_name or user.username or f"User {user_id}"
@@ -133,21 +145,20 @@ class TicketManager:
                     # Формуємо список позицій з назвами
                     ticket_items = []
                     for item in ticket.items:
-                        item_dict = self._item_to_dict(item, session)
+                        item_dict = self._item_to_dict(item)
                         ticket_items.append(item_dict)
                     
-                    # Відправляємо оповіщення кожному користувачу
-                    for notified_user in notified_users:
-                        notification_manager.send_new_ticket_notification(
-                            user_id=notified_user.user_id,
-                            ticket_id=ticket.id,
-                            ticket_type=ticket_type,
-                            company_name=company_name,
-                            user_name=user_name,
-                            priority=priority,
-                            items=ticket_items,
-                            comment=comment
-                        )
+                    # Відправляємо оповіщення всім користувачам одночасно
+                    notification_manager.broadcast_new_ticket_notification(
+                        user_ids=notified_user_ids,
+                        ticket_id=ticket.id,
+                        ticket_type=ticket_type,
+                        company_name=company_name,
+                        user_name=user_name,
+                        priority=priority,
+                        items=ticket_items,
+                        comment=comment
+                    )
                 except Exception as e:
                     # Не блокуємо створення заявки, якщо оповіщення не вдалося відправити
                     logger.log_error(f"Помилка відправки оповіщень про нову заявку {ticket.id}: {e}")
@@ -180,11 +191,11 @@ class TicketManager:
         try:
             # Валідація статусу
             status_validation = input_validator.validate_status(new_status)
-            if not status_validation['valid']:
+            if not status_validation.valid:
                 logger.log_error(f"Невірний статус: {new_status}")
                 return False
             
-            new_status = status_validation['cleaned_status']
+            new_status = status_validation.cleaned
             
             with get_session() as session:
                 ticket = session.query(Ticket).filter(Ticket.id == ticket_id).first()
@@ -394,12 +405,12 @@ class TicketManager:
             Словник з даними заявки або None
         """
         try:
-            with get_session() as session:
-                ticket = session.query(Ticket).filter(Ticket.id == ticket_id).first()
+            with get_read_session() as session:
+                ticket = session.query(Ticket).options(*TICKET_LOAD_OPTIONS).filter(Ticket.id == ticket_id).first()
                 if not ticket:
                     return None
                 
-                return self._ticket_to_dict(ticket, session)
+                return self._ticket_to_dict(ticket)
                 
         except Exception as e:
             logger.log_error(f"Помилка отримання заявки {ticket_id}: {e}")
@@ -432,8 +443,8 @@ class TicketManager:
             Список заявок
         """
         try:
-            with get_session() as session:
-                query = session.query(Ticket).filter(Ticket.user_id == user_id)
+            with get_read_session() as session:
+                query = session.query(Ticket).options(*TICKET_LOAD_OPTIONS).filter(Ticket.user_id == user_id)
                 
                 if status:
                     query = query.filter(Ticket.status == status)
@@ -483,7 +494,7 @@ class TicketManager:
                 else:
                     tickets = query.all()
                 
-                return [self._ticket_to_dict(ticket, session) for ticket in tickets]
+                return [self._ticket_to_dict(ticket) for ticket in tickets]
                 
         except Exception as e:
             logger.log_error(f"Помилка отримання заявок користувача {user_id}: {e}")
@@ -518,8 +529,8 @@ class TicketManager:
             Список заявок
         """
         try:
-            with get_session() as session:
-                query = session.query(Ticket)
+            with get_read_session() as session:
+                query = session.query(Ticket).options(*TICKET_LOAD_OPTIONS)
                 
                 if company_id:
                     query = query.filter(Ticket.company_id == company_id)
@@ -569,21 +580,18 @@ class TicketManager:
                 else:
                     tickets = query.order_by(order_column.desc()).limit(limit).all()
                 
-                return [self._ticket_to_dict(ticket, session) for ticket in tickets]
+                return [self._ticket_to_dict(ticket) for ticket in tickets]
                 
         except Exception as e:
             logger.log_error(f"Помилка отримання всіх заявок: {e}")
             return []
     
-    def _ticket_to_dict(self, ticket: Ticket, session) -> Dict[str, Any]:
-        """Конвертація заявки в словник"""
-        user = session.query(User).filter(User.user_id == ticket.user_id).first()
-        company = session.query(Company).filter(Company.id == ticket.company_id).first()
-        executor = None
-        executor_name = None
-        if ticket.executor_id:
-            executor = session.query(User).filter(User.user_id == ticket.executor_id).first()
-            executor_name = executor.full_name or executor.username if executor else None
+    def _ticket_to_dict(self, ticket: Ticket) -> Dict[str, Any]:
+        """Конвертація заявки в словник (зв'язки завантажуються через TICKET_LOAD_OPTIONS)"""
+        user = ticket.user
+        company = ticket.company
+        executor = ticket.executor
+        executor_name = executor.full_name or executor.username if executor else None
         
         return {
             'id': ticket.id,
@@ -606,12 +614,12 @@ class TicketManager:
             'created_at': ticket.created_at.isoformat() if ticket.created_at else None,
             'updated_at': ticket.updated_at.isoformat() if ticket.updated_at else None,
             'items': [
-                self._item_to_dict(item, session)
+                self._item_to_dict(item)
                 for item in ticket.items
             ]
         }
     
-    def _item_to_dict(self, item: TicketItem, session) -> Dict[str, Any]:
+    def _item_to_dict(self, item: TicketItem) -> Dict[str, Any]:
         """Конвертація позиції заявки в словник з назвами"""
         item_dict = {
             'id': item.id,
@@ -626,16 +634,12 @@ class TicketManager:
         }
         
         # Додаємо назву принтера, якщо є
-        if item.item_type == 'PRINTER' and item.printer_model_id:
-            printer = session.query(Printer).filter(Printer.id == item.printer_model_id).first()
-            if printer:
-                item_dict['printer_name'] = printer.model
+        if item.item_type == 'PRINTER' and item.printer_model:
+            item_dict['printer_name'] = item.printer_model.model
         
         # Додаємо назву картриджа, якщо є
-        if item.item_type == 'CARTRIDGE' and item.cartridge_type_id:
-            cartridge = session.query(CartridgeType).filter(CartridgeType.id == item.cartridge_type_id).first()
-            if cartridge:
-                item_dict['cartridge_name'] = cartridge.name
+        if item.item_type == 'CARTRIDGE' and item.cartridge_type:
+            item_dict['cartridge_name'] = item.cartridge_type.name
         
         return item_dict
     
@@ -717,7 +721,7 @@ class TicketManager:
             if date_to is None:
                 date_to = datetime.now()
             
-            with get_session() as session:
+            with get_read_session() as session:
                 # Отримуємо заявки типу REFILL за період
                 tickets = session.query(Ticket).filter(
                     Ticket.ticket_type == 'REFILL',
@@ -859,7 +863,7 @@ class TicketManager:
             Список користувачів з увімкненими оповіщеннями
         """
         try:
-            with get_session() as session:
+            with get_read_session() as session:
                 users = session.query(User).filter(
                     User.notifications_enabled == True,
                     User.user_id > 0  # Тільки Telegram користувачі
@@ -20,7 +20,7 @@ from dotenv import load_dotenv
 # Додаємо батьківську директорію в Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from database import init_database, get_session, get_bot_config, set_bot_config
+from database import init_database, get_session, get_read_session, get_bot_config, set_bot_config
 from models import User, Company, Ticket, TicketItem, ActiveSession, Log, PendingRequest, Printer, CartridgeType, PrinterCartridgeCompatibility, Contractor, TicketStatus, Poll, PollOption, PollResponse, Announcement, AnnouncementRecipient, TicketChat, Task, Timer, BackupSettings, KnowledgeBaseNote
 from ticket_manager import get_ticket_manager
 from contact_utils import normalize_phone
@@ -159,7 +159,7 @@ def inject_knowledge_base_access():
         if current_user.is_admin:
             has_kb_access = True
         else:
-            with get_session() as session:
+            with get_read_session() as session:
                 user = session.query(User).filter(User.user_id == current_user.user_id).first()
                 if user and user.notifications_enabled:
                     has_kb_access = True
@@ -185,7 +185,7 @@ def status_badge_color_filter(status, ticket_type=None):
     """Визначення кольору badge для статусу заявки в залежності від типу"""
     # Спочатку перевіряємо, чи є колір в БД
     try:
-        with get_session() as session:
+        with get_read_session() as session:
             status_obj = session.query(TicketStatus).filter(TicketStatus.code == status).first()
             if status_obj and status_obj.color:
                 return status_obj.color
@@ -288,7 +288,7 @@ def load_user(user_id_str):
     """Завантаження користувача для Flask-Login"""
     try:
         user_id = int(user_id_str)
-        with get_session() as session:
+        with get_read_session() as session:
             user = session.query(User).filter(User.user_id == user_id).first()
             if user and user.password_hash:
                 return WebUser(user)
@@ -326,7 +326,7 @@ def login():
     if current_user.is_authenticated:
         return redirect(url_for('dashboard'))
     
-    with get_session() as session:
+    with get_read_session() as session:
         users_with_passwords = session.query(User).filter(
             User.password_hash.isnot(None)
         ).order_by(User.full_name, User.username).all()
@@ -351,7 +351,7 @@ def login():
         
         try:
             user_id = int(user_id_str)
-            with get_session() as session:
+            with get_read_session() as session:
                 user = session.query(User).filter(User.user_id == user_id).first()
                 
                 if user and user.password_hash and check_password_hash(user.password_hash, password):
@@ -568,7 +568,7 @@ def tickets():
     end_idx = min(start_idx + per_page, total_tickets)
     tickets = all_tickets[start_idx:end_idx]
     
-    with get_session() as session:
+    with get_read_session() as session:
         companies_list = session.query(Company).order_by(Company.name).all() if current_user.is_admin else []
         # Конвертуємо в список словників, щоб уникнути DetachedInstanceError
         companies = [
@@ -633,7 +633,7 @@ def ticket_detail(ticket_id):
         return redirect(url_for('tickets'))
     
     # Отримуємо історію змін статусів
-    with get_session() as session:
+    with get_read_session() as session:
         logs_list = session.query(Log).filter(
             Log.command == 'ticket_status_changed',
             Log.message.like(f'%Заявка ID: {ticket_id}%')
@@ -668,7 +668,7 @@ def ticket_detail(ticket_id):
         
         if printer_id:
             printer_manager = get_printer_manager()
-            with get_session() as session:
+            with get_read_session() as session:
                 printer_obj = session.query(Printer).filter(Printer.id == printer_id).first()
                 if printer_obj:
                     printer_info = {
@@ -683,7 +683,7 @@ def ticket_detail(ticket_id):
     users = []
     companies = []
     if current_user.is_admin:
-        with get_session() as session:
+        with get_read_session() as session:
             users_list = session.query(User).filter(User.role == 'user').order_by(User.full_name).all()
             users = [
                 {'user_id': u.user_id, 'full_name': u.full_name, 'username': u.username}
@@ -825,7 +825,7 @@ def ticket_chat(ticket_id):
     chat_manager.mark_messages_as_read(ticket_id, 'admin')
     
     # Отримуємо інформацію про користувача
-    with get_session() as session:
+    with get_read_session() as session:
         user = session.query(User).filter(User.user_id == ticket['user_id']).first()
         user_name = user.full_name if user and user.full_name else (user.username if user else f"Користувач {ticket['user_id']}")
     
@@ -1233,7 +1233,7 @@ def users():
     page = request.args.get('page', 1, type=int)
     per_page = 20  # Кількість користувачів на сторінку
     
-    with get_session() as session:
+    with get_read_session() as session:
         # Застосовуємо сортування
         if sort_by == 'company_id':
             # Для компанії сортуємо по назві через join
@@ -1510,7 +1510,7 @@ def add_user_printer(user_id):
         return redirect(url_for('users'))
     
     # Перевіряємо, чи користувач належить до компанії з увімкненим обслуговуванням принтерів
-    with get_session() as session:
+    with get_read_session() as session:
         user = session.query(User).filter(User.user_id == user_id).first()
         if not user or not user.company_id:
             flash('Користувач не належить до компанії або компанія не встановлена.', 'danger')
@@ -1535,7 +1535,7 @@ def add_user_printer(user_id):
 def remove_user_printer(user_id, printer_id):
     """Видалення прив'язки користувача до принтера"""
     # Перевіряємо, чи користувач належить до компанії з увімкненим обслуговуванням принтерів
-    with get_session() as session:
+    with get_read_session() as session:
         user = session.query(User).filter(User.user_id == user_id).first()
         if not user or not user.company_id:
             flash('Користувач не належить до компанії або компанія не встановлена.', 'danger')
@@ -1684,7 +1684,7 @@ def delete_user():
                     return redirect(url_for('users'))
             
             # Перевіряємо залежності
-            from models import Ticket, AnnouncementRecipient, PendingRequest
+            from models import Ticket, AnnouncementRecipient, PendingRequest, PollRecipient
             
             # Заявки, де користувач є автором
             tickets_count = session.query(Ticket).filter(Ticket.user_id == user_id).count()
@@ -1716,6 +1716,9 @@ def delete_user():
             if pending_requests_count > 0:
                 session.query(PendingRequest).filter(PendingRequest.user_id == user_id).delete()
             
+            # Видаляємо записи отримувача опитувань (таблиця могла бути створена без ON DELETE CASCADE)
+            session.query(PollRecipient).filter(PollRecipient.user_id == user_id).delete()
+            
             # Видаляємо користувача
             # ActiveSession видаляться автоматично через CASCADE
             user_name = user.full_name or user.username or f"ID: {user_id}"
@@ -1733,7 +1736,7 @@ def delete_user():
 @admin_required
 def companies():
     """Управління компаніями"""
-    with get_session() as session:
+    with get_read_session() as session:
         companies_list = session.query(Company).order_by(Company.name).all()
         return render_template('companies.html', companies=companies_list)
 
@@ -1878,7 +1881,7 @@ def printer_compatibility(printer_id):
     printer_manager = get_printer_manager()
     cartridges = printer_manager.get_compatible_cartridges(printer_id)
     
-    with get_session() as session:
+    with get_read_session() as session:
         printer_obj = session.query(Printer).filter(Printer.id == printer_id).first()
         if not printer_obj:
             flash('Принтер не знайдено.', 'danger')
@@ -1973,7 +1976,7 @@ def edit_printer_compatibility(compatibility_id):
         flash('Помилка оновлення сумісності.', 'danger')
     
     # Отримуємо printer_id для редиректу
-    with get_session() as session:
+    with get_read_session() as session:
         compatibility = session.query(PrinterCartridgeCompatibility).filter(
             PrinterCartridgeCompatibility.id == compatibility_id
         ).first()
@@ -1988,7 +1991,7 @@ def edit_printer_compatibility(compatibility_id):
 def delete_printer_compatibility(compatibility_id):
     """Видалення сумісності"""
     # Отримуємо printer_id перед видаленням
-    with get_session() as session:
+    with get_read_session() as session:
         compatibility = session.query(PrinterCartridgeCompatibility).filter(
             PrinterCartridgeCompatibility.id == compatibility_id
         ).first()
@@ -2010,7 +2013,7 @@ def delete_printer_compatibility(compatibility_id):
 @admin_required
 def cartridges():
     """Довідник картриджів"""
-    with get_session() as session:
+    with get_read_session() as session:
         cartridges_list = session.query(CartridgeType).order_by(CartridgeType.name).all()
         return render_template('cartridges.html', cartridges=cartridges_list)
 
@@ -2157,7 +2160,7 @@ def api_compatible_cartridges(printer_id):
 @admin_required
 def contractors():
     """Управління підрядниками"""
-    with get_session() as session:
+    with get_read_session() as session:
         contractors_list = session.query(Contractor).order_by(Contractor.name).all()
         return render_template('contractors.html', contractors=contractors_list)
 
@@ -2261,7 +2264,7 @@ def logs():
         page = int(request.args.get('page', 1))
         per_page = 100
         
-        with get_session() as session:
+        with get_read_session() as session:
             query = session.query(Log).order_by(Log.timestamp.desc())
             
             # Фільтри
@@ -2581,7 +2584,7 @@ def delete_status(status_id):
     status_manager = get_status_manager()
     
     # Перевіряємо, чи це захищений статус
-    with get_session() as session:
+    with get_read_session() as session:
         status = session.query(TicketStatus).filter(TicketStatus.id == status_id).first()
         if status and status.code in ['NEW', 'CLOSED', 'CANCELLED']:
             flash('Цей статус захищений від видалення.', 'warning')
@@ -2601,7 +2604,7 @@ def delete_status(status_id):
 @admin_required
 def reports():
     """Звіти та PDF"""
-    with get_session() as session:
+    with get_read_session() as session:
         companies_list = session.query(Company).order_by(Company.name).all()
         contractors_list = session.query(Contractor).filter(Contractor.is_active == True).order_by(Contractor.name).all()
         # Конвертуємо в списки словників, щоб уникнути DetachedInstanceError
@@ -2706,7 +2709,7 @@ def create_ticket():
         
         # Перевіряємо, чи дозволено обслуговування принтерів для компанії
         if ticket_type in ['REFILL', 'REPAIR']:
-            with get_session() as session:
+            with get_read_session() as session:
                 company = session.query(Company).filter(Company.id == company_id).first()
                 if company and not company.printer_service_enabled:
                     flash('Обслуговування принтерів вимкнено для цієї компанії. Можна створити тільки заявку типу "Інцидент".', 'danger')
@@ -2778,7 +2781,7 @@ def create_ticket():
     
     # Визначаємо, чи дозволено обслуговування принтерів
     printer_service_enabled = True
-    with get_session() as session:
+    with get_read_session() as session:
         if current_user.is_admin:
             companies_list = session.query(Company).order_by(Company.name).all()
             users_list = session.query(User).filter(User.role == 'user').order_by(User.full_name).all()
@@ -2822,22 +2825,23 @@ def generate_pdf_report():
     ticket_manager = get_ticket_manager()
     pdf_manager = get_pdf_report_manager()
     
+    # Для заявок підряднику тип фільтрується в SQL разом з компанією та статусом
+    ticket_type = None
+    if report_type in ['contractor_refill', 'contractor_repair']:
+        ticket_type = 'REFILL' if report_type == 'contractor_refill' else 'REPAIR'
+    
     # Фільтруємо заявки
     tickets = ticket_manager.get_all_tickets(
         company_id=company_id,
         status=status,  # Фільтр по статусу, якщо вибрано
+        ticket_type=ticket_type,
         limit=10000
     )
     
-    # Фільтруємо по типу для заявок підряднику
-    if report_type in ['contractor_refill', 'contractor_repair']:
-        ticket_type = 'REFILL' if report_type == 'contractor_refill' else 'REPAIR'
-        tickets = [t for t in tickets if t.get('ticket_type') == ticket_type]
-    
     if report_type == 'tickets_report':
         company_name = None
         if company_id:
-            with get_session() as session:
+            with get_read_session() as session:
                 company = session.query(Company).filter(Company.id == company_id).first()
                 company_name = company.name if company else None
         
@@ -2852,7 +2856,7 @@ def generate_pdf_report():
     elif report_type == 'contractor_refill':
         contractor = None
         if contractor_id:
-            with get_session() as session:
+            with get_read_session() as session:
                 contractor_obj = session.query(Contractor).filter(Contractor.id == contractor_id).first()
                 if contractor_obj:
                     contractor = {'name': contractor_obj.name}
@@ -2863,7 +2867,7 @@ def generate_pdf_report():
         
         company_name = None
         if company_id:
-            with get_session() as session:
+            with get_read_session() as session:
                 company = session.query(Company).filter(Company.id == company_id).first()
                 company_name = company.name if company else None
         
@@ -2878,7 +2882,7 @@ def generate_pdf_report():
     elif report_type == 'contractor_repair':
         contractor = None
         if contractor_id:
-            with get_session() as session:
+            with get_read_session() as session:
                 contractor_obj = session.query(Contractor).filter(Contractor.id == contractor_id).first()
                 if contractor_obj:
                     contractor = {'name': contractor_obj.name}
@@ -2889,7 +2893,7 @@ def generate_pdf_report():
         
         company_name = None
         if company_id:
-            with get_session() as session:
+            with get_read_session() as session:
                 company = session.query(Company).filter(Company.id == company_id).first()
                 company_name = company.name if company else None
         
@@ -2979,7 +2983,7 @@ def polls():
     active_polls = poll_manager.get_active_polls()
     
     # Отримуємо також закриті опитування
-    with get_session() as session:
+    with get_read_session() as session:
         closed_polls = session.query(Poll).filter(
             Poll.is_closed == True
         ).order_by(Poll.closed_at.desc()).limit(50).all()
@@ -3068,7 +3072,7 @@ def poll_detail(poll_id):
         return redirect(url_for('polls'))
     
     # Отримуємо інформацію про опитування та список користувачів
-    with get_session() as session:
+    with get_read_session() as session:
         poll = session.query(Poll).filter(Poll.id == poll_id).first()
         if not poll:
             flash('Опитування не знайдено.', 'danger')
@@ -3118,7 +3122,7 @@ def send_poll(poll_id):
     poll_manager = get_poll_manager()
     
     # Перевіряємо, чи опитування вже відправлено
-    with get_session() as session:
+    with get_read_session() as session:
         poll = session.query(Poll).filter(Poll.id == poll_id).first()
         if not poll:
             flash('Опитування не знайдено.', 'danger')
@@ -3221,7 +3225,7 @@ def announcements():
         announcement_manager = get_announcement_manager()
         
         # Отримуємо історію оголошень та список користувачів
-        with get_session() as session:
+        with get_read_session() as session:
             # Отримуємо історію оголошень
             announcements_list = session.query(Announcement).order_by(
                 Announcement.sent_at.desc()
@@ -3289,7 +3293,7 @@ def create_announcement():
                 flash('Виберіть хоча б одну компанію!', 'warning')
                 return redirect(url_for('announcements'))
             
-            with get_session() as session:
+            with get_read_session() as session:
                 users = session.query(User).filter(
                     User.company_id.in_(company_ids),
                     User.user_id > 0  # Тільки Telegram користувачі
@@ -3336,7 +3340,7 @@ def announcement_recipients(ann_id):
         announcement_manager = get_announcement_manager()
         recipients = announcement_manager.get_announcement_recipients(ann_id)
         
-        with get_session() as session:
+        with get_read_session() as session:
             announcement = session.query(Announcement).filter(Announcement.id == ann_id).first()
             if not announcement:
                 flash('Оголошення не знайдено!', 'warning')
@@ -4203,7 +4207,7 @@ def knowledge_base_access_required(f):
     @login_required
     def decorated_function(*args, **kwargs):
         if not current_user.is_admin:
-            with get_session() as session:
+            with get_read_session() as session:
                 user = session.query(User).filter(User.user_id == current_user.user_id).first()
                 if not user or not user.notifications_enabled:
                     flash('Доступ заборонено. Потрібні права адміністратора або увімкнені оповіщення.', 'danger')
@@ -4227,7 +4231,7 @@ def knowledge_base():
         date_to_str = request.args.get('date_to', '').strip()
         
         # Пагінація
-        page = request.args.get('page', 1, type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
         per_page = 20  # Кількість нотаток на сторінку
         
         # Обробка дат
@@ -4245,28 +4249,34 @@ def knowledge_base():
             except ValueError:
                 pass
         
-        # Отримуємо нотатки
-        if search_text or tags or category or date_from or date_to:
+        # Вибираємо лише поточну сторінку: "Наступна" передає keyset-курсор (after),
+        # тож її вартість не залежить від глибини; номери сторінок - через offset
+        cursor = knowledge_base_manager.cursor_from_param(request.args.get('after'))
+        page_args = {'limit': per_page}
+        if cursor:
+            page_args['cursor'] = cursor
+        else:
+            page_args['offset'] = (page - 1) * per_page
+        
+        filters = {
+            'search_text': search_text or None,
+            'tags': tags or None,
+            'category': category or None,
+            'date_from': date_from,
+            'date_to': date_to
+        }
+        if any(filters.values()):
             # Пошук
-            all_notes = knowledge_base_manager.search_notes(
-                search_text=search_text if search_text else None,
-                tags=tags if tags else None,
-                category=category if category else None,
-                date_from=date_from,
-                date_to=date_to,
-                limit=None
-            )
+            notes = knowledge_base_manager.search_notes(**filters, **page_args)
         else:
             # Всі нотатки
-            all_notes = knowledge_base_manager.get_all_notes(limit=None)
+            notes = knowledge_base_manager.get_notes(is_admin=True, **page_args)
         
-        # Пагінація
-        total_notes = len(all_notes)
+        total_notes = knowledge_base_manager.count_notes(**filters)
         total_pages = (total_notes + per_page - 1) // per_page if total_notes > 0 else 0
-        
-        start_idx = (page - 1) * per_page
-        end_idx = min(start_idx + per_page, total_notes)
-        notes = all_notes[start_idx:end_idx] if all_notes else []
+        next_cursor = None
+        if page < total_pages:
+            next_cursor = knowledge_base_manager.cursor_to_param(knowledge_base_manager.get_next_cursor(notes))
         
         # Отримуємо списки категорій та тегів для фільтрів
         categories = knowledge_base_manager.get_categories()
@@ -4274,9 +4284,10 @@ def knowledge_base():
         
         # Перевіряємо права на редагування та закладки
         is_admin = current_user.is_admin
+        favorite_ids = knowledge_base_manager.get_favorite_note_ids(current_user.user_id, [note['id'] for note in notes])
         for note in notes:
             note['can_edit'] = knowledge_base_manager.can_edit_note(note['id'], current_user.user_id, is_admin)
-            note['is_favorite'] = knowledge_base_manager.is_favorite(current_user.user_id, note['id'])
+            note['is_favorite'] = note['id'] in favorite_ids
         
         return render_template(
             'knowledge_base.html',
@@ -4285,6 +4296,7 @@ def knowledge_base():
             total_pages=total_pages,
             total_notes=total_notes,
             end_index=min(page * per_page, total_notes),
+            next_cursor=next_cursor,
             search_text=search_text,
             tags=tags,
             category=category,
@@ -4463,7 +4475,7 @@ def knowledge_base_delete(note_id):
     """Видалення нотатки"""
     try:
         knowledge_base_manager = get_knowledge_base_manager()
-        note = knowledge_base_manager.get_note(note_id)
+        note = knowledge_base_manager.get_note_summary(note_id)
         
         if not note:
             flash('Нотатку не знайдено.', 'danger')
@@ -4537,7 +4549,7 @@ def knowledge_base_toggle_favorite(note_id):
     """Перемикання статусу закладки"""
     try:
         knowledge_base_manager = get_knowledge_base_manager()
-        note = knowledge_base_manager.get_note(note_id)
+        note = knowledge_base_manager.get_note_summary(note_id)
         
         if not note:
             flash('Нотатку не знайдено.', 'danger')